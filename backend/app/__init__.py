@@ -1,2 +1,6 @@
 """Backend application package for the AI Test Results Dashboard."""
 
+import time
+
+# Start of the package import, for the cold start time reported at startup.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,181 @@
+"""Retention and archival of old test runs.
+
+:func:`apply_retention` moves runs started before a cutoff (and their cases)
+into gzip-compressed NDJSON files under ``ARCHIVE_DIR``, one file per month.
+Each run is written as its own gzip member and its byte range is recorded in
+``archived_runs``, so :func:`load_archived_run` can read a single run back
+without decompressing the whole file. When partitioning is enabled,
+``test_runs`` partitions entirely older than the cutoff are dropped instead of
+deleted row by row. Cases are always deleted by archived run id, since their
+``created_at`` partitions need not line up with the runs' ``started_at``.
+
+Archive files are written and fsynced before any row is deleted, and the
+index rows and deletes commit in one transaction. If the process dies in
+between, the runs stay live and unindexed; the next pass appends them again
+and indexes the new copy, leaving the earlier bytes unreferenced.
+
+Run with ``python -m app.archive --older-than-days 365``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import delete, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import models, partitioning
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", "archive"))
+_DELETE_BATCH = 1000
+
+
+class ArchiveUnavailable(Exception):
+    """Raised when an archived run is indexed but its archive file cannot be read."""
+
+
+def _archive_path(started_at: datetime) -> str:
+    return f"test_runs_{started_at:%Y_%m}.ndjson.gz"
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def load_archived_run(db: Session, run_id: UUID) -> models.TestRun | None:
+    """Rebuild an archived run as a detached ``TestRun`` with its suite and cases.
+
+    Raises :class:`ArchiveUnavailable` when the archive file is missing or corrupt.
+    """
+    entry = db.get(models.ArchivedRun, run_id)
+    if entry is None:
+        return None
+    path = ARCHIVE_DIR / entry.archive_file
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(entry.byte_offset)
+            item = json.loads(gzip.decompress(handle.read(entry.byte_length)))
+    except (OSError, EOFError, ValueError) as exc:
+        logger.exception("Cannot read archived run %s from %s", run_id, path)
+        raise ArchiveUnavailable(f"Run {run_id} is archived but its archive cannot be read") from exc
+
+    run = models.TestRun(
+        id=UUID(item["id"]),
+        suite_id=UUID(item["suite_id"]),
+        status=item["status"],
+        started_at=_parse_datetime(item["started_at"]),
+        completed_at=_parse_datetime(item["completed_at"]),
+        duration_ms=item["duration_ms"],
+        total_tests=item["total_tests"],
+        passed_tests=item["passed_tests"],
+        failed_tests=item["failed_tests"],
+    )
+    cases = [
+        models.TestCase(
+            **{**case, "id": UUID(case["id"]), "run_id": run.id, "created_at": _parse_datetime(case["created_at"])}
+        )
+        for case in item["test_cases"]
+    ]
+    # set_committed_value avoids backref events that would attach the
+    # rebuilt objects to the session and re-insert them on commit.
+    set_committed_value(run, "suite", db.get(models.TestSuite, run.suite_id))
+    set_committed_value(run, "test_cases", cases)
+    return run
+
+
+def apply_retention(db: Session, cutoff: datetime, *, archive_dir: Path = ARCHIVE_DIR) -> int:
+    """Archive and remove every run started before ``cutoff``; returns the run count."""
+    from . import crud
+    from .utils.export import ndjson_line
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    handles: Dict[str, object] = {}
+    index_rows: List[dict] = []
+    try:
+        rows = crud.iter_test_run_export(db, include_cases=True, end_date=cutoff - timedelta(microseconds=1))
+        for item in rows:
+            name = _archive_path(item["started_at"])
+            handle = handles.get(name)
+            if handle is None:
+                handle = handles[name] = open(archive_dir / name, "ab")
+            member = gzip.compress(ndjson_line(item))
+            index_rows.append(
+                {
+                    "id": item["id"],
+                    "suite_id": item["suite_id"],
+                    "started_at": item["started_at"],
+                    "archive_file": name,
+                    "byte_offset": handle.tell(),
+                    "byte_length": len(member),
+                }
+            )
+            handle.write(member)
+        for handle in handles.values():
+            handle.flush()
+            os.fsync(handle.fileno())
+        if handles:
+            _fsync_directory(archive_dir)
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    if not index_rows:
+        return 0
+    db.execute(models.ArchivedRun.__table__.insert(), index_rows)
+    _remove_archived(db, cutoff, [row["id"] for row in index_rows])
+    return len(index_rows)
+
+
+def _fsync_directory(path: Path) -> None:
+    """Persist new directory entries so freshly created archive files survive a crash."""
+    if os.name != "posix":
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _remove_archived(db: Session, cutoff: datetime, run_ids: List[UUID]) -> None:
+    bind = db.get_bind()
+    if partitioning.enabled(bind):
+        # Every run in these partitions started before the cutoff and was
+        # archived above. Case partitions are keyed on created_at, which can
+        # precede or follow the run's started_at, so cases go by run id below.
+        run_table = models.TestRun.__table__.name
+        for name, _, upper in partitioning.monthly_partitions(bind, run_table):
+            if upper <= cutoff.date():
+                db.execute(text(f"DROP TABLE {name}"))
+
+    for offset in range(0, len(run_ids), _DELETE_BATCH):
+        batch = run_ids[offset : offset + _DELETE_BATCH]
+        db.execute(delete(models.TestCase).where(models.TestCase.run_id.in_(batch)))
+        db.execute(delete(models.TestRun).where(models.TestRun.id.in_(batch)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .database import Base, engine, session_scope, upgrade_schema
+
+    parser = argparse.ArgumentParser(description="Archive and remove old test runs.")
+    parser.add_argument("--older-than-days", type=int, required=True)
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    with session_scope() as session:
+        cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+        print(f"Archived {apply_retention(session, cutoff, archive_dir=args.archive_dir)} runs to {args.archive_dir}")
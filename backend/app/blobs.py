@@ -0,0 +1,235 @@
+"""Content-addressed storage for repetitive test case text.
+
+Descriptions, AI insights, error messages and stack traces repeat across
+thousands of cases, so ``test_cases`` stores a 20-character content hash per
+field and the text itself lives once in ``text_blobs``. ``TestCase`` exposes
+the fields as plain string attributes through :class:`BlobText`; assigned text
+is written to ``text_blobs`` when the session flushes. Reads go through an
+in-process LRU of hot blobs, and :func:`prefetch` resolves a batch of cases
+with a single query.
+
+Databases created before blobs existed are migrated by :func:`migrate_legacy_columns`,
+which runs on startup and can also be invoked with ``python -m app.blobs``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, object_session
+
+from .database import upsert_insert
+
+BLOB_FIELDS = ("description", "ai_insight", "error_message", "stack_trace")
+CACHE_SIZE = int(os.getenv("TEXT_BLOB_CACHE_SIZE", "4096"))
+MIGRATE_BATCH_SIZE = 2000
+_RESOLVE_CHUNK = 500
+
+
+def blob_id(content: str) -> str:
+    """Hash text into its 20-character blob id."""
+    return hashlib.blake2b(content.encode(), digest_size=10).hexdigest()
+
+
+class BlobCache:
+    """Bounded LRU of blob id to text with hit/miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            for key in ids:
+                content = self._entries.get(key)
+                if content is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = content
+        return found
+
+    def put_many(self, contents: Mapping[str, str]) -> None:
+        with self._lock:
+            for key, content in contents.items():
+                self._entries[key] = content
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+cache = BlobCache(CACHE_SIZE)
+
+
+def _table():
+    from . import models
+
+    return models.TextBlob.__table__
+
+
+def store(db: Session, contents: Mapping[str, str]) -> None:
+    """Insert blobs that do not exist yet."""
+    if not contents:
+        return
+    table = _table()
+    db.connection().execute(
+        upsert_insert(db)(table).on_conflict_do_nothing(index_elements=[table.c.id]),
+        [{"id": key, "content": content} for key, content in contents.items()],
+    )
+
+
+def resolve(db: Session, ids: Iterable[str | None]) -> Dict[str, str]:
+    """Return the text for each blob id, reading misses in one query per chunk."""
+    wanted = {key for key in ids if key is not None}
+    found = cache.get_many(wanted)
+    missing = list(wanted - found.keys())
+    if missing:
+        table = _table()
+        loaded = {}
+        for offset in range(0, len(missing), _RESOLVE_CHUNK):
+            rows = db.execute(
+                select(table.c.id, table.c.content).where(table.c.id.in_(missing[offset : offset + _RESOLVE_CHUNK]))
+            )
+            loaded.update({key: content for key, content in rows})
+        cache.put_many(loaded)
+        found.update(loaded)
+    return found
+
+
+def intern_rows(db: Session, rows: Iterable[dict]) -> None:
+    """Replace text fields in Core insert rows with blob ids, storing new blobs."""
+    contents = {}
+    for row in rows:
+        for field in BLOB_FIELDS:
+            content = row.pop(field, None)
+            key = row[f"{field}_id"] = blob_id(content) if content is not None else None
+            if key is not None:
+                contents[key] = content
+    store(db, contents)
+
+
+def prefetch(db: Session, cases: Iterable[Any]) -> None:
+    """Resolve the text of every blob field on ``cases`` with batched lookups."""
+    cases = list(cases)
+    ids = [getattr(case, f"{field}_id") for case in cases for field in BLOB_FIELDS]
+    contents = resolve(db, ids)
+    for case in cases:
+        texts = case.__dict__.setdefault("_blob_texts", {})
+        for field in BLOB_FIELDS:
+            key = getattr(case, f"{field}_id")
+            if key in contents:
+                texts[key] = contents[key]
+
+
+class BlobText:
+    """String attribute backed by the ``<name>_id`` column of a mapped class."""
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+        self.id_attr = f"{name}_id"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        key = getattr(instance, self.id_attr)
+        if key is None:
+            return None
+        texts = instance.__dict__.setdefault("_blob_texts", {})
+        if key not in texts:
+            db = object_session(instance)
+            content = resolve(db, [key]).get(key) if db is not None else cache.get_many([key]).get(key)
+            if content is None:
+                raise LookupError(f"Text blob {key} for {type(instance).__name__}.{self.name} is not available")
+            texts[key] = content
+        return texts[key]
+
+    def __set__(self, instance, value: str | None) -> None:
+        key = blob_id(value) if value is not None else None
+        setattr(instance, self.id_attr, key)
+        if key is not None:
+            instance.__dict__.setdefault("_blob_texts", {})[key] = value
+            instance.__dict__.setdefault("_blob_pending", {})[key] = value
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_blobs(session: Session, flush_context, instances) -> None:
+    contents = {}
+    for instance in (*session.new, *session.dirty):
+        pending = instance.__dict__.pop("_blob_pending", None)
+        if pending:
+            contents.update(pending)
+    store(session, contents)
+
+
+def migrate_legacy_columns(bind: Engine, batch_size: int = MIGRATE_BATCH_SIZE) -> int:
+    """Move text from pre-blob ``test_cases`` columns into ``text_blobs`` and drop them.
+
+    Returns the number of cases migrated; a no-op once the legacy columns are gone.
+    """
+    inspector = inspect(bind)
+    if "test_cases" not in inspector.get_table_names():
+        return 0
+    present = {column["name"] for column in inspector.get_columns("test_cases")}
+    legacy: List[str] = [field for field in BLOB_FIELDS if field in present]
+    if not legacy:
+        return 0
+
+    pending = " OR ".join(f"{field} IS NOT NULL" for field in legacy)
+    assignments = ", ".join(
+        f"{field}_id = COALESCE(:{field}_id, {field}_id), {field} = NULL" for field in legacy
+    )
+    migrated = 0
+    while True:
+        with Session(bind) as db, db.begin():
+            rows = db.execute(
+                text(f"SELECT id, {', '.join(legacy)} FROM test_cases WHERE {pending} LIMIT :limit"),
+                {"limit": batch_size},
+            ).mappings().all()
+            if not rows:
+                break
+            updates = [dict(row) for row in rows]
+            intern_rows(db, updates)
+            db.execute(
+                text(f"UPDATE test_cases SET {assignments} WHERE id = :id"),
+                [{"id": update["id"], **{f"{field}_id": update[f"{field}_id"] for field in legacy}} for update in updates],
+            )
+            migrated += len(rows)
+
+    with bind.begin() as conn:
+        for field in legacy:
+            conn.execute(text(f"ALTER TABLE test_cases DROP COLUMN {field}"))
+    return migrated
+
+
+if __name__ == "__main__":
+    from .database import Base, engine, upgrade_schema
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    print(f"Moved text of {migrate_legacy_columns(engine)} test cases into text_blobs")
@@ -2,17 +2,38 @@
 
 from __future__ import annotations
 
-import random
-from datetime import datetime, timedelta
-from typing import Iterable, List, Sequence, Tuple
-from uuid import UUID
+import os
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import String, desc, func, or_
+from sqlalchemy import case as sql_case
+from sqlalchemy import desc, func, literal, null, or_, select, union_all
 from sqlalchemy.orm import Session, joinedload
 
-from . import models
-from .schemas import DashboardStats, DashboardTrends, TestRunDetail, TestRunSummary, TestSuite, TestSuiteDetail
-from .utils import mock_ai
+from . import archive, blobs, durations, flakiness, insights, models, rollups, seeding, signatures, trends
+from .search import run_search_filter
+from .schemas import (
+    AffectedSuite,
+    DashboardStats,
+    DashboardTrends,
+    DashboardTrendSeries,
+    FailureCluster,
+    FlakyTest,
+    SuiteDurations,
+    TestCase,
+    TestDurations,
+    TestRunDetail,
+    TestRunIngest,
+    TestRunSummary,
+    TestSlowdown,
+    TrendSeries,
+)
+from .utils.pagination import NEXT, PREV, RunCursor, encode_cursor
+
+# Historical runs generated on first startup, spread over the last SEED_DAYS days.
+SEED_RUNS = int(os.getenv("SEED_RUNS", "25"))
+SEED_DAYS = int(os.getenv("SEED_DAYS", "30"))
 
 SUITE_SEED_DATA = [
     {
@@ -39,132 +60,729 @@ SUITE_SEED_DATA = [
 
 
 def seed_database(db: Session) -> None:
-    """Seed suites and historical runs if they do not exist."""
-    if db.query(models.TestSuite).count() == 0:
+    """Seed suites and ``SEED_RUNS`` historical runs into an empty database.
+
+    Runs are generated in memory and bulk inserted (see :mod:`app.seeding`).
+    """
+    suite_ids = list(db.scalars(select(models.TestSuite.id)))
+    if not suite_ids:
         suites = [models.TestSuite(**suite) for suite in SUITE_SEED_DATA]
         db.add_all(suites)
         db.flush()
-    else:
-        suites = db.query(models.TestSuite).all()
+        suite_ids = [suite.id for suite in suites]
 
-    if db.query(models.TestRun).count() >= 20:
+    rollups.ensure_backfilled(db)
+    durations.ensure_backfilled(db)
+    if SEED_RUNS <= 0 or db.query(models.TestRun.id).first() is not None:
         return
-
-    for _ in range(random.randint(20, 30)):
-        suite = random.choice(suites)
-        start_time = datetime.utcnow() - timedelta(days=random.randint(0, 30), hours=random.randint(0, 23))
-        mock_ai.generate_historical_run(db, suite, started_at=start_time)
+    seeding.seed_runs(db, suite_ids, runs=SEED_RUNS, cases_per_run=18, jitter=2, days=SEED_DAYS)
 
 
-def list_test_runs(
-    db: Session,
+def _filter_test_runs(
+    query,
     *,
     status: str | None = None,
     suite_id: UUID | None = None,
-    limit: int = 20,
-    offset: int = 0,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     search: str | None = None,
-) -> Tuple[List[models.TestRun], int]:
-    """Return filtered test runs."""
-    query = db.query(models.TestRun).join(models.TestSuite)
-
+):
+    """Apply the listing filters shared by the run endpoints."""
     if status:
         query = query.filter(models.TestRun.status == status)
     if suite_id:
-        query = query.filter(models.TestRun.suite_id == str(suite_id))
+        query = query.filter(models.TestRun.suite_id == suite_id)
     if start_date:
         query = query.filter(models.TestRun.started_at >= start_date)
     if end_date:
         query = query.filter(models.TestRun.started_at <= end_date)
     if search:
-        ilike = f"%{search}%"
-        query = query.filter(
-            or_(models.TestSuite.name.ilike(ilike), func.cast(models.TestRun.id, String).ilike(ilike))
-        )
+        query = query.filter(run_search_filter(search))
+    return query
+
+
+RUN_SUMMARY_COLUMNS = (
+    "id",
+    "suite_id",
+    "suite_name",
+    "status",
+    "started_at",
+    "completed_at",
+    "duration_ms",
+    "total_tests",
+    "passed_tests",
+    "failed_tests",
+)
+CASE_DETAIL_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "execution_time_ms",
+    "ai_insight",
+    "error_message",
+    "stack_trace",
+    "signature_id",
+    "created_at",
+)
+CASE_SUMMARY_COLUMNS = tuple(name for name in CASE_DETAIL_COLUMNS if name not in ("ai_insight", "stack_trace"))
+
+
+def _run_rows(db: Session):
+    """Query run summary columns (with the suite name) as plain rows."""
+    columns = [
+        models.TestSuite.name.label(name) if name == "suite_name" else getattr(models.TestRun, name)
+        for name in RUN_SUMMARY_COLUMNS
+    ]
+    return db.query(*columns).join(models.TestSuite)
+
+
+def _case_columns(names: Sequence[str]) -> list:
+    """Select case columns by field name; text fields select their blob ids."""
+    case = models.TestCase
+    return [getattr(case, f"{name}_id" if name in blobs.BLOB_FIELDS else name).label(name) for name in names]
+
+
+def _case_dicts(db: Session, rows: Iterable, names: Sequence[str]) -> List[dict]:
+    """Turn case rows from :func:`_case_columns` into dicts with their text resolved."""
+    fields = [name for name in names if name in blobs.BLOB_FIELDS]
+    items = [{name: row[name] for name in names} for row in rows]
+    texts = blobs.resolve(db, (item[name] for item in items for name in fields))
+    for item in items:
+        for name in fields:
+            item[name] = texts.get(item[name])
+    return items
+
+
+def list_test_runs(
+    db: Session,
+    *,
+    status: str | None = None,
+    suite_id: UUID | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    search: str | None = None,
+) -> Tuple[List[dict], int]:
+    """Return filtered test runs as summary dicts."""
+    query = _filter_test_runs(
+        _run_rows(db),
+        status=status,
+        suite_id=suite_id,
+        start_date=start_date,
+        end_date=end_date,
+        search=search,
+    )
 
     total = query.count()
-    data = (
-        query.options(joinedload(models.TestRun.suite))
-        .order_by(desc(models.TestRun.started_at))
-        .limit(limit)
-        .offset(offset)
-        .all()
+    rows = query.order_by(desc(models.TestRun.started_at)).limit(limit).offset(offset).all()
+    return [row._asdict() for row in rows], total
+
+
+def count_test_runs(db: Session, **filters) -> int:
+    """Count runs matching the listing filters."""
+    query = _filter_test_runs(db.query(func.count(models.TestRun.id)).join(models.TestSuite), **filters)
+    return query.scalar() or 0
+
+
+def list_test_runs_keyset(
+    db: Session,
+    *,
+    cursor: RunCursor | None = None,
+    limit: int = 20,
+    **filters,
+) -> Tuple[List[dict], bool]:
+    """Return one page of runs seeking from ``cursor`` instead of using OFFSET.
+
+    Runs are ordered by ``(started_at DESC, id DESC)``. The second element of
+    the result tells whether more rows exist beyond the page in the direction
+    of travel.
+    """
+    query = _filter_test_runs(_run_rows(db), **filters)
+    started_at, run_id = models.TestRun.started_at, models.TestRun.id
+
+    backwards = cursor is not None and cursor.direction == PREV
+    if cursor is not None:
+        # Spelled out rather than as a row-value comparison so the planner can
+        # use the started_at index as the seek bound.
+        if backwards:
+            query = query.filter(
+                started_at >= cursor.started_at,
+                or_(started_at > cursor.started_at, run_id > cursor.id),
+            )
+        else:
+            query = query.filter(
+                started_at <= cursor.started_at,
+                or_(started_at < cursor.started_at, run_id < cursor.id),
+            )
+
+    ordering = (started_at.asc(), run_id.asc()) if backwards else (started_at.desc(), run_id.desc())
+    rows = [row._asdict() for row in query.order_by(*ordering).limit(limit + 1)]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    return rows, has_more
+
+
+def paginate_test_runs(db: Session, *, limit: int = 20, offset: int = 0, **filters) -> dict:
+    """Return an offset-paginated page of runs shaped like ``PaginatedTestRuns``."""
+    runs, total = list_test_runs(db, limit=limit, offset=offset, **filters)
+    return {"data": runs, "total": total, "limit": limit, "offset": offset, "next_cursor": None, "prev_cursor": None}
+
+
+def paginate_test_runs_keyset(
+    db: Session,
+    *,
+    cursor: RunCursor | None = None,
+    limit: int = 20,
+    include_total: bool = False,
+    **filters,
+) -> dict:
+    """Return a cursor-paginated page of runs with next/prev cursors, shaped like ``PaginatedTestRuns``."""
+    runs, has_more = list_test_runs_keyset(db, cursor=cursor, limit=limit, **filters)
+    backwards = cursor is not None and cursor.direction == PREV
+
+    next_cursor = prev_cursor = None
+    if runs:
+        if has_more or backwards:
+            next_cursor = encode_cursor(runs[-1]["started_at"], runs[-1]["id"], NEXT)
+        if cursor is not None and (has_more or not backwards):
+            prev_cursor = encode_cursor(runs[0]["started_at"], runs[0]["id"], PREV)
+
+    return {
+        "data": runs,
+        "total": count_test_runs(db, **filters) if include_total else None,
+        "limit": limit,
+        "offset": 0,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+
+EXPORT_BATCH_SIZE = 1000
+RUN_EXPORT_COLUMNS = RUN_SUMMARY_COLUMNS
+CASE_EXPORT_COLUMNS = CASE_DETAIL_COLUMNS
+
+
+def iter_test_run_export(db: Session, *, include_cases: bool = False, **filters) -> Iterator[dict]:
+    """Yield filtered runs as plain dicts, newest first, without buffering the result.
+
+    Runs are read through a server-side cursor in batches of
+    ``EXPORT_BATCH_SIZE``; with ``include_cases`` the cases for each batch are
+    fetched in one query and attached under ``test_cases``.
+    """
+    run, case = models.TestRun, models.TestCase
+    query = _filter_test_runs(_run_rows(db), **filters)
+    result = db.execute(
+        query.order_by(desc(run.started_at), desc(run.id)).statement,
+        execution_options={"yield_per": EXPORT_BATCH_SIZE},
     )
-    return data, total
+
+    for partition in result.mappings().partitions():
+        cases_by_run: dict = {}
+        if include_cases:
+            case_rows = db.execute(
+                select(case.run_id, *_case_columns(CASE_EXPORT_COLUMNS))
+                .where(case.run_id.in_([row["id"] for row in partition]))
+                .order_by(case.run_id, case.created_at, case.id)
+            ).mappings().all()
+            for case_row, exported in zip(case_rows, _case_dicts(db, case_rows, CASE_EXPORT_COLUMNS)):
+                cases_by_run.setdefault(case_row["run_id"], []).append(exported)
+        for row in partition:
+            item = {name: row[name] for name in RUN_EXPORT_COLUMNS}
+            if include_cases:
+                item["test_cases"] = cases_by_run.get(row["id"], [])
+            yield item
 
 
 def get_test_run(db: Session, run_id: UUID) -> models.TestRun | None:
-    """Fetch a single test run."""
-    return (
+    """Fetch a single test run, falling back to the archive for retired runs."""
+    run = (
         db.query(models.TestRun)
         .options(joinedload(models.TestRun.suite), joinedload(models.TestRun.test_cases))
-        .filter(models.TestRun.id == str(run_id))
+        .filter(models.TestRun.id == run_id)
         .first()
     )
+    if run is None:
+        return archive.load_archived_run(db, run_id)
+    blobs.prefetch(db, run.test_cases)
+    return run
 
 
-def create_test_run(db: Session, suite_id: UUID) -> models.TestRun:
-    """Create and populate a new test run."""
-    suite = db.query(models.TestSuite).filter(models.TestSuite.id == str(suite_id)).first()
-    if not suite:
-        raise ValueError("Test suite not found")
+def _get_run_header(db: Session, run_id: UUID) -> Tuple[dict | None, models.TestRun | None]:
+    """Return the run's summary dict, plus the rebuilt run (with cases) when it comes from the archive."""
+    row = _run_rows(db).filter(models.TestRun.id == run_id).first()
+    if row is not None:
+        return row._asdict(), None
+    archived = archive.load_archived_run(db, run_id)
+    if archived is None:
+        return None, None
+    return serialize_run(archived).model_dump(), archived
 
-    run = mock_ai.start_run(db, suite)
-    mock_ai.complete_run_with_results(db, run)
-    db.flush()
-    return get_test_run(db, run.id)
-
-
-def list_test_suites(db: Session) -> List[TestSuite]:
-    """Return test suites with latest run metadata."""
-    suites = db.query(models.TestSuite).options(joinedload(models.TestSuite.runs)).all()
-    result: List[TestSuite] = []
-    for suite in suites:
-        last_run = max(suite.runs, key=lambda r: r.started_at) if suite.runs else None
-        total_tests = sum(run.total_tests for run in suite.runs)
-        result.append(
-            TestSuite(
-                id=suite.id,
-                name=suite.name,
-                description=suite.description,
-                target_url=suite.target_url,
-                created_at=suite.created_at,
-                last_run_status=last_run.status if last_run else None,
-                last_run_at=last_run.started_at if last_run else None,
-                total_tests=total_tests,
+
+def get_test_run_summary(db: Session, run_id: UUID) -> dict | None:
+    """Return a run shaped like ``TestRunSummary``, without its cases."""
+    return _get_run_header(db, run_id)[0]
+
+
+def get_run_summaries(db: Session, run_ids: Sequence[UUID]) -> List[dict]:
+    """Return summaries of the given live runs, newest first."""
+    if not run_ids:
+        return []
+    rows = _run_rows(db).filter(models.TestRun.id.in_(run_ids)).order_by(desc(models.TestRun.started_at)).all()
+    return [row._asdict() for row in rows]
+
+
+def _filter_test_cases(query, *, status: str | None = None, search: str | None = None):
+    if status:
+        query = query.filter(models.TestCase.status == status)
+    if search:
+        query = query.filter(models.TestCase.name.icontains(search, autoescape=True))
+    return query
+
+
+def _case_matches(case: models.TestCase, *, status: str | None = None, search: str | None = None) -> bool:
+    return (not status or case.status == status) and (not search or search.lower() in case.name.lower())
+
+
+def _select_test_cases(
+    db: Session,
+    run_id: UUID,
+    archived: models.TestRun | None,
+    columns: Sequence[str],
+    *,
+    status: str | None = None,
+    search: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> Tuple[List[dict], int]:
+    """Return a page of the run's matching cases as dicts, oldest first, and the match count."""
+    if archived is not None:
+        matching = [case for case in archived.test_cases if _case_matches(case, status=status, search=search)]
+        end = offset + limit if limit is not None else None
+        return [{name: getattr(case, name) for name in columns} for case in matching[offset:end]], len(matching)
+
+    case = models.TestCase
+    query = _filter_test_cases(
+        db.query(*_case_columns(columns)).filter(case.run_id == run_id), status=status, search=search
+    )
+    total = query.count() if limit is not None or offset else None
+    query = query.order_by(case.created_at, case.id).offset(offset)
+    rows = (query.limit(limit) if limit is not None else query).all()
+    cases = _case_dicts(db, (row._mapping for row in rows), columns)
+    return cases, len(cases) if total is None else total
+
+
+def get_test_run_detail(
+    db: Session, run_id: UUID, *, case_status: str | None = None, case_search: str | None = None
+) -> dict | None:
+    """Fetch a run with its (optionally filtered) cases, shaped like ``TestRunDetail``."""
+    run, archived = _get_run_header(db, run_id)
+    if run is None:
+        return None
+    run["test_cases"], _ = _select_test_cases(
+        db, run_id, archived, CASE_DETAIL_COLUMNS, status=case_status, search=case_search
+    )
+    return run
+
+
+def get_test_run_overview(db: Session, run_id: UUID) -> dict | None:
+    """Fetch a run with case counts by status, shaped like ``TestRunOverview``."""
+    run, archived = _get_run_header(db, run_id)
+    if run is None:
+        return None
+    if archived is not None:
+        counts: dict = {}
+        for case in archived.test_cases:
+            counts[case.status] = counts.get(case.status, 0) + 1
+    else:
+        case = models.TestCase
+        counts = dict(
+            db.query(case.status, func.count(case.id)).filter(case.run_id == run_id).group_by(case.status).all()
+        )
+    run["case_counts"] = counts
+    return run
+
+
+COMPARISON_CATEGORIES = ("newly_failing", "newly_passing", "still_failing", "added", "removed", "slower", "faster")
+
+
+def get_previous_run_id(db: Session, run_id: UUID) -> UUID | None:
+    """Return the id of the suite's latest completed run that started before ``run_id``."""
+    run = models.TestRun
+    current = db.query(run.suite_id, run.started_at).filter(run.id == run_id).first()
+    if current is None:
+        header, _ = _get_run_header(db, run_id)
+        if header is None:
+            return None
+        current = (header["suite_id"], header["started_at"])
+    return db.scalar(
+        select(run.id)
+        .where(run.suite_id == current[0], run.started_at < current[1], run.completed_at.is_not(None))
+        .order_by(desc(run.started_at))
+        .limit(1)
+    )
+
+
+def _classify(item: dict, min_change: float, min_delta_ms: int) -> str:
+    """Python twin of the category expression in :func:`_compare_live_runs`, for archived runs."""
+    if not item["head_cases"]:
+        return "removed"
+    if not item["base_cases"]:
+        return "added"
+    if item["head_failed"] != item["base_failed"]:
+        return "newly_failing" if item["head_failed"] else "newly_passing"
+    if item["head_failed"]:
+        return "still_failing"
+    delta, threshold = item["delta"], max(min_delta_ms, item["base_ms"] * min_change)
+    if delta >= threshold:
+        return "slower"
+    if -delta >= threshold:
+        return "faster"
+    return "unchanged"
+
+
+def _compare_live_runs(
+    db: Session, run_id: UUID, base_run_id: UUID, *, limit: int, min_change: float, min_delta_ms: int
+) -> List[dict]:
+    """Diff two live runs' cases by name in one grouped query.
+
+    Returns up to ``limit`` rows per category plus one ``unchanged`` row;
+    every row carries its category's ``total``.
+    """
+    case = models.TestCase
+    in_head = case.run_id == run_id
+    failed = case.status == "failed"
+    grouped = (
+        select(
+            case.name,
+            func.sum(sql_case((in_head, 1), else_=0)).label("head_cases"),
+            func.sum(sql_case((in_head, 0), else_=1)).label("base_cases"),
+            func.max(sql_case((in_head & failed, 1), else_=0)).label("head_failed"),
+            func.max(sql_case((~in_head & failed, 1), else_=0)).label("base_failed"),
+            func.sum(sql_case((in_head, case.execution_time_ms))).label("head_ms"),
+            func.sum(sql_case((~in_head, case.execution_time_ms))).label("base_ms"),
+            func.max(sql_case((in_head & failed, case.error_message_id))).label("error_message_id"),
+            func.max(sql_case((in_head & failed, case.signature_id))).label("signature_id"),
+        )
+        .where(case.run_id.in_([run_id, base_run_id]))
+        .group_by(case.name)
+        .subquery()
+    )
+    delta = grouped.c.head_ms - grouped.c.base_ms
+    relative = grouped.c.base_ms * min_change
+    threshold = sql_case((relative > min_delta_ms, relative), else_=min_delta_ms)
+    category = sql_case(
+        (grouped.c.head_cases == 0, "removed"),
+        (grouped.c.base_cases == 0, "added"),
+        ((grouped.c.head_failed == 1) & (grouped.c.base_failed == 0), "newly_failing"),
+        ((grouped.c.head_failed == 0) & (grouped.c.base_failed == 1), "newly_passing"),
+        (grouped.c.head_failed == 1, "still_failing"),
+        (delta >= threshold, "slower"),
+        (-delta >= threshold, "faster"),
+        else_="unchanged",
+    )
+    classified = select(grouped, delta.label("delta"), category.label("category")).cte("classified")
+    # Only changed tests are ranked; unchanged ones, usually the bulk, are just counted.
+    ranked = (
+        select(
+            classified,
+            func.row_number()
+            .over(
+                partition_by=classified.c.category,
+                order_by=(func.abs(func.coalesce(classified.c.delta, 0)).desc(), classified.c.name),
             )
+            .label("position"),
+            func.count().over(partition_by=classified.c.category).label("total"),
+        )
+        .where(classified.c.category != "unchanged")
+        .subquery()
+    )
+    placeholders = {"category": literal("unchanged"), "position": literal(1), "total": func.count()}
+    unchanged = select(
+        *[placeholders.get(column.name, null()).label(column.name) for column in ranked.c]
+    ).where(classified.c.category == "unchanged")
+    statement = union_all(select(ranked).where(ranked.c.position <= limit), unchanged)
+    return sorted(
+        (dict(row) for row in db.execute(statement).mappings()), key=lambda row: (row["category"], row["position"])
+    )
+
+
+def _compare_cases_in_python(
+    db: Session, runs: Sequence[Tuple[UUID, models.TestRun | None]], *, limit: int, min_change: float, min_delta_ms: int
+) -> List[dict]:
+    """Same result as :func:`_compare_live_runs`, for comparisons involving an archived run."""
+    grouped: dict = {}
+    columns = ("name", "status", "execution_time_ms", "error_message", "signature_id")
+    for side, (run_id, archived) in zip(("head", "base"), runs):
+        cases, _ = _select_test_cases(db, run_id, archived, columns)
+        for item in cases:
+            entry = grouped.get(item["name"])
+            if entry is None:
+                entry = grouped[item["name"]] = {
+                    "name": item["name"],
+                    **dict.fromkeys(("head_cases", "base_cases", "head_failed", "base_failed"), 0),
+                    **dict.fromkeys(("head_ms", "base_ms", "error_message", "signature_id")),
+                }
+            entry[f"{side}_cases"] += 1
+            entry[f"{side}_ms"] = (entry[f"{side}_ms"] or 0) + item["execution_time_ms"]
+            if item["status"] == "failed":
+                entry[f"{side}_failed"] = 1
+                if side == "head":
+                    entry["error_message"], entry["signature_id"] = item["error_message"], item["signature_id"]
+
+    by_category: dict = {}
+    for entry in grouped.values():
+        both = entry["head_ms"] is not None and entry["base_ms"] is not None
+        entry["delta"] = entry["head_ms"] - entry["base_ms"] if both else None
+        entry["category"] = _classify(entry, min_change, min_delta_ms)
+        by_category.setdefault(entry["category"], []).append(entry)
+    rows = []
+    for category, entries in by_category.items():
+        entries.sort(key=lambda entry: (-abs(entry["delta"] or 0), entry["name"]))
+        kept = entries[:1] if category == "unchanged" else entries[:limit]
+        rows.extend({**entry, "total": len(entries)} for entry in kept)
+    return rows
+
+
+def compare_test_runs(
+    db: Session,
+    run_id: UUID,
+    base_run_id: UUID,
+    *,
+    limit: int = 500,
+    min_change: float = 0.2,
+    min_delta_ms: int = 100,
+) -> dict | None:
+    """Diff ``run_id`` against ``base_run_id`` by test name, shaped like ``RunComparison``.
+
+    Tests count as slower or faster when their execution time moved by at
+    least ``min_delta_ms`` and by ``min_change`` of the baseline time.
+    Returns ``None`` when either run does not exist.
+    """
+    run, archived = _get_run_header(db, run_id)
+    base_run, base_archived = _get_run_header(db, base_run_id)
+    if run is None or base_run is None:
+        return None
+    options = dict(limit=limit, min_change=min_change, min_delta_ms=min_delta_ms)
+    if archived is None and base_archived is None:
+        rows = _compare_live_runs(db, run_id, base_run_id, **options)
+    else:
+        rows = _compare_cases_in_python(db, [(run_id, archived), (base_run_id, base_archived)], **options)
+
+    texts = blobs.resolve(db, (row.get("error_message_id") for row in rows))
+    comparison: dict = {"run": run, "base_run": base_run, "counts": dict.fromkeys(COMPARISON_CATEGORIES, 0)}
+    comparison["counts"]["unchanged"] = 0
+    comparison.update({category: [] for category in COMPARISON_CATEGORIES})
+    for row in rows:
+        comparison["counts"][row["category"]] = row["total"]
+        if row["category"] == "unchanged":
+            continue
+        comparison[row["category"]].append(
+            {
+                "name": row["name"],
+                "status": ("failed" if row["head_failed"] else "passed") if row["head_cases"] else None,
+                "base_status": ("failed" if row["base_failed"] else "passed") if row["base_cases"] else None,
+                "execution_time_ms": row["head_ms"],
+                "base_execution_time_ms": row["base_ms"],
+                "duration_delta_ms": row["delta"],
+                "error_message": row.get("error_message") or texts.get(row.get("error_message_id")),
+                "signature_id": row["signature_id"],
+            }
         )
-    return result
+    return comparison
 
 
-def get_test_suite_detail(db: Session, suite_id: UUID) -> TestSuiteDetail | None:
-    """Return suite detail with recent runs."""
-    suite = (
-        db.query(models.TestSuite)
-        .options(joinedload(models.TestSuite.runs))
-        .filter(models.TestSuite.id == str(suite_id))
+def list_test_cases(
+    db: Session,
+    run_id: UUID,
+    *,
+    status: str | None = None,
+    search: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    details: bool = False,
+) -> dict | None:
+    """Return a page of a run's cases shaped like ``PaginatedTestCases``.
+
+    Without ``details`` AI insights and stack traces are omitted.
+    """
+    run, archived = _get_run_header(db, run_id)
+    if run is None:
+        return None
+    cases, total = _select_test_cases(
+        db,
+        run_id,
+        archived,
+        CASE_DETAIL_COLUMNS if details else CASE_SUMMARY_COLUMNS,
+        status=status,
+        search=search,
+        limit=limit,
+        offset=offset,
+    )
+    return {"data": cases, "total": total, "limit": limit, "offset": offset}
+
+
+def get_test_case(db: Session, run_id: UUID, case_id: UUID) -> TestCase | None:
+    """Fetch a single case of a run with all of its text fields."""
+    case = (
+        db.query(models.TestCase)
+        .filter(models.TestCase.run_id == run_id, models.TestCase.id == case_id)
         .first()
     )
+    if case is None:
+        archived = archive.load_archived_run(db, run_id)
+        case = next((item for item in archived.test_cases if item.id == case_id), None) if archived else None
+    return TestCase.model_validate(case) if case is not None else None
+
+
+def queue_test_run(db: Session, suite_id: UUID) -> dict:
+    """Insert a ``queued`` run for the executor, shaped like ``TestRunDetail``."""
+    suite = db.query(models.TestSuite).filter(models.TestSuite.id == suite_id).first()
     if not suite:
-        return None
+        raise ValueError("Test suite not found")
 
-    sorted_runs = sorted(suite.runs, key=lambda r: r.started_at, reverse=True)
-    summaries = [serialize_run(run) for run in sorted_runs[:5]]
+    run = models.TestRun(suite_id=suite.id, status="queued", started_at=datetime.utcnow())
+    db.add(run)
+    db.flush()
+    return {**serialize_run(run).model_dump(), "test_cases": []}
 
-    return TestSuiteDetail(
-        id=suite.id,
-        name=suite.name,
-        description=suite.description,
-        target_url=suite.target_url,
-        created_at=suite.created_at,
-        last_run_status=sorted_runs[0].status if sorted_runs else None,
-        last_run_at=sorted_runs[0].started_at if sorted_runs else None,
-        total_tests=sum(run.total_tests for run in suite.runs),
-        recent_runs=summaries,
+
+def ingest_test_runs(db: Session, runs: Sequence[TestRunIngest]) -> List[UUID | None]:
+    """Insert externally executed runs and their cases with batched INSERTs.
+
+    Rows go through executemany (multi-row ``INSERT ... VALUES`` on
+    PostgreSQL) instead of per-object unit-of-work flushes. Returns the new
+    run id for each input, or ``None`` where the suite does not exist.
+    """
+    suite_ids = {run.suite_id for run in runs}
+    known_suites = (
+        {suite_id for (suite_id,) in db.query(models.TestSuite.id).filter(models.TestSuite.id.in_(suite_ids))}
+        if suite_ids
+        else set()
     )
 
+    run_ids: List[UUID | None] = []
+    run_rows: List[dict] = []
+    case_rows: List[dict] = []
+    occurrences: List[signatures.Occurrence] = []
+    for run in runs:
+        if run.suite_id not in known_suites:
+            run_ids.append(None)
+            continue
+
+        run_id = uuid4()
+        passed = sum(1 for case in run.test_cases if case.status == "passed")
+        failed = len(run.test_cases) - passed
+        duration = run.duration_ms
+        if duration is None:
+            duration = sum(case.execution_time_ms for case in run.test_cases)
+        run_rows.append(
+            {
+                "id": run_id,
+                "suite_id": run.suite_id,
+                "status": "passed" if failed == 0 else "failed",
+                "started_at": run.started_at,
+                "completed_at": run.completed_at or run.started_at + timedelta(milliseconds=duration),
+                "duration_ms": duration,
+                "total_tests": len(run.test_cases),
+                "passed_tests": passed,
+                "failed_tests": failed,
+            }
+        )
+        for case in run.test_cases:
+            case_row = {"id": uuid4(), "run_id": run_id, "signature_id": None, **case.model_dump()}
+            if case.status == "failed":
+                case_row["signature_id"], normalized = signatures.sign(case.error_message, case.stack_trace)
+                occurrences.append(
+                    signatures.Occurrence(
+                        case_row["signature_id"], normalized, case.error_message, run.suite_id, run.started_at
+                    )
+                )
+            case_rows.append(case_row)
+        run_ids.append(run_id)
+
+    if run_rows:
+        db.execute(models.TestRun.__table__.insert(), run_rows)
+        rollups.record_runs(db, run_rows)
+    if case_rows:
+        queued_at = datetime.utcnow()
+        for row in case_rows:
+            row["insight_queued_at"] = queued_at if row["ai_insight"] is None else None
+        insights.fill_on_commit(
+            db,
+            [
+                insights.pending_case(
+                    row["id"], row["name"], row["status"], row["error_message"], row["stack_trace"], row["signature_id"]
+                )
+                for row in case_rows
+                if row["ai_insight"] is None
+            ],
+        )
+        blobs.intern_rows(db, case_rows)
+        db.execute(models.TestCase.__table__.insert(), case_rows)
+        signatures.record(db, occurrences)
+    durations.record(db, run_rows, case_rows)
+    return run_ids
+
+
+def _suite_total_tests(db: Session, suite_id=None):
+    """Sum ``total_tests`` per suite from the daily rollups."""
+    rollup = models.RunDailyRollup
+    query = db.query(rollup.suite_id, func.sum(rollup.total_tests)).group_by(rollup.suite_id)
+    if suite_id is not None:
+        query = query.filter(rollup.suite_id == suite_id)
+    return {row_suite_id: int(total or 0) for row_suite_id, total in query.all()}
+
+
+SUITE_COLUMNS = ("id", "name", "description", "target_url", "created_at")
+
+
+def list_test_suites(db: Session) -> List[dict]:
+    """Return test suites with latest run metadata, shaped like ``TestSuite``."""
+    run = models.TestRun
+    suite = models.TestSuite
+    latest = (
+        db.query(run.status)
+        .filter(run.suite_id == suite.id)
+        .order_by(desc(run.started_at), desc(run.id))
+        .limit(1)
+        .correlate(suite)
+        .scalar_subquery()
+    )
+    last_run_at = db.query(func.max(run.started_at)).filter(run.suite_id == suite.id).correlate(suite).scalar_subquery()
+
+    columns = [getattr(suite, name) for name in SUITE_COLUMNS]
+    rows = db.query(*columns, latest.label("last_run_status"), last_run_at.label("last_run_at")).all()
+    totals = _suite_total_tests(db)
+    return [{**row._asdict(), "total_tests": totals.get(row.id, 0)} for row in rows]
+
+
+def get_test_suite_detail(db: Session, suite_id: UUID, *, recent: int = 5) -> dict | None:
+    """Return suite detail with recent runs, shaped like ``TestSuiteDetail``."""
+    suite = models.TestSuite
+    row = db.query(*[getattr(suite, name) for name in SUITE_COLUMNS]).filter(suite.id == suite_id).first()
+    if not row:
+        return None
+
+    recent_runs = [
+        run._asdict()
+        for run in _run_rows(db)
+        .filter(models.TestRun.suite_id == suite_id)
+        .order_by(desc(models.TestRun.started_at), desc(models.TestRun.id))
+        .limit(recent)
+    ]
+    return {
+        **row._asdict(),
+        "last_run_status": recent_runs[0]["status"] if recent_runs else None,
+        "last_run_at": recent_runs[0]["started_at"] if recent_runs else None,
+        "total_tests": _suite_total_tests(db, suite_id).get(suite_id, 0),
+        "recent_runs": recent_runs,
+    }
+
 
 def serialize_run(run: models.TestRun) -> TestRunSummary:
     """Serialize a TestRun ORM model."""
@@ -189,11 +807,19 @@ def serialize_run_detail(run: models.TestRun) -> TestRunDetail:
 
 
 def get_dashboard_stats(db: Session) -> DashboardStats:
-    """Aggregate dashboard metrics."""
-    total_runs = db.query(func.count(models.TestRun.id)).scalar() or 0
-    total_tests = db.query(func.coalesce(func.sum(models.TestRun.total_tests), 0)).scalar() or 0
-    failed_tests = db.query(func.coalesce(func.sum(models.TestRun.failed_tests), 0)).scalar() or 0
-    avg_duration = db.query(func.coalesce(func.avg(models.TestRun.duration_ms), 0)).scalar() or 0.0
+    """Aggregate dashboard metrics from the daily rollups."""
+    rollup = models.RunDailyRollup
+    row = db.query(
+        func.coalesce(func.sum(rollup.runs), 0).label("total_runs"),
+        func.coalesce(func.sum(rollup.total_tests), 0).label("total_tests"),
+        func.coalesce(func.sum(rollup.failed_tests), 0).label("failed_tests"),
+        func.coalesce(func.sum(rollup.duration_sum_ms), 0).label("duration_sum"),
+        func.coalesce(func.sum(rollup.duration_count), 0).label("duration_count"),
+    ).one()
+    total_runs = int(row.total_runs)
+    total_tests = int(row.total_tests)
+    failed_tests = int(row.failed_tests)
+    avg_duration = (row.duration_sum / row.duration_count) if row.duration_count else 0.0
     passed_tests = total_tests - failed_tests
     pass_rate = (passed_tests / total_tests * 100) if total_tests else 0.0
 
@@ -211,15 +837,16 @@ def get_dashboard_trends(db: Session, *, days: int = 7) -> DashboardTrends:
     end_date = datetime.utcnow().date()
     start_date = end_date - timedelta(days=days - 1)
 
+    rollup = models.RunDailyRollup
     rows = (
         db.query(
-            func.date(models.TestRun.started_at).label("day"),
-            func.sum(models.TestRun.passed_tests).label("passed"),
-            func.sum(models.TestRun.failed_tests).label("failed"),
+            rollup.day.label("day"),
+            func.sum(rollup.passed_tests).label("passed"),
+            func.sum(rollup.failed_tests).label("failed"),
         )
-        .filter(models.TestRun.started_at >= start_date)
-        .group_by("day")
-        .order_by("day")
+        .filter(rollup.day >= start_date)
+        .group_by(rollup.day)
+        .order_by(rollup.day)
         .all()
     )
 
@@ -236,3 +863,277 @@ def get_dashboard_trends(db: Session, *, days: int = 7) -> DashboardTrends:
         failed_counts.append(int(row.failed) if row else 0)
 
     return DashboardTrends(dates=dates, passed=passed_counts, failed=failed_counts)
+
+
+def get_trend_series(
+    db: Session,
+    *,
+    start: datetime,
+    end: datetime,
+    tz: tzinfo,
+    granularity: str = "day",
+    group_by: str = "none",
+    suite_id: UUID | None = None,
+    max_points: int = 500,
+) -> DashboardTrendSeries:
+    """Return run and test counts between the aware ``start`` and ``end``, bucketed in ``tz``.
+
+    Buckets are widened past ``granularity`` when needed to stay within
+    ``max_points``. Counts come from the UTC daily rollups when ``tz`` keeps a
+    zero offset and buckets are at least a day wide, otherwise from the hourly
+    rollups, grouped by local day in the database for day and wider buckets.
+    Raw runs are never read. ``group_by="suite"`` returns one series
+    per suite instead of a single ``all`` series.
+    """
+    buckets = trends.plan(granularity, start, end, tz, max_points)
+    span_start, span_end = buckets.span()
+    hourly = models.RunHourlyRollup
+    if buckets.unit == "hour":
+        rollup, key = hourly, hourly.hour
+    elif trends.utc_aligned(tz, span_start, span_end):
+        rollup, key = models.RunDailyRollup, models.RunDailyRollup.day
+    else:
+        rollup, key = hourly, trends.local_day(db, hourly.hour, trends.offset_segments(tz, span_start, span_end))
+    if rollup is hourly:
+        bounds = (hourly.hour >= span_start.replace(tzinfo=None), hourly.hour < span_end.replace(tzinfo=None))
+    else:
+        bounds = (rollup.day >= span_start.date(), rollup.day < span_end.date())
+    by_suite = group_by == "suite"
+    query = db.query(
+        key,
+        rollup.suite_id if by_suite else literal("all"),
+        func.sum(rollup.runs),
+        func.sum(func.coalesce(rollup.failed_runs, 0)),
+        func.sum(rollup.passed_tests),
+        func.sum(rollup.failed_tests),
+        func.sum(rollup.duration_sum_ms),
+        func.sum(rollup.duration_count),
+    ).filter(*bounds)
+    if suite_id is not None:
+        query = query.filter(rollup.suite_id == suite_id)
+    query = query.group_by(key, rollup.suite_id) if by_suite else query.group_by(key)
+
+    counters = ("runs", "failed_runs", "passed_tests", "failed_tests", "duration_sum_ms", "duration_count")
+    series: dict = {}
+    for bucket_key, series_key, *values in query:
+        if buckets.unit == "hour":
+            position = buckets.position(bucket_key.replace(tzinfo=timezone.utc))
+        else:
+            position = buckets.position_of_day(bucket_key)
+        if position is None:
+            continue
+        totals = series.get(series_key)
+        if totals is None:
+            totals = series[series_key] = {name: [0] * buckets.count for name in counters}
+        for name, value in zip(counters, values):
+            totals[name][position] += int(value or 0)
+
+    names = _suite_names(db) if by_suite else {"all": "All suites"}
+    result = [
+        TrendSeries(
+            key=str(series_key),
+            label=names.get(series_key, ""),
+            runs=totals["runs"],
+            failed_runs=totals["failed_runs"],
+            passed_tests=totals["passed_tests"],
+            failed_tests=totals["failed_tests"],
+            avg_duration_ms=[
+                round(total / count, 2) if count else None
+                for total, count in zip(totals["duration_sum_ms"], totals["duration_count"])
+            ],
+        )
+        for series_key, totals in series.items()
+    ]
+    result.sort(key=lambda item: item.label)
+    return DashboardTrendSeries(
+        granularity=buckets.unit,
+        step=buckets.step,
+        downsampled=(buckets.unit, buckets.step) != (granularity, 1),
+        timezone=str(tz),
+        start=span_start.astimezone(tz),
+        end=span_end.astimezone(tz),
+        buckets=buckets.starts(),
+        series=result,
+    )
+
+
+def list_failure_clusters(db: Session, *, suite_id: UUID | None = None, limit: int = 50) -> List[FailureCluster]:
+    """Return the most frequent failure signatures from the precomputed counters."""
+    signature, per_suite, suite = models.FailureSignature, models.FailureSignatureSuite, models.TestSuite
+    if suite_id:
+        rows = (
+            db.query(signature, per_suite.occurrences, per_suite.last_seen)
+            .join(per_suite, per_suite.signature_id == signature.id)
+            .filter(per_suite.suite_id == suite_id)
+            .order_by(desc(per_suite.occurrences), desc(per_suite.last_seen))
+            .limit(limit)
+            .all()
+        )
+    else:
+        rows = [
+            (row, row.occurrences, row.last_seen)
+            for row in db.query(signature).order_by(desc(signature.occurrences), desc(signature.last_seen)).limit(limit)
+        ]
+
+    affected: dict = {}
+    if rows:
+        suite_rows = (
+            db.query(per_suite, suite.name)
+            .join(suite, suite.id == per_suite.suite_id)
+            .filter(per_suite.signature_id.in_([row[0].id for row in rows]))
+            .order_by(desc(per_suite.occurrences))
+        )
+        for entry, suite_name in suite_rows:
+            affected.setdefault(entry.signature_id, []).append(
+                AffectedSuite(
+                    suite_id=entry.suite_id,
+                    suite_name=suite_name,
+                    occurrences=entry.occurrences,
+                    last_seen=entry.last_seen,
+                )
+            )
+
+    return [
+        FailureCluster(
+            signature_id=row.id,
+            normalized=row.normalized,
+            sample_error_message=row.sample_error_message,
+            occurrences=occurrences,
+            first_seen=row.first_seen,
+            last_seen=last_seen,
+            affected_suites=affected.get(row.id, []),
+        )
+        for row, occurrences, last_seen in rows
+    ]
+
+
+def list_flaky_tests(
+    db: Session,
+    *,
+    suite_id: UUID | None = None,
+    window: int = flakiness.DEFAULT_WINDOW,
+    min_runs: int = 5,
+    classification: str | None = None,
+    limit: int = 50,
+) -> List[FlakyTest]:
+    """Rank tests by flakiness over each suite's last ``window`` runs."""
+    query = db.query(models.TestSuite.id, models.TestSuite.name)
+    if suite_id:
+        query = query.filter(models.TestSuite.id == suite_id)
+
+    results: List[FlakyTest] = []
+    for current_suite_id, suite_name in query.all():
+        for stats in flakiness.analyzer.analyze(db, current_suite_id, window=window):
+            if stats.runs < min_runs or (classification and stats.classification != classification):
+                continue
+            results.append(FlakyTest(suite_id=current_suite_id, suite_name=suite_name, **stats._asdict()))
+    results.sort(key=lambda item: (item.flakiness_score, item.failures), reverse=True)
+    return results[:limit]
+
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def _percentiles(sketch) -> dict:
+    return {
+        "count": sketch.count,
+        "mean_ms": round(sketch.mean, 2),
+        **{f"{name}_ms": round(sketch.quantile(q), 2) for name, q in PERCENTILES.items()},
+        "max_ms": sketch.max,
+    }
+
+
+def _suite_names(db: Session) -> dict:
+    return dict(db.query(models.TestSuite.id, models.TestSuite.name).all())
+
+
+def _day_range(days: int, *, ending_days_ago: int = 0) -> Tuple:
+    end = datetime.utcnow().date() - timedelta(days=ending_days_ago)
+    return end - timedelta(days=days - 1), end
+
+
+def get_suite_durations(db: Session, *, days: int = 30, suite_id: UUID | None = None) -> List[SuiteDurations]:
+    """Return run duration percentiles per suite over the last ``days`` days, slowest p90 first."""
+    start, end = _day_range(days)
+    sketches = durations.merged(db, start=start, end=end, tests=False, suite_id=suite_id)
+    names = _suite_names(db)
+    results = [
+        SuiteDurations(suite_id=key[0], suite_name=names.get(key[0], ""), **_percentiles(sketch))
+        for key, sketch in sketches.items()
+        if sketch.count
+    ]
+    results.sort(key=lambda item: item.p90_ms, reverse=True)
+    return results
+
+
+def list_test_durations(
+    db: Session,
+    *,
+    days: int = 30,
+    suite_id: UUID | None = None,
+    sort: str = "p90",
+    min_runs: int = 1,
+    limit: int = 50,
+) -> List[TestDurations]:
+    """Return the slowest tests by execution time percentile over the last ``days`` days."""
+    start, end = _day_range(days)
+    sketches = durations.merged(db, start=start, end=end, tests=True, suite_id=suite_id)
+    names = _suite_names(db)
+    results = [
+        TestDurations(suite_id=key[0], suite_name=names.get(key[0], ""), test_name=key[1], **_percentiles(sketch))
+        for key, sketch in sketches.items()
+        if sketch.count >= max(min_runs, 1)
+    ]
+    results.sort(key=lambda item: getattr(item, f"{sort}_ms"), reverse=True)
+    return results[:limit]
+
+
+def list_test_slowdowns(
+    db: Session,
+    *,
+    days: int = 7,
+    baseline_days: int = 28,
+    suite_id: UUID | None = None,
+    percentile: str = "p90",
+    threshold: float = 0.2,
+    min_runs: int = 5,
+    limit: int = 50,
+) -> List[TestSlowdown]:
+    """Return tests whose ``percentile`` rose by at least ``threshold`` versus the preceding baseline.
+
+    Compares the last ``days`` days with the ``baseline_days`` days before
+    them; largest increase first.
+    """
+    q = PERCENTILES[percentile]
+    start, end = _day_range(days)
+    recent = durations.merged(db, start=start, end=end, tests=True, suite_id=suite_id)
+    baseline_start, baseline_end = _day_range(baseline_days, ending_days_ago=days)
+    baseline = durations.merged(db, start=baseline_start, end=baseline_end, tests=True, suite_id=suite_id)
+    names = _suite_names(db)
+
+    results: List[TestSlowdown] = []
+    for key, sketch in recent.items():
+        before = baseline.get(key)
+        if before is None or sketch.count < min_runs or before.count < min_runs:
+            continue
+        recent_ms, baseline_ms = sketch.quantile(q), before.quantile(q)
+        if not baseline_ms:
+            continue
+        change = recent_ms / baseline_ms - 1
+        if change < threshold:
+            continue
+        results.append(
+            TestSlowdown(
+                suite_id=key[0],
+                suite_name=names.get(key[0], ""),
+                test_name=key[1],
+                percentile=percentile,
+                recent_ms=round(recent_ms, 2),
+                baseline_ms=round(baseline_ms, 2),
+                change=round(change, 4),
+                recent_count=sketch.count,
+                baseline_count=before.count,
+            )
+        )
+    results.sort(key=lambda item: item.change, reverse=True)
+    return results[:limit]
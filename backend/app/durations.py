@@ -0,0 +1,180 @@
+"""Duration percentiles from incrementally maintained quantile sketches.
+
+Completed runs fold their duration, and their cases' execution times, into
+per-day sketches keyed by suite and test name (see :mod:`app.utils.sketch`)
+inside the writer's transaction. Percentile queries merge the sketches of the
+requested days, reading one small row per suite, test and day instead of
+scanning ``test_cases``. :func:`rebuild` recomputes the table from raw cases
+and is exposed as ``python -m app.durations``.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, Mapping, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import upsert_insert
+from .rollups import rollup_day
+from .utils.sketch import QuantileSketch
+
+# ``test_name`` of the rows holding whole-run durations.
+RUN_DURATION = ""
+_KEY_CHUNK = 500
+_INSERT_CHUNK = 5000
+
+SketchKey = Tuple[date, UUID, str]
+
+
+def record_run(db: Session, run: models.TestRun, cases: Sequence[models.TestCase]) -> None:
+    """Add a completed ORM run and its cases to the day sketches."""
+    record(
+        db,
+        [{"id": run.id, "suite_id": run.suite_id, "started_at": run.started_at, "duration_ms": run.duration_ms}],
+        [{"run_id": run.id, "name": case.name, "execution_time_ms": case.execution_time_ms} for case in cases],
+    )
+
+
+def record(db: Session, runs: Iterable[Mapping], cases: Iterable[Mapping]) -> None:
+    """Add completed run rows and their case rows to the day sketches.
+
+    Runs need ``id``, ``suite_id``, ``started_at`` and ``duration_ms``; cases
+    need ``run_id``, ``name`` and ``execution_time_ms``.
+    """
+    placed: Dict[object, Tuple[date, UUID]] = {}
+    sketches: Dict[SketchKey, QuantileSketch] = {}
+    for run in runs:
+        day = rollup_day(run["started_at"])
+        placed[run["id"]] = (day, run["suite_id"])
+        if run["duration_ms"] is not None:
+            sketches.setdefault((day, run["suite_id"], RUN_DURATION), QuantileSketch()).add(run["duration_ms"])
+    for case in cases:
+        day, suite_id = placed[case["run_id"]]
+        sketches.setdefault((day, suite_id, case["name"]), QuantileSketch()).add(case["execution_time_ms"])
+    _merge_into(db, sketches)
+
+
+def _merge_into(db: Session, sketches: Dict[SketchKey, QuantileSketch]) -> None:
+    """Store ``sketches``, merging them into rows that already exist.
+
+    New rows are inserted whole in one statement. Rows that already existed
+    are locked in key order before being read, so concurrent writers touching
+    the same days serialize instead of losing updates.
+    """
+    if not sketches:
+        return
+    table = models.DurationSketch.__table__
+    key_columns = (table.c.day, table.c.suite_id, table.c.test_name)
+    inserted = db.execute(
+        upsert_insert(db)(table).on_conflict_do_nothing(index_elements=list(key_columns)).returning(*key_columns),
+        [
+            {"day": day, "suite_id": suite_id, "test_name": test_name, "count": sketch.count, "sketch": sketch.dumps()}
+            for (day, suite_id, test_name), sketch in sketches.items()
+        ],
+    )
+    existing = sorted(sketches.keys() - {tuple(row) for row in inserted})
+    updates = []
+    for offset in range(0, len(existing), _KEY_CHUNK):
+        chunk = existing[offset : offset + _KEY_CHUNK]
+        wanted = set(chunk)
+        rows = db.execute(
+            select(*key_columns, table.c.sketch)
+            .where(
+                table.c.day.between(chunk[0][0], chunk[-1][0]),
+                table.c.suite_id.in_({suite_id for _, suite_id, _ in chunk}),
+            )
+            .order_by(*key_columns)
+            .with_for_update()
+        )
+        for day, suite_id, test_name, stored in rows:
+            if (day, suite_id, test_name) not in wanted:
+                continue
+            sketch = QuantileSketch.loads(stored).merge(sketches[(day, suite_id, test_name)])
+            updates.append(
+                {
+                    "key_day": day,
+                    "key_suite_id": suite_id,
+                    "key_test_name": test_name,
+                    "count": sketch.count,
+                    "sketch": sketch.dumps(),
+                }
+            )
+    if not updates:
+        return
+    db.execute(
+        update(table)
+        .where(
+            table.c.day == bindparam("key_day"),
+            table.c.suite_id == bindparam("key_suite_id"),
+            table.c.test_name == bindparam("key_test_name"),
+        )
+        .values(count=bindparam("count"), sketch=bindparam("sketch")),
+        updates,
+    )
+
+
+def merged(
+    db: Session, *, start: date, end: date, tests: bool, suite_id: UUID | None = None
+) -> Dict[Tuple[UUID, str], QuantileSketch]:
+    """Merge the day sketches from ``start`` to ``end`` (inclusive) per suite and test name.
+
+    ``tests`` selects per-test execution times; otherwise run durations.
+    """
+    sketch = models.DurationSketch
+    query = db.query(sketch.suite_id, sketch.test_name, sketch.sketch).filter(sketch.day >= start, sketch.day <= end)
+    query = query.filter(sketch.test_name != RUN_DURATION if tests else sketch.test_name == RUN_DURATION)
+    if suite_id is not None:
+        query = query.filter(sketch.suite_id == suite_id)
+    result: Dict[Tuple[UUID, str], QuantileSketch] = {}
+    for row_suite_id, test_name, stored in query:
+        key = (row_suite_id, test_name)
+        day_sketch = QuantileSketch.loads(stored)
+        if key in result:
+            result[key].merge(day_sketch)
+        else:
+            result[key] = day_sketch
+    return result
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every sketch from raw runs and cases; returns the row count."""
+    run, case = models.TestRun, models.TestCase
+    sketches: Dict[SketchKey, QuantileSketch] = {}
+    completed = run.completed_at.is_not(None)
+    for suite_id, started_at, duration_ms in db.execute(
+        select(run.suite_id, run.started_at, run.duration_ms).where(completed, run.duration_ms.is_not(None))
+    ).yield_per(10000):
+        sketches.setdefault((rollup_day(started_at), suite_id, RUN_DURATION), QuantileSketch()).add(duration_ms)
+    cases = select(run.suite_id, run.started_at, case.name, case.execution_time_ms).join(case, case.run_id == run.id)
+    for suite_id, started_at, name, execution_time_ms in db.execute(cases.where(completed)).yield_per(10000):
+        sketches.setdefault((rollup_day(started_at), suite_id, name), QuantileSketch()).add(execution_time_ms)
+
+    table = models.DurationSketch.__table__
+    db.execute(delete(table))
+    rows = [
+        {"day": day, "suite_id": suite_id, "test_name": test_name, "count": sketch.count, "sketch": sketch.dumps()}
+        for (day, suite_id, test_name), sketch in sketches.items()
+    ]
+    for offset in range(0, len(rows), _INSERT_CHUNK):
+        db.execute(table.insert(), rows[offset : offset + _INSERT_CHUNK])
+    return len(rows)
+
+
+def ensure_backfilled(db: Session) -> None:
+    """Rebuild the sketches when completed runs exist but none has been recorded."""
+    if db.query(models.DurationSketch.day).first() is not None:
+        return
+    if db.query(models.TestRun.id).filter(models.TestRun.completed_at.is_not(None)).first() is not None:
+        rebuild(db)
+
+
+if __name__ == "__main__":
+    from .database import Base, engine, session_scope
+
+    Base.metadata.create_all(bind=engine, tables=[models.DurationSketch.__table__])
+    with session_scope() as session:
+        print(f"Rebuilt {rebuild(session)} duration sketches")
@@ -0,0 +1,216 @@
+"""Flaky-test detection over recent run history.
+
+For every (suite, test name) the analyzer looks at the last ``window``
+completed runs of the suite and computes pass/fail flip rate, failure streaks
+and a flakiness score. Statistics are computed with NumPy over flat status
+arrays rather than per-case Python loops. NumPy is imported on first use to
+keep it off the API's cold start.
+
+Per-suite histories are cached in process, for at most
+``FLAKINESS_CACHE_MAX_HISTORIES`` (suite, window) pairs, least recently used
+first out. A refresh reads the ids of the suite's last ``window`` completed
+runs, loads cases only for runs not cached yet and drops the rest. Runs that
+started earlier but completed later, and back-dated ingests, are therefore
+picked up on the next request.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Sequence
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from . import models
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_WINDOW = 100
+FLAKY_FLIP_RATE = 0.2
+BROKEN_STREAK = 3
+CACHE_MAX_HISTORIES = int(os.getenv("FLAKINESS_CACHE_MAX_HISTORIES", "64"))
+_LOAD_CHUNK = 500
+
+
+class TestStats(NamedTuple):
+    """Flakiness statistics for one test name within a suite."""
+
+    test_name: str
+    runs: int
+    failures: int
+    flip_rate: float
+    current_failure_streak: int
+    max_failure_streak: int
+    last_status: str
+    flakiness_score: float
+    classification: str
+
+
+class _RunStatuses(NamedTuple):
+    started_at: datetime
+    codes: np.ndarray
+    failed: np.ndarray
+
+
+def compute_stats(runs: Sequence[_RunStatuses], names: Sequence[str], min_runs: int = 1) -> List[TestStats]:
+    """Compute per-test statistics for runs ordered oldest to newest.
+
+    A name that appears more than once in a run counts as one observation.
+    """
+    import numpy as np
+
+    if not runs:
+        return []
+    codes = np.concatenate([run.codes for run in runs])
+    failed = np.concatenate([run.failed for run in runs])
+    if codes.size == 0:
+        return []
+    positions = np.repeat(np.arange(len(runs)), [run.codes.size for run in runs])
+
+    # Group observations per test, chronologically within each group, and
+    # collapse repeats of a name within one run to a single status: failed
+    # if any of them failed.
+    order = np.lexsort((positions, codes))
+    codes, positions, failed = codes[order], positions[order], failed[order]
+    distinct = np.ones(codes.size, dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (positions[1:] != positions[:-1])
+    starts = np.flatnonzero(distinct)
+    codes, failed = codes[starts], np.logical_or.reduceat(failed, starts)
+    size = len(names)
+
+    observations = np.bincount(codes, minlength=size)
+    failures = np.bincount(codes, weights=failed, minlength=size).astype(np.int64)
+
+    same_test = codes[1:] == codes[:-1]
+    flipped = same_test & (failed[1:] != failed[:-1])
+    flips = np.bincount(codes[1:], weights=flipped, minlength=size)
+    flip_rate = flips / np.maximum(observations - 1, 1)
+
+    # Failure streaks: a new segment starts at every pass and at every test
+    # boundary, so each segment's failure count is one streak.
+    group_start = np.ones(codes.size, dtype=bool)
+    group_start[1:] = ~same_test
+    segment = np.cumsum(~failed | group_start) - 1
+    segment_failures = np.bincount(segment, weights=failed).astype(np.int64)
+    segment_code = np.empty(segment_failures.size, dtype=codes.dtype)
+    segment_code[segment] = codes
+    max_streak = np.zeros(size, dtype=np.int64)
+    np.maximum.at(max_streak, segment_code, segment_failures)
+
+    present = observations > 0
+    last_index = np.cumsum(observations)[present] - 1
+    current_streak = np.zeros(size, dtype=np.int64)
+    current_streak[present] = segment_failures[segment[last_index]]
+    last_failed = np.zeros(size, dtype=bool)
+    last_failed[present] = failed[last_index]
+
+    mixed = (failures > 0) & (failures < observations)
+    score = np.where(mixed, flip_rate, 0.0)
+
+    results = []
+    for code in np.flatnonzero(present & (observations >= min_runs)):
+        if current_streak[code] >= BROKEN_STREAK:
+            classification = "broken"
+        elif score[code] >= FLAKY_FLIP_RATE:
+            classification = "flaky"
+        else:
+            classification = "stable"
+        results.append(
+            TestStats(
+                test_name=names[code],
+                runs=int(observations[code]),
+                failures=int(failures[code]),
+                flip_rate=round(float(flip_rate[code]), 4),
+                current_failure_streak=int(current_streak[code]),
+                max_failure_streak=int(max_streak[code]),
+                last_status="failed" if last_failed[code] else "passed",
+                flakiness_score=round(float(score[code]), 4),
+                classification=classification,
+            )
+        )
+    results.sort(key=lambda stats: (stats.flakiness_score, stats.failures), reverse=True)
+    return results
+
+
+class _SuiteHistory:
+    def __init__(self) -> None:
+        self.runs: "OrderedDict[object, _RunStatuses]" = OrderedDict()
+        self.names: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.stats: List[TestStats] | None = None
+        self.lock = threading.Lock()
+
+
+class FlakinessAnalyzer:
+    """Caches per-suite status histories and their computed statistics."""
+
+    def __init__(self, max_histories: int = CACHE_MAX_HISTORIES) -> None:
+        self.max_histories = max_histories
+        self._histories: "OrderedDict[tuple, _SuiteHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histories.clear()
+
+    def analyze(self, db: Session, suite_id, *, window: int = DEFAULT_WINDOW) -> List[TestStats]:
+        """Return statistics for every test seen in the suite's last ``window`` runs."""
+        key = (suite_id, window)
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                history = self._histories[key] = _SuiteHistory()
+            self._histories.move_to_end(key)
+            while len(self._histories) > self.max_histories:
+                self._histories.popitem(last=False)
+        with history.lock:
+            if self._refresh(db, history, suite_id, window) or history.stats is None:
+                history.stats = compute_stats(list(history.runs.values()), history.names)
+            return history.stats
+
+    def _refresh(self, db: Session, history: _SuiteHistory, suite_id, window: int) -> bool:
+        import numpy as np
+
+        run = models.TestRun
+        latest = (
+            db.query(run.id, run.started_at)
+            .filter(run.suite_id == suite_id, run.completed_at.is_not(None))
+            .order_by(desc(run.started_at), desc(run.id))
+            .limit(window)
+            .all()
+        )
+        latest.reverse()
+        new_runs = [(run_id, started_at) for run_id, started_at in latest if run_id not in history.runs]
+        if not new_runs and len(latest) == len(history.runs):
+            return False
+
+        cases: Dict[object, tuple[list, list]] = {run_id: ([], []) for run_id, _ in new_runs}
+        run_ids = list(cases)
+        case = models.TestCase
+        for offset in range(0, len(run_ids), _LOAD_CHUNK):
+            rows = db.query(case.run_id, case.name, case.status).filter(
+                case.run_id.in_(run_ids[offset : offset + _LOAD_CHUNK])
+            )
+            for run_id, name, status in rows:
+                code = history.vocabulary.get(name)
+                if code is None:
+                    code = history.vocabulary[name] = len(history.names)
+                    history.names.append(name)
+                codes, failed = cases[run_id]
+                codes.append(code)
+                failed.append(status == "failed")
+
+        loaded = {}
+        for run_id, started_at in new_runs:
+            codes, failed = cases[run_id]
+            loaded[run_id] = _RunStatuses(started_at, np.asarray(codes, dtype=np.int32), np.asarray(failed, dtype=bool))
+        history.runs = OrderedDict((run_id, history.runs.get(run_id) or loaded[run_id]) for run_id, _ in latest)
+        return True
+
+
+analyzer = FlakinessAnalyzer()
@@ -0,0 +1,449 @@
+"""Batched, memoized AI insight generation for test cases.
+
+Cases are stored without an insight; once their transaction commits,
+:func:`fill_on_commit` hands them to :data:`pipeline`. Its worker thread
+gathers pending cases across runs for ``INSIGHT_BATCH_WAIT_SECONDS`` (or
+until ``INSIGHT_BATCH_SIZE`` are waiting) and fingerprints each one: the
+failure signature for failed cases, the test name for passing ones.
+Fingerprints are looked up in an in-process LRU, then in the ``ai_insights``
+table, and only the remaining distinct ones reach the provider, in a single
+call per batch. New insights are stored as text blobs and memoized in
+``ai_insights``, which is pruned to the ``INSIGHT_CACHE_MAX_ROWS`` most
+recently used fingerprints.
+
+``INSIGHT_PROVIDER`` selects the provider: ``mock`` (default) or a
+``module:attribute`` path to a callable returning an :class:`InsightProvider`
+(any object with a ``name`` and a ``generate`` method).
+Cases record when they were handed to a pipeline (``insight_queued_at``).
+Cases of runs started within ``INSIGHT_RECOVERY_HOURS`` that are still
+without an insight, e.g. after a restart, are queued again on startup once
+that claim is older than ``INSIGHT_CLAIM_SECONDS``. Claims are taken with a
+conditional update, so API processes starting together never queue the
+same case twice.
+
+A batch whose provider call or database write fails is retried up to
+``INSIGHT_MAX_ATTEMPTS`` times with exponential backoff from
+``INSIGHT_RETRY_SECONDS``; insights already generated for it are kept
+across attempts. Cases of batches that still fail keep their claim until it
+expires, when the sweep that runs every ``INSIGHT_SWEEP_SECONDS`` queues
+them again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Protocol, Sequence
+
+from sqlalchemy import bindparam, delete, event, select, update
+from sqlalchemy.orm import Session
+
+from . import blobs, models
+from .database import SessionLocal, upsert_insert
+
+logger = logging.getLogger(__name__)
+
+INSIGHT_PROVIDER = os.getenv("INSIGHT_PROVIDER", "mock")
+BATCH_SIZE = int(os.getenv("INSIGHT_BATCH_SIZE", "256"))
+BATCH_WAIT_SECONDS = float(os.getenv("INSIGHT_BATCH_WAIT_SECONDS", "0.2"))
+CACHE_SIZE = int(os.getenv("INSIGHT_CACHE_SIZE", "4096"))
+CACHE_MAX_ROWS = int(os.getenv("INSIGHT_CACHE_MAX_ROWS", "100000"))
+RECOVERY_HOURS = int(os.getenv("INSIGHT_RECOVERY_HOURS", "24"))
+CLAIM_SECONDS = float(os.getenv("INSIGHT_CLAIM_SECONDS", "600"))
+MAX_ATTEMPTS = int(os.getenv("INSIGHT_MAX_ATTEMPTS", "3"))
+RETRY_SECONDS = float(os.getenv("INSIGHT_RETRY_SECONDS", "2"))
+SWEEP_SECONDS = float(os.getenv("INSIGHT_SWEEP_SECONDS", "60"))
+_CLAIM_CHUNK = 500
+# Seconds the mock provider spends per call, standing in for model latency.
+MOCK_INSIGHT_DELAY_SECONDS = float(os.getenv("MOCK_INSIGHT_DELAY_SECONDS", "0"))
+_PENDING_KEY = "insights_pending"
+
+
+class InsightRequest(NamedTuple):
+    """What a provider sees of a case; cases sharing a fingerprint share the insight."""
+
+    fingerprint: str
+    name: str
+    status: str
+    error_message: str | None
+    stack_trace: str | None
+
+
+class PendingCase(NamedTuple):
+    case_id: object
+    request: InsightRequest
+
+
+class InsightProvider(Protocol):
+    """Generates insights for a batch of distinct cases in one call."""
+
+    name: str
+
+    def generate(self, requests: Sequence[InsightRequest]) -> List[str]:
+        """Return one insight per request, in order."""
+        ...
+
+
+class MockInsightProvider:
+    """Local stand-in choosing a canned insight per fingerprint."""
+
+    name = "mock"
+
+    def __init__(self, delay: float = MOCK_INSIGHT_DELAY_SECONDS) -> None:
+        self.delay = delay
+
+    def generate(self, requests: Sequence[InsightRequest]) -> List[str]:
+        from .utils.mock_ai import FAIL_INSIGHTS, PASS_INSIGHTS
+
+        if self.delay:
+            time.sleep(self.delay)
+        insights = []
+        for request in requests:
+            choices = FAIL_INSIGHTS if request.status == "failed" else PASS_INSIGHTS
+            insights.append(choices[int(request.fingerprint, 16) % len(choices)])
+        return insights
+
+
+def load_provider(spec: str = INSIGHT_PROVIDER) -> InsightProvider:
+    if spec == "mock":
+        return MockInsightProvider()
+    module, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+def fingerprint(name: str, status: str, signature_id: str | None) -> str:
+    """Memoization key: the failure signature, or a hash of the test name for other cases."""
+    if status == "failed" and signature_id:
+        return signature_id
+    return hashlib.blake2b(f"{status}\n{name}".encode(), digest_size=10).hexdigest()
+
+
+def pending_case(
+    case_id, name: str, status: str, error_message: str | None, stack_trace: str | None, signature_id: str | None
+) -> PendingCase:
+    key = fingerprint(name, status, signature_id)
+    return PendingCase(case_id, InsightRequest(key, name, status, error_message, stack_trace))
+
+
+class InsightPipeline:
+    """Background worker filling case insights in batches through a memo and a provider."""
+
+    def __init__(
+        self,
+        provider: InsightProvider | None = None,
+        batch_size: int = BATCH_SIZE,
+        batch_wait: float = BATCH_WAIT_SECONDS,
+        max_rows: int = CACHE_MAX_ROWS,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_delay: float = RETRY_SECONDS,
+        sweep_interval: float = SWEEP_SECONDS,
+    ) -> None:
+        self.provider = provider
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.sweep_interval = sweep_interval
+        self.memo = blobs.BlobCache(CACHE_SIZE)
+        self.batches = 0
+        self.cases = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.provider_calls = 0
+        self.provider_items = 0
+        self.retries = 0
+        self.failed = 0
+        self.swept = 0
+        self.busy_seconds = 0.0
+        self._inserted_since_prune = 0
+        self._pending: List[PendingCase] = []
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the worker, and the sweep that queues recent cases still without an insight."""
+        if self._threads:
+            return
+        if self.provider is None:
+            self.provider = load_provider()
+        self._stopping = False
+        for target in (self._work, self._sweep):
+            thread = threading.Thread(target=target, name=f"insight-{target.__name__.strip('_')}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def add(self, cases: Iterable[PendingCase]) -> None:
+        """Queue cases for the next batch; ignored while the pipeline is stopped."""
+        with self._cond:
+            if not self._threads:
+                return
+            self._pending.extend(cases)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        with self._lock:
+            return {
+                "provider": getattr(self.provider, "name", type(self.provider).__name__),
+                "pending": pending,
+                "batches": self.batches,
+                "cases": self.cases,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "provider_calls": self.provider_calls,
+                "provider_items": self.provider_items,
+                "retries": self.retries,
+                "failed": self.failed,
+                "swept": self.swept,
+                # Share of cases that did not need a provider call of their own.
+                "hit_rate": round(1 - self.provider_items / self.cases, 4) if self.cases else 0.0,
+                "avg_batch_size": round(self.cases / self.batches, 2) if self.batches else 0.0,
+                "cases_per_second": round(self.cases / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            }
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not (self._pending or self._stopping):
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                deadline = time.monotonic() + self.batch_wait
+                while len(self._pending) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size :]
+            if batch:
+                self._run(batch)
+
+    def _run(self, batch: List[PendingCase]) -> None:
+        generated: Dict[str, str] = {}
+        for attempt in range(1, self.max_attempts + 1):
+            began = time.perf_counter()
+            try:
+                self._process(batch, generated)
+                return
+            except Exception:
+                if attempt == self.max_attempts:
+                    logger.exception("Failed to generate insights for %s cases; the sweep retries them", len(batch))
+                    with self._lock:
+                        self.failed += len(batch)
+                    return
+                logger.warning("Insight batch failed (attempt %s of %s)", attempt, self.max_attempts, exc_info=True)
+                with self._lock:
+                    self.retries += 1
+            finally:
+                with self._lock:
+                    self.busy_seconds += time.perf_counter() - began
+            if self._pause(self.retry_delay * 2 ** (attempt - 1)):
+                return
+
+    def _pause(self, seconds: float) -> bool:
+        """Wait ``seconds`` or until the pipeline stops; returns whether it is stopping."""
+        deadline = time.monotonic() + seconds
+        with self._cond:
+            while not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def _sweep(self) -> None:
+        while True:
+            with self._cond:
+                backlog = len(self._pending)
+            if backlog < self.batch_size:
+                try:
+                    cases = self._claim_unfilled(limit=self.batch_size * 4)
+                    with self._lock:
+                        self.swept += len(cases)
+                    self.add(cases)
+                except Exception:
+                    logger.exception("Failed to queue cases without insights")
+            if self._pause(self.sweep_interval):
+                return
+
+    def _process(self, batch: List[PendingCase], generated: Dict[str, str]) -> None:
+        """Fill ``batch``; ``generated`` keeps provider output for retries of the same batch."""
+        requests: Dict[str, InsightRequest] = {}
+        for item in batch:
+            requests.setdefault(item.request.fingerprint, item.request)
+        uses: Dict[str, int] = {}
+        for item in batch:
+            uses[item.request.fingerprint] = uses.get(item.request.fingerprint, 0) + 1
+
+        insight_ids = self.memo.get_many(requests)
+        memory_hits = len(insight_ids)
+        table = models.AIInsight.__table__
+        now = datetime.utcnow()
+        db = SessionLocal.session_factory()
+        try:
+            missing = [key for key in requests if key not in insight_ids]
+            stored = dict(
+                db.execute(select(table.c.fingerprint, table.c.insight_id).where(table.c.fingerprint.in_(missing)))
+                .tuples()
+                .all()
+            ) if missing else {}
+            insight_ids.update(stored)
+            generate = [requests[key] for key in missing if key not in stored]
+            created: Dict[str, str] = {}
+            if generate:
+                fresh = [request for request in generate if request.fingerprint not in generated]
+                if fresh:
+                    texts = self.provider.generate(fresh)
+                    with self._lock:
+                        self.provider_calls += 1
+                        self.provider_items += len(fresh)
+                    generated.update((request.fingerprint, text) for request, text in zip(fresh, texts))
+                texts = {request.fingerprint: generated[request.fingerprint] for request in generate}
+                contents = {blobs.blob_id(text): text for text in texts.values()}
+                blobs.store(db, contents)
+                blobs.cache.put_many(contents)
+                created = {key: blobs.blob_id(text) for key, text in texts.items()}
+                insight_ids.update(created)
+
+            db.execute(
+                update(models.TestCase.__table__)
+                .where(models.TestCase.__table__.c.id == bindparam("case_id"))
+                .values(ai_insight_id=bindparam("insight_id")),
+                [{"case_id": item.case_id, "insight_id": insight_ids[item.request.fingerprint]} for item in batch],
+            )
+            stmt = upsert_insert(db)(table)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.fingerprint],
+                    set_={"hits": table.c.hits + stmt.excluded.hits, "last_used_at": stmt.excluded.last_used_at},
+                ),
+                [
+                    {"fingerprint": key, "insight_id": insight_ids[key], "hits": count, "last_used_at": now}
+                    for key, count in uses.items()
+                ],
+            )
+            self._inserted_since_prune += len(created)
+            if self._inserted_since_prune > max(self.max_rows // 10, 1):
+                self._prune(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.memo.put_many(insight_ids)
+        with self._lock:
+            self.batches += 1
+            self.cases += len(batch)
+            self.memory_hits += memory_hits
+            self.db_hits += len(insight_ids) - memory_hits - len(created)
+
+    def _prune(self, db: Session) -> None:
+        """Delete the least recently used memo rows beyond ``max_rows``.
+
+        Rows used in the same batch as the cutoff row share its timestamp and are kept.
+        """
+        table = models.AIInsight.__table__
+        cutoff = db.scalar(
+            select(table.c.last_used_at).order_by(table.c.last_used_at.desc()).offset(self.max_rows).limit(1)
+        )
+        if cutoff is not None:
+            db.execute(delete(table).where(table.c.last_used_at < cutoff))
+        self._inserted_since_prune = 0
+
+    def _claim_unfilled(self, limit: int | None = None) -> List[PendingCase]:
+        """Claim up to ``limit`` cases of recent completed runs still without an insight.
+
+        Only cases whose claim has expired are taken, each by one process.
+        """
+        case, run = models.TestCase.__table__, models.TestRun.__table__
+        now = datetime.utcnow()
+        expired = now - timedelta(seconds=CLAIM_SECONDS)
+        unclaimed = case.c.insight_queued_at.is_(None) | (case.c.insight_queued_at < expired)
+        db = SessionLocal.session_factory()
+        try:
+            query = (
+                select(case.c.id)
+                .join(run, run.c.id == case.c.run_id)
+                .where(
+                    run.c.started_at >= now - timedelta(hours=RECOVERY_HOURS),
+                    run.c.completed_at.is_not(None),
+                    case.c.ai_insight_id.is_(None),
+                    unclaimed,
+                )
+            )
+            candidates = db.scalars(query.limit(limit) if limit else query).all()
+            rows = []
+            for offset in range(0, len(candidates), _CLAIM_CHUNK):
+                rows += db.execute(
+                    update(case)
+                    .where(
+                        case.c.id.in_(candidates[offset : offset + _CLAIM_CHUNK]),
+                        case.c.ai_insight_id.is_(None),
+                        unclaimed,
+                    )
+                    .values(insight_queued_at=now)
+                    .returning(
+                        case.c.id,
+                        case.c.name,
+                        case.c.status,
+                        case.c.error_message_id,
+                        case.c.stack_trace_id,
+                        case.c.signature_id,
+                    )
+                ).all()
+            texts = blobs.resolve(db, [key for row in rows for key in (row.error_message_id, row.stack_trace_id)])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return [
+            pending_case(
+                row.id,
+                row.name,
+                row.status,
+                texts.get(row.error_message_id),
+                texts.get(row.stack_trace_id),
+                row.signature_id,
+            )
+            for row in rows
+        ]
+
+
+pipeline = InsightPipeline()
+
+
+def fill_on_commit(db: Session, cases: Iterable[PendingCase]) -> None:
+    """Queue ``cases`` for insight generation once ``db``'s current transaction commits."""
+    db.info.setdefault(_PENDING_KEY, []).extend(cases)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_after_commit(session: Session) -> None:
+    cases = session.info.pop(_PENDING_KEY, None)
+    if cases:
+        pipeline.add(cases)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
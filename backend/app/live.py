@@ -0,0 +1,218 @@
+"""Live dashboard updates pushed to browsers over ``GET /api/events``.
+
+Writers call :func:`notify_on_commit` with the ids of runs they created or
+completed. Once the transaction commits the ids reach :data:`feed`, which
+coalesces bursts for ``LIVE_EVENTS_COALESCE_SECONDS``, then loads the run
+summaries and recomputes the dashboard stats and trends once per burst and
+broadcasts the result to every open stream. Each viewer therefore costs a
+queue, not a query. Nothing is computed while nobody is listening.
+
+With ``LIVE_EVENTS_BACKEND=postgres`` committed ids are sent with
+``pg_notify`` instead, and every API process listens on the channel and feeds
+its own subscribers, so updates reach viewers connected to any worker.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from . import crud
+from .database import SessionLocal, engine
+from .utils.broadcast import Broadcaster
+
+logger = logging.getLogger(__name__)
+
+LIVE_EVENTS_BACKEND = os.getenv("LIVE_EVENTS_BACKEND", "local").lower()
+COALESCE_SECONDS = float(os.getenv("LIVE_EVENTS_COALESCE_SECONDS", "0.5"))
+MAX_RUN_EVENTS = 20
+TREND_DAYS = 7
+DASHBOARD = "dashboard"
+PG_CHANNEL = "dashboard_events"
+_PG_NOTIFY_CHUNK = 100
+_PENDING_KEY = "live_events_pending"
+
+hub = Broadcaster()
+
+
+def postgres_enabled() -> bool:
+    return LIVE_EVENTS_BACKEND == "postgres" and engine.dialect.name == "postgresql"
+
+
+class DashboardFeed:
+    """Coalesce run notifications and publish one dashboard update per burst."""
+
+    def __init__(self, interval: float = COALESCE_SECONDS) -> None:
+        self.interval = interval
+        self.batches = 0
+        self.skipped = 0
+        self._created: Dict[UUID, None] = {}
+        self._completed: Dict[UUID, None] = {}
+        self._last_stats: dict | None = None
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    @property
+    def last_stats(self) -> dict | None:
+        """The most recently published ``stats`` payload, if still current."""
+        return self._last_stats
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping = False
+        targets = [self._work] + ([self._listen] if postgres_enabled() else [])
+        for target in targets:
+            thread = threading.Thread(target=target, name=f"live-{target.__name__.strip('_')}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def add(self, created: Iterable[UUID] = (), completed: Iterable[UUID] = ()) -> None:
+        """Queue run ids for the next update; ignored while the feed is stopped."""
+        with self._cond:
+            if not self._threads:
+                return
+            self._created.update(dict.fromkeys(created))
+            self._completed.update(dict.fromkeys(completed))
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": hub.subscriber_count(DASHBOARD),
+            "batches": self.batches,
+            "skipped": self.skipped,
+            "backend": "postgres" if postgres_enabled() else "local",
+        }
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not (self._created or self._completed or self._stopping):
+                    self._cond.wait()
+                if self._stopping:
+                    return
+            time.sleep(self.interval)
+            with self._cond:
+                created, self._created = list(self._created), {}
+                completed, self._completed = list(self._completed), {}
+            try:
+                self._publish(created, completed)
+            except Exception:
+                logger.exception("Failed to publish a dashboard update")
+                self._last_stats = None
+
+    def _publish(self, created: List[UUID], completed: List[UUID]) -> None:
+        if not hub.subscriber_count(DASHBOARD):
+            self.skipped += 1
+            self._last_stats = None
+            return
+        recent = (created + completed)[-MAX_RUN_EVENTS:]
+        db = SessionLocal.session_factory()
+        try:
+            runs = crud.get_run_summaries(db, recent)
+            stats = crud.get_dashboard_stats(db).model_dump()
+            trends = crud.get_dashboard_trends(db, days=TREND_DAYS).model_dump()
+        finally:
+            db.close()
+
+        completed_ids = set(completed)
+        for run in reversed(runs):
+            hub.publish(DASHBOARD, "run_completed" if run["id"] in completed_ids else "run_created", run)
+        previous = self._last_stats
+        delta = (
+            {key: stats[key] - previous["stats"][key] for key in ("total_runs", "total_tests", "failed_tests")}
+            if previous is not None
+            else None
+        )
+        self._last_stats = {"stats": stats, "trends": trends}
+        hub.publish(DASHBOARD, "stats", {**self._last_stats, "delta": delta})
+        self.batches += 1
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stopping:
+            raw = None
+            try:
+                raw = engine.raw_connection()
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {PG_CHANNEL}")
+                backoff = 1.0
+                while not self._stopping:
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        payload = json.loads(connection.notifies.pop(0).payload)
+                        self.add(
+                            created=[UUID(value) for value in payload.get("created", ())],
+                            completed=[UUID(value) for value in payload.get("completed", ())],
+                        )
+            except Exception:
+                logger.exception("Dashboard event listener lost its connection; retrying in %.0fs", backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+
+feed = DashboardFeed()
+
+
+def notify_on_commit(db, *, created: Iterable[UUID] = (), completed: Iterable[UUID] = ()) -> None:
+    """Announce created/completed runs to dashboard viewers once ``db``'s transaction commits."""
+    pending = db.info.setdefault(_PENDING_KEY, {"created": [], "completed": []})
+    pending["created"].extend(created)
+    pending["completed"].extend(completed)
+
+
+def _send_pg_notify(created: List[UUID], completed: List[UUID]) -> None:
+    messages = [
+        {"created": [str(value) for value in created[offset : offset + _PG_NOTIFY_CHUNK]]}
+        for offset in range(0, len(created), _PG_NOTIFY_CHUNK)
+    ] + [
+        {"completed": [str(value) for value in completed[offset : offset + _PG_NOTIFY_CHUNK]]}
+        for offset in range(0, len(completed), _PG_NOTIFY_CHUNK)
+    ]
+    with engine.begin() as conn:
+        for message in messages:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": PG_CHANNEL, "payload": json.dumps(message)})
+
+
+@event.listens_for(Session, "after_commit")
+def _announce_after_commit(session: Session) -> None:
+    pending: Dict[str, Any] | None = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if postgres_enabled():
+        try:
+            _send_pg_notify(pending["created"], pending["completed"])
+        except Exception:
+            logger.exception("Failed to send dashboard notifications")
+    else:
+        feed.add(pending["created"], pending["completed"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
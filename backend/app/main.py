@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import logging
 import os
-from fastapi import FastAPI
+import time
+from typing import Iterator
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from . import crud
+from . import IMPORT_STARTED, archive, blobs, crud, insights, live, runner
 from .database import init_db
-from .routers import dashboard, test_runs, test_suites
+from .routers import dashboard, durations, events, failures, test_runs, test_suites
+from .utils import compression, dbmetrics, metrics
+from .utils.cache import response_cache, run_cache
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="AI Test Results Dashboard API",
@@ -24,17 +33,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-DB-Queries"],
 )
+app.add_middleware(compression.CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(test_runs.router)
 app.include_router(test_suites.router)
 app.include_router(dashboard.router)
+app.include_router(failures.router)
+app.include_router(durations.router)
+app.include_router(events.router)
+
+
+@app.exception_handler(archive.ArchiveUnavailable)
+def archive_unavailable(request: Request, exc: archive.ArchiveUnavailable) -> JSONResponse:
+    """Answer 410 for runs whose archive file is missing or unreadable."""
+    return JSONResponse(status_code=status.HTTP_410_GONE, content={"detail": str(exc)})
+
+
+# Seconds spent importing the app, initializing the database and in the whole cold start.
+startup_timings: dict[str, float] = {}
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     """Initialize database and seed data."""
+    begin = time.perf_counter()
     init_db(crud.seed_database)
+    startup_timings["init_db_seconds"] = round(time.perf_counter() - begin, 4)
+    live.feed.start()
+    insights.pipeline.start()
+    runner.executor.start()
+    startup_timings["import_seconds"] = round(begin - IMPORT_STARTED, 4)
+    startup_timings["total_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 4)
+    logger.info(
+        "Started in %.2fs (imports %.2fs, database setup and seeding %.2fs)",
+        startup_timings["total_seconds"],
+        startup_timings["import_seconds"],
+        startup_timings["init_db_seconds"],
+    )
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    """Stop the run workers; runs they leave unfinished are requeued on the next startup."""
+    runner.executor.stop()
+    insights.pipeline.stop()
+    live.feed.stop()
 
 
 @app.get("/")
@@ -42,3 +88,84 @@ def root() -> dict[str, str]:
     """Simple health endpoint."""
     return {"message": "AI Test Results Dashboard API"}
 
+
+@app.get("/api/cache/stats")
+def cache_stats() -> dict:
+    """Response cache occupancy and hit/miss counters, plus those of the completed-run cache."""
+    return {**response_cache.stats(), "runs": run_cache.stats()}
+
+
+# Service stats that only ever grow; they are exported as ``<name>_total`` counters, everything else as gauges.
+_COUNTER_STATS = {
+    "hits",
+    "misses",
+    "invalidations",
+    "uncached_fills",
+    "completed",
+    "failed",
+    "rejected",
+    "batches",
+    "skipped",
+    "cases",
+    "memory_hits",
+    "db_hits",
+    "provider_calls",
+    "provider_items",
+    "retries",
+    "swept",
+}
+
+
+def _service_samples() -> Iterator[str]:
+    sources = {
+        "response_cache": ("Response cache", response_cache.stats()),
+        "run_cache": ("Completed-run response cache", run_cache.stats()),
+        "compression": ("Response compression", compression.stats.stats()),
+        "text_blob_cache": ("Text blob cache", blobs.cache.stats()),
+        "run_queue": ("Run executor", runner.executor.stats()),
+        "live_events": ("Dashboard event feed", live.feed.stats()),
+        "insights": ("Insight pipeline", insights.pipeline.stats()),
+        "startup": ("Startup", startup_timings),
+    }
+    for prefix, (label, stats) in sources.items():
+        for key, value in stats.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            counter = key in _COUNTER_STATS or key.endswith(("_responses", "_bytes_in", "_bytes_out"))
+            name = f"{prefix}_{key}_total" if counter else f"{prefix}_{key}"
+            yield f"# HELP {name} {label}: {key.replace('_', ' ')}."
+            yield f"# TYPE {name} {'counter' if counter else 'gauge'}"
+            yield metrics.sample(name, value)
+
+
+metrics.register_collector(_service_samples)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> PlainTextResponse:
+    """Request, database, cache and run queue metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/db/stats")
+def db_stats() -> dict:
+    """Connection pool saturation, checkout waits and statement counts per route."""
+    return dbmetrics.stats()
+
+
+@app.get("/api/queue/stats")
+def run_queue_stats() -> dict:
+    """Run executor queue depth, worker count and outcome counters."""
+    return runner.executor.stats()
+
+
+@app.get("/api/events/stats")
+def live_event_stats() -> dict:
+    """Dashboard event stream subscribers and published update counters."""
+    return live.feed.stats()
+
+
+@app.get("/api/insights/stats")
+def insight_stats() -> dict:
+    """Insight pipeline backlog, batch and provider call counters, and memo hit rate."""
+    return insights.pipeline.stats()
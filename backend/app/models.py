@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List
 from uuid import uuid4
 
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -19,6 +22,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from .blobs import BlobText
 from .database import Base
 
 
@@ -42,6 +46,7 @@ class TestRun(Base):
     __tablename__ = "test_runs"
     __table_args__ = (
         UniqueConstraint("id", name="uq_test_runs_id"),
+        Index("ix_test_runs_suite_id_started_at", "suite_id", "started_at"),
     )
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -53,6 +58,9 @@ class TestRun(Base):
     total_tests: Mapped[int] = mapped_column(Integer, default=0)
     passed_tests: Mapped[int] = mapped_column(Integer, default=0)
     failed_tests: Mapped[int] = mapped_column(Integer, default=0)
+    # Executor worker holding a running run, and when it last showed progress.
+    claimed_by: Mapped[str | None] = mapped_column(String(64))
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
     suite: Mapped["TestSuite"] = relationship("TestSuite", back_populates="runs")
     test_cases: Mapped[List["TestCase"]] = relationship("TestCase", back_populates="run", cascade="all, delete-orphan")
@@ -66,13 +74,139 @@ class TestCase(Base):
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     run_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("test_runs.id", ondelete="CASCADE"), index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    description: Mapped[str | None] = mapped_column(Text)
+    description_id: Mapped[str | None] = mapped_column(String(20))
     status: Mapped[str] = mapped_column(String(50), nullable=False)
     execution_time_ms: Mapped[int] = mapped_column(Integer)
-    ai_insight: Mapped[str | None] = mapped_column(Text)
-    error_message: Mapped[str | None] = mapped_column(Text)
-    stack_trace: Mapped[str | None] = mapped_column(Text)
+    ai_insight_id: Mapped[str | None] = mapped_column(String(20))
+    error_message_id: Mapped[str | None] = mapped_column(String(20), index=True)
+    stack_trace_id: Mapped[str | None] = mapped_column(String(20))
+    signature_id: Mapped[str | None] = mapped_column(String(20), index=True)
+    # When the case was last handed to an insight pipeline; see app.insights.
+    insight_queued_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     run: Mapped["TestRun"] = relationship("TestRun", back_populates="test_cases")
 
+    # Text fields are stored once in text_blobs and referenced by content hash.
+    description = BlobText()
+    ai_insight = BlobText()
+    error_message = BlobText()
+    stack_trace = BlobText()
+
+
+class TextBlob(Base):
+    """Deduplicated text referenced from test cases by content hash."""
+
+    __tablename__ = "text_blobs"
+
+    id: Mapped[str] = mapped_column(String(20), primary_key=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class RunDailyRollup(Base):
+    """Per-day, per-suite run totals maintained as runs complete."""
+
+    __tablename__ = "run_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    suite_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("test_suites.id", ondelete="CASCADE"), primary_key=True
+    )
+    runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    passed_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sum_ms: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Nullable so existing tables can gain it; NULL until the rollups are rebuilt.
+    failed_runs: Mapped[int | None] = mapped_column(Integer, default=0)
+
+
+class RunHourlyRollup(Base):
+    """Per-hour, per-suite run totals, for trends bucketed in other time zones or by the hour.
+
+    ``hour`` is the start of the UTC hour, stored without a time zone.
+    """
+
+    __tablename__ = "run_hourly_rollups"
+
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    suite_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("test_suites.id", ondelete="CASCADE"), primary_key=True
+    )
+    runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    passed_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_tests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sum_ms: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DurationSketch(Base):
+    """Per-day quantile sketch of a suite's run durations or one test's execution times.
+
+    ``test_name`` is empty for the run durations of the suite.
+    """
+
+    __tablename__ = "duration_sketches"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    suite_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("test_suites.id", ondelete="CASCADE"), primary_key=True
+    )
+    test_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sketch: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+
+
+class AIInsight(Base):
+    """Memoized AI insight for a failure signature, or for a passing test's name."""
+
+    __tablename__ = "ai_insights"
+
+    fingerprint: Mapped[str] = mapped_column(String(20), primary_key=True)
+    insight_id: Mapped[str] = mapped_column(String(20), nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class FailureSignature(Base):
+    """Cluster of failed test cases sharing a normalized error signature."""
+
+    __tablename__ = "failure_signatures"
+
+    id: Mapped[str] = mapped_column(String(20), primary_key=True)
+    normalized: Mapped[str] = mapped_column(Text, nullable=False)
+    sample_error_message: Mapped[str | None] = mapped_column(Text)
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False, default=0, index=True)
+    first_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class FailureSignatureSuite(Base):
+    """Per-suite occurrence counts for a failure signature."""
+
+    __tablename__ = "failure_signature_suites"
+
+    signature_id: Mapped[str] = mapped_column(
+        String(20), ForeignKey("failure_signatures.id", ondelete="CASCADE"), primary_key=True
+    )
+    suite_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("test_suites.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ArchivedRun(Base):
+    """Location of a run moved out of the live tables by the retention job."""
+
+    __tablename__ = "archived_runs"
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    suite_id: Mapped[str] = mapped_column(UUID(as_uuid=True), ForeignKey("test_suites.id", ondelete="CASCADE"), index=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archive_file: Mapped[str] = mapped_column(String(255), nullable=False)
+    byte_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    byte_length: Mapped[int] = mapped_column(Integer, nullable=False)
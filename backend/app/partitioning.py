@@ -0,0 +1,135 @@
+"""Monthly range partitioning of ``test_runs`` and ``test_cases`` on PostgreSQL.
+
+Enabled with ``PARTITION_TABLES=true``. Partitioned tables can only be created
+from scratch, so :func:`create_partitioned_tables` runs before ``create_all``
+and only when the tables do not exist yet. PostgreSQL requires the partition
+key in every unique constraint, so the primary keys become
+``(id, started_at)`` / ``(id, created_at)`` and the ``test_cases.run_id``
+foreign key is not enforced by the database. The ORM still maps both tables by
+``id``.
+
+Runs are partitioned by ``started_at`` and cases by ``created_at``. Queries
+that filter runs by date only scan the matching partitions.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from datetime import date, datetime
+
+from sqlalchemy import Column, Index, MetaData, Table, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+PARTITION_TABLES = os.getenv("PARTITION_TABLES", "false").lower() in {"1", "true", "yes"}
+MONTHS_BACK = int(os.getenv("PARTITION_MONTHS_BACK", "12"))
+MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+PARTITION_KEYS = {
+    models.TestRun.__table__: "started_at",
+    models.TestCase.__table__: "created_at",
+}
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+def enabled(bind: Engine) -> bool:
+    return PARTITION_TABLES and bind.dialect.name == "postgresql"
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partitioned_copy(table: Table, key: str) -> Table:
+    """Copy ``table`` with the partition key in its primary key and no foreign keys."""
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.name in ("id", key),
+            nullable=column.nullable and column.name != key,
+            server_default=column.server_default.arg if column.server_default is not None else None,
+        )
+        for column in table.columns
+    ]
+    copy = Table(table.name, MetaData(), *columns, postgresql_partition_by=f"RANGE ({key})")
+    for index in table.indexes:
+        Index(index.name, *[copy.c[column.name] for column in index.columns])
+    return copy
+
+
+def create_partitioned_tables(bind: Engine) -> None:
+    """Create partitioned ``test_runs``/``test_cases`` if they do not exist yet."""
+    if not enabled(bind):
+        return
+    existing = set(inspect(bind).get_table_names())
+    models.TestSuite.__table__.create(bind, checkfirst=True)
+    for table, key in PARTITION_KEYS.items():
+        if table.name in existing:
+            continue
+        _partitioned_copy(table, key).create(bind)
+        with bind.begin() as conn:
+            if table is models.TestRun.__table__:
+                conn.execute(
+                    text(
+                        "ALTER TABLE test_runs ADD FOREIGN KEY (suite_id) "
+                        "REFERENCES test_suites (id) ON DELETE CASCADE"
+                    )
+                )
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table.name}_pdefault PARTITION OF {table.name} DEFAULT"))
+    ensure_partitions(bind)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month:%Y%m}"
+
+
+def ensure_partitions(bind: Engine, *, today: date | None = None) -> None:
+    """Create monthly partitions from ``MONTHS_BACK`` ago to ``MONTHS_AHEAD`` ahead."""
+    if not enabled(bind):
+        return
+    first_of_month = (today or datetime.utcnow().date()).replace(day=1)
+    for table in PARTITION_KEYS:
+        for offset in range(-MONTHS_BACK, MONTHS_AHEAD + 1):
+            lower = _add_months(first_of_month, offset)
+            upper = _add_months(lower, 1)
+            name = partition_name(table.name, lower)
+            try:
+                with bind.begin() as conn:
+                    conn.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table.name} "
+                            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                        )
+                    )
+            except DBAPIError:
+                # Rows for this month already sit in the default partition.
+                logger.warning("Could not create partition %s; rows remain in the default partition", name)
+
+
+def monthly_partitions(bind: Engine, table_name: str) -> list[tuple[str, date, date]]:
+    """Return ``(name, lower, upper)`` for each monthly partition of ``table_name``."""
+    with bind.connect() as conn:
+        names = conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table_name},
+        ).scalars()
+        partitions = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match and match.group("table") == table_name:
+                lower = date(int(match.group("year")), int(match.group("month")), 1)
+                partitions.append((name, lower, _add_months(lower, 1)))
+    return sorted(partitions, key=lambda item: item[1])
@@ -0,0 +1,153 @@
+"""Incrementally maintained per-day and per-hour, per-suite run rollups.
+
+The dashboard reads totals and trends from ``run_daily_rollups`` (UTC days)
+and ``run_hourly_rollups`` instead of aggregating ``test_runs`` on every
+request. Completed runs are folded into both by :func:`record_run` inside the
+caller's transaction; :func:`rebuild` recomputes the tables from raw runs and
+is exposed as ``python -m app.rollups``.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Iterable, Mapping
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import Base, upsert_insert
+
+_COUNTERS = ("runs", "failed_runs", "total_tests", "passed_tests", "failed_tests", "duration_sum_ms", "duration_count")
+
+
+def rollup_day(started_at: datetime) -> date:
+    """Return the UTC calendar day a run is bucketed under."""
+    if started_at.tzinfo is not None:
+        started_at = started_at.astimezone(timezone.utc)
+    return started_at.date()
+
+
+def rollup_hour(started_at: datetime) -> datetime:
+    """Return the start of the UTC hour a run is bucketed under, without a time zone."""
+    if started_at.tzinfo is not None:
+        started_at = started_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return started_at.replace(minute=0, second=0, microsecond=0)
+
+
+def record_run(db: Session, run: models.TestRun) -> None:
+    """Add a completed run to its day/suite bucket."""
+    record_runs(
+        db,
+        [
+            {
+                "suite_id": run.suite_id,
+                "status": run.status,
+                "started_at": run.started_at,
+                "total_tests": run.total_tests,
+                "passed_tests": run.passed_tests,
+                "failed_tests": run.failed_tests,
+                "duration_ms": run.duration_ms,
+            }
+        ],
+    )
+
+
+def record_runs(db: Session, runs: Iterable[Mapping]) -> None:
+    """Add completed run rows to their day and hour buckets with one executemany upsert per table."""
+    days: dict[tuple, dict] = {}
+    hours: dict[tuple, dict] = {}
+    for run in runs:
+        day_key = (rollup_day(run["started_at"]), run["suite_id"])
+        hour_key = (rollup_hour(run["started_at"]), run["suite_id"])
+        day_bucket = days.get(day_key)
+        if day_bucket is None:
+            day_bucket = days[day_key] = {"day": day_key[0], "suite_id": day_key[1], **dict.fromkeys(_COUNTERS, 0)}
+        hour_bucket = hours.get(hour_key)
+        if hour_bucket is None:
+            hour_bucket = hours[hour_key] = {"hour": hour_key[0], "suite_id": hour_key[1], **dict.fromkeys(_COUNTERS, 0)}
+        for bucket in (day_bucket, hour_bucket):
+            bucket["runs"] += 1
+            bucket["failed_runs"] += run["status"] == "failed"
+            bucket["total_tests"] += run["total_tests"] or 0
+            bucket["passed_tests"] += run["passed_tests"] or 0
+            bucket["failed_tests"] += run["failed_tests"] or 0
+            if run["duration_ms"] is not None:
+                bucket["duration_sum_ms"] += run["duration_ms"]
+                bucket["duration_count"] += 1
+
+    if not days:
+        return
+    for model, key, buckets in (
+        (models.RunDailyRollup, "day", days),
+        (models.RunHourlyRollup, "hour", hours),
+    ):
+        table = model.__table__
+        stmt = upsert_insert(db)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key], table.c.suite_id],
+            set_={name: func.coalesce(table.c[name], 0) + stmt.excluded[name] for name in _COUNTERS},
+        )
+        db.execute(stmt, list(buckets.values()))
+
+
+def _day_start(db: Session, started_at):
+    """SQL expression giving the UTC calendar day of ``started_at``, matching :func:`rollup_day`."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.timezone("UTC", started_at), Date)
+    return func.date(started_at)
+
+
+def _hour_start(db: Session, started_at):
+    """SQL expression truncating ``started_at`` to the start of its UTC hour."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc("hour", func.timezone("UTC", started_at))
+    return func.strftime("%Y-%m-%d %H:00:00.000000", started_at)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every day and hour bucket from ``test_runs``; returns the day bucket count."""
+    run = models.TestRun
+    counters = (
+        func.count(run.id),
+        func.coalesce(func.sum(case((run.status == "failed", 1), else_=0)), 0),
+        func.coalesce(func.sum(run.total_tests), 0),
+        func.coalesce(func.sum(run.passed_tests), 0),
+        func.coalesce(func.sum(run.failed_tests), 0),
+        func.coalesce(func.sum(run.duration_ms), 0),
+        func.count(run.duration_ms),
+    )
+    for model, key, bucket in (
+        (models.RunDailyRollup, "day", _day_start(db, run.started_at)),
+        (models.RunHourlyRollup, "hour", _hour_start(db, run.started_at)),
+    ):
+        source = (
+            select(bucket, run.suite_id, *counters)
+            .where(run.completed_at.is_not(None))
+            .group_by(bucket, run.suite_id)
+        )
+        table = model.__table__
+        db.execute(delete(table))
+        db.execute(insert(table).from_select([key, "suite_id", *_COUNTERS], source))
+    return db.query(func.count()).select_from(models.RunDailyRollup.__table__).scalar() or 0
+
+
+def ensure_backfilled(db: Session) -> None:
+    """Rebuild the rollups when runs exist but a table is empty or predates ``failed_runs``."""
+    daily = models.RunDailyRollup
+    stale = (
+        db.query(daily.day).first() is None
+        or db.query(models.RunHourlyRollup.hour).first() is None
+        or db.query(daily.day).filter(daily.failed_runs.is_(None)).first() is not None
+    )
+    if stale and db.query(models.TestRun.id).first() is not None:
+        rebuild(db)
+
+
+if __name__ == "__main__":
+    from .database import engine, session_scope, upgrade_schema
+
+    Base.metadata.create_all(bind=engine, tables=[models.RunDailyRollup.__table__, models.RunHourlyRollup.__table__])
+    upgrade_schema(engine)
+    with session_scope() as session:
+        print(f"Rebuilt {rebuild(session)} rollup buckets")
@@ -2,23 +2,74 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import DbSession, get_read_db
+from ..utils.cache import cached_response
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
 
 @router.get("/stats", response_model=schemas.DashboardStats)
-def get_stats(db: Session = Depends(get_db)) -> schemas.DashboardStats:
+async def get_stats(request: Request, db: DbSession = Depends(get_read_db)) -> Response:
     """Return aggregate dashboard metrics."""
-    return crud.get_dashboard_stats(db)
+    return await cached_response(request, ("dashboard_stats",), lambda: db.run_sync(crud.get_dashboard_stats))
 
 
 @router.get("/trends", response_model=schemas.DashboardTrends)
-def get_trends(days: int = Query(7, ge=1, le=30), db: Session = Depends(get_db)) -> schemas.DashboardTrends:
+async def get_trends(request: Request, days: int = Query(7, ge=1, le=30), db: DbSession = Depends(get_read_db)) -> Response:
     """Return trend data for charts."""
-    return crud.get_dashboard_trends(db, days=days)
+    return await cached_response(
+        request, ("dashboard_trends", days), lambda: db.run_sync(crud.get_dashboard_trends, days=days)
+    )
+
+
+def _zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown time zone.") from exc
+
+
+def _localize(value: datetime, zone: ZoneInfo) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=zone)
+
 
+@router.get("/trends/series", response_model=schemas.DashboardTrendSeries)
+async def get_trend_series(
+    request: Request,
+    granularity: Literal["hour", "day", "week", "month"] = Query("day"),
+    start: Optional[datetime] = Query(None, description="Range start, in `tz` unless it has an offset (default: end - 30 days)"),
+    end: Optional[datetime] = Query(None, description="Exclusive range end, in `tz` unless it has an offset (default: now)"),
+    tz: str = Query("UTC", description="IANA time zone buckets are aligned to"),
+    group_by: Literal["none", "suite"] = Query("none"),
+    suite_id: Optional[UUID] = Query(None),
+    max_points: int = Query(500, ge=10, le=5000, description="Buckets are widened to return at most this many"),
+    db: DbSession = Depends(get_read_db),
+) -> Response:
+    """Return run and test counts over any range at hour/day/week/month granularity."""
+    zone = _zone(tz)
+    end_at = _localize(end, zone) if end else datetime.now(timezone.utc)
+    start_at = _localize(start, zone) if start else end_at - timedelta(days=30)
+    if start_at >= end_at:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end.")
+    return await cached_response(
+        request,
+        ("dashboard_trend_series", granularity, start, end, tz, group_by, suite_id, max_points),
+        lambda: db.run_sync(
+            crud.get_trend_series,
+            start=start_at,
+            end=end_at,
+            tz=zone,
+            granularity=granularity,
+            group_by=group_by,
+            suite_id=suite_id,
+            max_points=max_points,
+        ),
+    )
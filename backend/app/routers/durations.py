@@ -0,0 +1,80 @@
+"""Duration percentile endpoints backed by quantile sketches."""
+
+from __future__ import annotations
+
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+from .. import crud, schemas
+from ..database import DbSession, get_read_db
+from ..utils.cache import cached_response
+
+router = APIRouter(prefix="/api/durations", tags=["Durations"])
+
+Percentile = Literal["p50", "p90", "p99"]
+
+
+@router.get("/suites", response_model=list[schemas.SuiteDurations])
+async def suite_durations(
+    request: Request,
+    days: int = Query(30, ge=1, le=730),
+    suite_id: Optional[UUID] = Query(None),
+    db: DbSession = Depends(get_read_db),
+) -> Response:
+    """Return run duration p50/p90/p99 per suite."""
+    return await cached_response(
+        request,
+        ("suite_durations", days, suite_id),
+        lambda: db.run_sync(crud.get_suite_durations, days=days, suite_id=suite_id),
+    )
+
+
+@router.get("/tests", response_model=list[schemas.TestDurations])
+async def slowest_tests(
+    request: Request,
+    days: int = Query(30, ge=1, le=730),
+    suite_id: Optional[UUID] = Query(None),
+    sort: Percentile = Query("p90", description="Percentile to rank tests by"),
+    min_runs: int = Query(1, ge=1, description="Ignore tests observed fewer times"),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+) -> Response:
+    """Return the slowest tests by execution time percentile."""
+    return await cached_response(
+        request,
+        ("test_durations", days, suite_id, sort, min_runs, limit),
+        lambda: db.run_sync(
+            crud.list_test_durations, days=days, suite_id=suite_id, sort=sort, min_runs=min_runs, limit=limit
+        ),
+    )
+
+
+@router.get("/slowdowns", response_model=list[schemas.TestSlowdown])
+async def slowing_tests(
+    request: Request,
+    days: int = Query(7, ge=1, le=90, description="Recent window in days"),
+    baseline_days: int = Query(28, ge=1, le=365, description="Days before the recent window to compare against"),
+    suite_id: Optional[UUID] = Query(None),
+    percentile: Percentile = Query("p90"),
+    threshold: float = Query(0.2, ge=0, description="Minimum relative increase, e.g. 0.2 for 20% slower"),
+    min_runs: int = Query(5, ge=1, description="Observations required in both windows"),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+) -> Response:
+    """Return tests getting slower: recent percentile versus the preceding baseline."""
+    return await cached_response(
+        request,
+        ("test_slowdowns", days, baseline_days, suite_id, percentile, threshold, min_runs, limit),
+        lambda: db.run_sync(
+            crud.list_test_slowdowns,
+            days=days,
+            baseline_days=baseline_days,
+            suite_id=suite_id,
+            percentile=percentile,
+            threshold=threshold,
+            min_runs=min_runs,
+            limit=limit,
+        ),
+    )
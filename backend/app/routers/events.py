@@ -0,0 +1,40 @@
+"""Live dashboard event stream."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from .. import live
+from ..utils import broadcast
+
+router = APIRouter(prefix="/api", tags=["Events"])
+
+
+@router.get("/events")
+async def stream_dashboard_events(request: Request) -> StreamingResponse:
+    """Stream dashboard updates as Server-Sent Events.
+
+    Sends ``run_created`` and ``run_completed`` with the run summary, followed
+    by one ``stats`` event per burst of changes carrying the recomputed stats,
+    the 7-day trends and the change in run/test counts since the previous
+    update. A new stream starts with the latest ``stats`` when one is current.
+    """
+    subscriber = live.hub.subscribe(live.DASHBOARD)
+    latest = live.feed.last_stats
+
+    async def body():
+        try:
+            yield b"retry: 3000\n\n"
+            if latest is not None:
+                yield broadcast.sse_event("stats", {**latest, "delta": None})
+            async for chunk in broadcast.relay(request, subscriber):
+                yield chunk
+        finally:
+            live.hub.unsubscribe(live.DASHBOARD, subscriber)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
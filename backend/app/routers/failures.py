@@ -0,0 +1,43 @@
+"""Failure clustering endpoints."""
+
+from __future__ import annotations
+
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+
+from .. import crud, schemas
+from ..database import DbSession, get_read_db
+
+router = APIRouter(prefix="/api/failures", tags=["Failures"])
+
+
+@router.get("/clusters", response_model=list[schemas.FailureCluster])
+async def list_clusters(
+    suite_id: Optional[UUID] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+) -> list[schemas.FailureCluster]:
+    """Return failure signatures ordered by how often they occur."""
+    return await db.run_sync(crud.list_failure_clusters, suite_id=suite_id, limit=limit)
+
+
+@router.get("/flaky-tests", response_model=list[schemas.FlakyTest])
+async def list_flaky_tests(
+    suite_id: Optional[UUID] = Query(None),
+    window: int = Query(100, ge=2, le=1000, description="Number of most recent runs per suite to analyze"),
+    min_runs: int = Query(5, ge=1, description="Ignore tests observed in fewer runs"),
+    classification: Optional[Literal["flaky", "broken", "stable"]] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: DbSession = Depends(get_read_db),
+) -> list[schemas.FlakyTest]:
+    """Rank tests by pass/fail flip rate and failure streaks."""
+    return await db.run_sync(
+        crud.list_flaky_tests,
+        suite_id=suite_id,
+        window=window,
+        min_runs=min_runs,
+        classification=classification,
+        limit=limit,
+    )
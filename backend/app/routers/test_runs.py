@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
-from typing import Optional
+from functools import partial
+from typing import Any, Iterator, List, Literal, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
-from .. import crud, schemas
-from ..database import get_db
+from .. import crud, live, runner, schemas
+from ..database import DbSession, ReadSessionLocal, get_db, get_read_db
+from ..utils import broadcast, export, pagination
+from ..utils.cache import cached_response, invalidate_on_commit, run_cache
+from ..utils.fastjson import FastJSONResponse
 
 router = APIRouter(prefix="/api/test-runs", tags=["Test Runs"])
 
+NDJSON_BATCH_SIZE = 500
+RUN_QUEUE_RETRY_AFTER_S = 5
+ACTIVE_RUN_STATUSES = ("queued", "running")
+
 
 def _parse_date(value: Optional[str]) -> Optional[datetime]:
     if not value:
@@ -24,50 +34,331 @@ def _parse_date(value: Optional[str]) -> Optional[datetime]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date format.") from exc
 
 
+def _validate_run(index: int, item: Any) -> schemas.TestRunIngest | schemas.BulkIngestError:
+    try:
+        return schemas.TestRunIngest.model_validate(item)
+    except ValidationError as exc:
+        messages = [f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()]
+        return schemas.BulkIngestError(index=index, errors=messages)
+
+
+async def _ingest_batch(
+    db: DbSession, batch: List[Tuple[int, schemas.TestRunIngest]], errors: List[schemas.BulkIngestError]
+) -> List[UUID]:
+    run_ids = await db.run_sync(crud.ingest_test_runs, [run for _, run in batch])
+    accepted: List[UUID] = []
+    for (index, _), run_id in zip(batch, run_ids):
+        if run_id is None:
+            errors.append(schemas.BulkIngestError(index=index, errors=["suite_id: Test suite not found"]))
+        else:
+            accepted.append(run_id)
+    batch.clear()
+    return accepted
+
+
+def _ingest_result(db: DbSession, run_ids: List[UUID], errors: List[schemas.BulkIngestError]) -> schemas.BulkIngestResult:
+    if run_ids:
+        invalidate_on_commit(db)
+        live.notify_on_commit(db, completed=run_ids)
+    errors.sort(key=lambda error: error.index)
+    return schemas.BulkIngestResult(accepted=len(run_ids), rejected=len(errors), run_ids=run_ids, errors=errors)
+
+
+def _parse_cursor(value: str) -> pagination.RunCursor:
+    try:
+        return pagination.decode_cursor(value)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.") from exc
+
+
 @router.get("", response_model=schemas.PaginatedTestRuns)
-def list_test_runs(
+async def list_test_runs(
     status_filter: Optional[str] = Query(None, alias="status"),
     suite_id: Optional[UUID] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    q: Optional[str] = Query(None, description="Search by run ID or suite name"),
-    db: Session = Depends(get_db),
-) -> schemas.PaginatedTestRuns:
+    q: Optional[str] = Query(None, description="Search by run ID prefix, suite name, or test case name/error"),
+    pagination_mode: Literal["offset", "cursor"] = Query(
+        "offset", alias="pagination", description="Use keyset cursors instead of offsets"
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page (implies cursor mode)"),
+    include_total: bool = Query(False, description="Also count matching runs in cursor mode"),
+    db: DbSession = Depends(get_read_db),
+) -> Response:
     """List paginated test runs."""
-    runs, total = crud.list_test_runs(
-        db,
+    filters = dict(
         status=status_filter,
         suite_id=suite_id,
-        limit=limit,
-        offset=offset,
         start_date=_parse_date(start_date),
         end_date=_parse_date(end_date),
         search=q,
     )
-    return schemas.PaginatedTestRuns(
-        data=[crud.serialize_run(run) for run in runs],
-        total=total,
-        limit=limit,
-        offset=offset,
+
+    if pagination_mode == "offset" and cursor is None:
+        page = await db.run_sync(crud.paginate_test_runs, limit=limit, offset=offset, **filters)
+    else:
+        page = await db.run_sync(
+            crud.paginate_test_runs_keyset,
+            cursor=_parse_cursor(cursor) if cursor else None,
+            limit=limit,
+            include_total=include_total,
+            **filters,
+        )
+    return FastJSONResponse(page)
+
+
+@router.post("/bulk", response_model=schemas.BulkIngestResult)
+async def ingest_test_runs(payload: schemas.BulkIngestRequest, db: DbSession = Depends(get_db)) -> schemas.BulkIngestResult:
+    """Ingest externally executed runs, reporting errors per item."""
+    batch: List[Tuple[int, schemas.TestRunIngest]] = []
+    errors: List[schemas.BulkIngestError] = []
+    for index, item in enumerate(payload.runs):
+        result = _validate_run(index, item)
+        if isinstance(result, schemas.BulkIngestError):
+            errors.append(result)
+        else:
+            batch.append((index, result))
+    run_ids = await _ingest_batch(db, batch, errors) if batch else []
+    return _ingest_result(db, run_ids, errors)
+
+
+@router.post("/bulk/ndjson", response_model=schemas.BulkIngestResult)
+async def ingest_test_runs_ndjson(request: Request, db: DbSession = Depends(get_db)) -> schemas.BulkIngestResult:
+    """Ingest a newline-delimited JSON stream of runs in batches as it arrives.
+
+    ``index`` in reported errors is the zero-based line number.
+    """
+    batch: List[Tuple[int, schemas.TestRunIngest]] = []
+    errors: List[schemas.BulkIngestError] = []
+    run_ids: List[UUID] = []
+    index = 0
+    pending = b""
+
+    async def consume(line: bytes) -> None:
+        nonlocal index
+        line_index, index = index, index + 1
+        if not line.strip():
+            return
+        try:
+            item = json.loads(line)
+        except ValueError as exc:
+            errors.append(schemas.BulkIngestError(index=line_index, errors=[f"Invalid JSON: {exc}"]))
+            return
+        result = _validate_run(line_index, item)
+        if isinstance(result, schemas.BulkIngestError):
+            errors.append(result)
+            return
+        batch.append((line_index, result))
+        if len(batch) >= NDJSON_BATCH_SIZE:
+            run_ids.extend(await _ingest_batch(db, batch, errors))
+
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            await consume(line)
+    await consume(pending)
+    if batch:
+        run_ids.extend(await _ingest_batch(db, batch, errors))
+    return _ingest_result(db, run_ids, errors)
+
+
+def _export_rows(**kwargs) -> Iterator[dict]:
+    # The response streams after the request's session is closed, so the
+    # export owns a session for the lifetime of the iterator.
+    db = ReadSessionLocal()
+    try:
+        yield from crud.iter_test_run_export(db, **kwargs)
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_test_runs(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_cases: bool = Query(False),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    suite_id: Optional[UUID] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Search by run ID prefix, suite name, or test case name/error"),
+) -> StreamingResponse:
+    """Stream every matching run, optionally with its test cases, as NDJSON or CSV."""
+    rows = _export_rows(
+        include_cases=include_cases,
+        status=status_filter,
+        suite_id=suite_id,
+        start_date=_parse_date(start_date),
+        end_date=_parse_date(end_date),
+        search=q,
+    )
+    if export_format == "csv":
+        body, media_type = export.to_csv(rows, include_cases=include_cases), "text/csv"
+    else:
+        body, media_type = export.to_ndjson(rows), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="test-runs.{export_format}"'},
+    )
+
+
+def _settled(run: dict) -> bool:
+    """Whether a run response can no longer change: completed, with every case's insight filled in."""
+    return run["completed_at"] is not None and all(case["ai_insight"] is not None for case in run.get("test_cases", ()))
+
+
+@router.get("/{run_id}", response_model=schemas.TestRunDetail | schemas.TestRunOverview)
+async def get_test_run(
+    run_id: UUID,
+    request: Request,
+    view: Literal["full", "summary"] = Query(
+        "full", description="'summary' returns case counts by status instead of the cases"
+    ),
+    case_status: Optional[str] = Query(None, description="Only include cases with this status"),
+    case_q: Optional[str] = Query(None, description="Only include cases whose name contains this text"),
+    db: DbSession = Depends(get_db),
+) -> Response:
+    """Return run detail with test cases, or a summary with case counts.
+
+    Completed runs are immutable once their insights are filled in, so their
+    responses are cached (already compressed) across writes.
+    """
+    if view == "summary":
+        load = partial(db.run_sync, crud.get_test_run_overview, run_id)
+    else:
+        load = partial(db.run_sync, crud.get_test_run_detail, run_id, case_status=case_status, case_search=case_q)
+    response = await cached_response(
+        request,
+        ("test_run", run_id, view, case_status, case_q),
+        load,
+        cache=run_cache,
+        keep=_settled,
     )
+    if response is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    return response
+
+
+@router.get("/{run_id}/cases", response_model=schemas.PaginatedTestCases)
+async def list_test_cases(
+    run_id: UUID,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    q: Optional[str] = Query(None, description="Search by test case name"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    details: bool = Query(False, description="Include AI insights and stack traces"),
+    db: DbSession = Depends(get_db),
+) -> Response:
+    """Return a page of a run's test cases, oldest first."""
+    page = await db.run_sync(
+        crud.list_test_cases, run_id, status=status_filter, search=q, limit=limit, offset=offset, details=details
+    )
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    return FastJSONResponse(page)
 
 
-@router.get("/{run_id}", response_model=schemas.TestRunDetail)
-def get_test_run(run_id: UUID, db: Session = Depends(get_db)) -> schemas.TestRunDetail:
-    """Return run detail with test cases."""
-    run = crud.get_test_run(db, run_id)
-    if not run:
+async def _comparison(db: DbSession, run_id: UUID, base_run_id: UUID, **options) -> Response:
+    if base_run_id == run_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot compare a run with itself")
+    comparison = await db.run_sync(crud.compare_test_runs, run_id, base_run_id, **options)
+    if comparison is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return crud.serialize_run_detail(run)
+    return FastJSONResponse(comparison)
+
 
+def _comparison_options(
+    limit: int = Query(500, ge=1, le=10000, description="Maximum tests listed per kind of change"),
+    min_change: float = Query(0.2, ge=0, description="Relative execution time change counted as slower/faster"),
+    min_delta_ms: int = Query(100, ge=0, description="Absolute execution time change counted as slower/faster"),
+) -> dict:
+    return {"limit": limit, "min_change": min_change, "min_delta_ms": min_delta_ms}
 
-@router.post("", response_model=schemas.TestRunDetail, status_code=status.HTTP_201_CREATED)
-def trigger_test_run(payload: schemas.CreateTestRunRequest, db: Session = Depends(get_db)) -> schemas.TestRunDetail:
-    """Trigger a new mock AI test run."""
+
+@router.get("/{run_id}/compare/previous", response_model=schemas.RunComparison)
+async def compare_with_previous_run(
+    run_id: UUID, options: dict = Depends(_comparison_options), db: DbSession = Depends(get_db)
+) -> Response:
+    """Diff a run against the suite's previous completed run."""
+    base_run_id = await db.run_sync(crud.get_previous_run_id, run_id)
+    if base_run_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No previous run to compare with")
+    return await _comparison(db, run_id, base_run_id, **options)
+
+
+@router.get("/{run_id}/compare/{base_run_id}", response_model=schemas.RunComparison)
+async def compare_test_runs(
+    run_id: UUID, base_run_id: UUID, options: dict = Depends(_comparison_options), db: DbSession = Depends(get_db)
+) -> Response:
+    """Diff a run against a baseline run by test name, returning only the differences."""
+    return await _comparison(db, run_id, base_run_id, **options)
+
+
+@router.get("/{run_id}/cases/{case_id}", response_model=schemas.TestCase)
+async def get_test_case(run_id: UUID, case_id: UUID, db: DbSession = Depends(get_db)) -> schemas.TestCase:
+    """Return a single test case with its AI insight and stack trace."""
+    case = await db.run_sync(crud.get_test_case, run_id, case_id)
+    if case is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test case not found")
+    return case
+
+
+@router.post("", response_model=schemas.TestRunDetail, status_code=status.HTTP_202_ACCEPTED)
+async def trigger_test_run(payload: schemas.CreateTestRunRequest, db: DbSession = Depends(get_db)) -> Response:
+    """Queue a new mock AI test run; follow its progress on ``/{run_id}/events``."""
     try:
-        run = crud.create_test_run(db, payload.suite_id)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
-    return crud.serialize_run_detail(run)
+        with runner.executor.reserve() as submit:
+            try:
+                run = await db.run_sync(crud.queue_test_run, payload.suite_id)
+            except ValueError as exc:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+            invalidate_on_commit(db)
+            live.notify_on_commit(db, created=[run["id"]])
+            # Commit before handing the run to a worker so the worker can see it.
+            await db.commit()
+            submit(run["id"])
+    except runner.QueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Run queue is full: {exc}",
+            headers={"Retry-After": str(RUN_QUEUE_RETRY_AFTER_S)},
+        ) from exc
+    return FastJSONResponse(run, status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.get("/{run_id}/events")
+async def stream_test_run_events(run_id: UUID, request: Request, db: DbSession = Depends(get_db)) -> StreamingResponse:
+    """Stream a run's progress as Server-Sent Events.
+
+    Starts with a ``snapshot`` of the run, then sends ``status`` and ``case``
+    events while it executes and ``completed`` once it has finished.
+    """
+    subscriber = runner.events.subscribe(run_id)
+    try:
+        snapshot = await db.run_sync(crud.get_test_run_summary, run_id)
+    except Exception:
+        runner.events.unsubscribe(run_id, subscriber)
+        raise
+    if snapshot is None:
+        runner.events.unsubscribe(run_id, subscriber)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+
+    async def body():
+        try:
+            yield broadcast.sse_event("snapshot", snapshot)
+            if snapshot["status"] not in ACTIVE_RUN_STATUSES:
+                yield broadcast.sse_event("completed", snapshot)
+                return
+            async for chunk in broadcast.relay(request, subscriber, last_event="completed"):
+                yield chunk
+        finally:
+            runner.events.unsubscribe(run_id, subscriber)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,26 +4,27 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import DbSession, get_read_db
+from ..utils.cache import cached_response
 
 router = APIRouter(prefix="/api/test-suites", tags=["Test Suites"])
 
 
 @router.get("", response_model=list[schemas.TestSuite])
-def list_suites(db: Session = Depends(get_db)) -> list[schemas.TestSuite]:
+async def list_suites(request: Request, db: DbSession = Depends(get_read_db)) -> Response:
     """Return all test suites."""
-    return crud.list_test_suites(db)
+    return await cached_response(request, ("test_suites",), lambda: db.run_sync(crud.list_test_suites))
 
 
 @router.get("/{suite_id}", response_model=schemas.TestSuiteDetail)
-def get_suite(suite_id: UUID, db: Session = Depends(get_db)) -> schemas.TestSuiteDetail:
+async def get_suite(suite_id: UUID, request: Request, db: DbSession = Depends(get_read_db)) -> Response:
     """Return suite detail."""
-    suite = crud.get_test_suite_detail(db, suite_id)
-    if not suite:
+    response = await cached_response(
+        request, ("test_suite", suite_id), lambda: db.run_sync(crud.get_test_suite_detail, suite_id)
+    )
+    if response is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Suite not found")
-    return suite
-
+    return response
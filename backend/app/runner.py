@@ -0,0 +1,320 @@
+"""Background execution of triggered test runs.
+
+Triggering a run inserts it with status ``queued`` and hands its id to an
+in-process pool of worker threads (``RUN_WORKERS``). At most
+``RUN_QUEUE_MAX_DEPTH`` runs may wait for a worker; beyond that
+:meth:`RunExecutor.reserve` raises :class:`QueueFull` and the API answers 503
+so callers back off. The ``queued`` rows double as a durable queue: runs that
+were waiting or mid-execution when the process stopped are queued again on
+startup.
+
+A worker claims a run with a conditional ``queued -> running`` update that
+records the executor as ``claimed_by``, commits each case as it finishes and
+publishes progress through :data:`events`, which the Server-Sent Events
+endpoint relays to clients. Every case commit also refreshes the run's
+``heartbeat_at``. Several API processes share the table, so a ``running`` run
+is only taken as interrupted once its heartbeat is older than
+``RUN_LEASE_SECONDS``; a worker that finds its claim taken over stops
+without writing. Every ``RUN_RESCAN_SECONDS`` the executor also recovers
+expired leases and picks up queued runs that no worker holds, such as those
+left over when the queue was full.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, update
+
+from . import crud, durations, live, models, rollups
+from .database import SessionLocal
+from .utils import mock_ai
+from .utils.broadcast import Broadcaster
+from .utils.cache import invalidate_on_commit
+
+logger = logging.getLogger(__name__)
+
+RUN_WORKERS = int(os.getenv("RUN_WORKERS", "2"))
+RUN_QUEUE_MAX_DEPTH = int(os.getenv("RUN_QUEUE_MAX_DEPTH", "100"))
+# Fraction of each mock case's reported execution time the worker actually waits.
+MOCK_CASE_DELAY_SCALE = float(os.getenv("MOCK_CASE_DELAY_SCALE", "0.1"))
+# Seconds without a heartbeat after which a running run counts as interrupted.
+RUN_LEASE_SECONDS = float(os.getenv("RUN_LEASE_SECONDS", "60"))
+# Seconds between scans for queued runs no worker holds and for expired leases.
+RUN_RESCAN_SECONDS = float(os.getenv("RUN_RESCAN_SECONDS", "30"))
+
+
+class QueueFull(Exception):
+    """Raised when no more runs may wait for a worker."""
+
+
+class _LeaseLost(Exception):
+    """The run was recovered by another executor while this one was executing it."""
+
+
+events = Broadcaster()
+
+
+@contextmanager
+def _session() -> Iterator:
+    db = SessionLocal.session_factory()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _progress(run: models.TestRun) -> dict:
+    return {
+        "status": run.status,
+        "total_tests": run.total_tests,
+        "passed_tests": run.passed_tests,
+        "failed_tests": run.failed_tests,
+    }
+
+
+class RunExecutor:
+    """Bounded queue of run ids drained by a pool of worker threads."""
+
+    def __init__(
+        self, workers: int = RUN_WORKERS, max_depth: int = RUN_QUEUE_MAX_DEPTH, lease: float = RUN_LEASE_SECONDS
+    ) -> None:
+        self.workers = workers
+        self.max_depth = max_depth
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.rescan_interval = RUN_RESCAN_SECONDS
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: "queue.Queue[UUID | None]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_depth)
+        self._threads: List[threading.Thread] = []
+        self._queued_ids: Set[UUID] = set()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Start the worker threads and requeue runs left over from a previous process."""
+        if self._threads:
+            return
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"run-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._recover()
+        rescanner = threading.Thread(target=self._rescan, name="run-rescan", daemon=True)
+        rescanner.start()
+        self._threads.append(rescanner)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask workers to exit after their current run and wait for them."""
+        self._stopping.set()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    @contextmanager
+    def reserve(self) -> Iterator[Callable[[UUID], None]]:
+        """Hold a queue slot; the yielded callable enqueues a run into it.
+
+        Raises :class:`QueueFull` when ``max_depth`` runs are already waiting.
+        The slot is given back if the block exits without enqueueing.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull(f"{self.max_depth} runs are already waiting for a worker")
+        submitted = False
+
+        def submit(run_id: UUID) -> None:
+            nonlocal submitted
+            submitted = True
+            with self._lock:
+                self._queued_ids.add(run_id)
+            self._queue.put(run_id)
+
+        try:
+            yield submit
+        finally:
+            if not submitted:
+                self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers if self._threads else 0,
+                "max_depth": self.max_depth,
+                "queued": self._queue.qsize(),
+                "running": self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def _recover(self, queued_before: datetime | None = None) -> None:
+        """Requeue runs with expired leases, then enqueue queued runs this executor does not hold yet.
+
+        ``queued_before`` skips runs queued since, which another process may
+        be about to start.
+        """
+        with _session() as db:
+            run = models.TestRun
+            stale = run.heartbeat_at.is_(None) | (run.heartbeat_at < datetime.utcnow() - timedelta(seconds=self.lease))
+            for (run_id,) in db.query(run.id).filter(run.status == "running", stale).all():
+                # Conditional, so concurrent recoveries requeue (and clear) each run once.
+                requeued = db.execute(
+                    update(run)
+                    .where(run.id == run_id, run.status == "running", stale)
+                    .values(status="queued", claimed_by=None, heartbeat_at=None, passed_tests=0, failed_tests=0)
+                )
+                if requeued.rowcount == 1:
+                    db.execute(delete(models.TestCase).where(models.TestCase.run_id == run_id))
+            query = db.query(run.id).filter(run.status == "queued")
+            if queued_before is not None:
+                query = query.filter(run.started_at < queued_before)
+            pending = [run_id for (run_id,) in query.order_by(run.started_at)]
+        with self._lock:
+            pending = [run_id for run_id in pending if run_id not in self._queued_ids]
+        for index, run_id in enumerate(pending):
+            try:
+                with self.reserve() as submit:
+                    submit(run_id)
+            except QueueFull:
+                logger.info("Run queue is full; %s runs wait for the next rescan", len(pending) - index)
+                break
+
+    def _rescan(self) -> None:
+        while not self._stopping.wait(self.rescan_interval):
+            try:
+                self._recover(queued_before=datetime.utcnow() - timedelta(seconds=self.lease))
+            except Exception:
+                logger.exception("Failed to rescan queued runs")
+
+    def _work(self) -> None:
+        while True:
+            run_id = self._queue.get()
+            if run_id is None:
+                return
+            self._slots.release()
+            with self._lock:
+                self._queued_ids.discard(run_id)
+                self._running += 1
+            try:
+                self._execute(run_id)
+            except _LeaseLost:
+                logger.warning("Run %s was recovered by another executor; abandoning it", run_id)
+            except Exception:
+                logger.exception("Run %s failed to execute", run_id)
+                with self._lock:
+                    self.failed += 1
+                self._mark_errored(run_id)
+            else:
+                with self._lock:
+                    self.completed += 1
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+    def _execute(self, run_id: UUID) -> None:
+        run_table = models.TestRun
+        with _session() as db:
+            claimed = db.execute(
+                update(run_table)
+                .where(run_table.id == run_id, run_table.status == "queued")
+                .values(
+                    status="running",
+                    started_at=datetime.utcnow(),
+                    total_tests=mock_ai.plan_case_count(),
+                    claimed_by=self.owner,
+                    heartbeat_at=datetime.utcnow(),
+                )
+            )
+            if claimed.rowcount != 1:
+                return
+            invalidate_on_commit(db)
+            db.commit()
+            run = db.get(run_table, run_id)
+            events.publish(run_id, "status", _progress(run))
+
+            cases, occurrences = [], []
+            for index in range(run.total_tests):
+                case, occurrence = mock_ai.generate_case(run, index)
+                time.sleep(case.execution_time_ms / 1000 * MOCK_CASE_DELAY_SCALE)
+                db.add(case)
+                cases.append(case)
+                if occurrence is not None:
+                    occurrences.append(occurrence)
+                if case.status == "failed":
+                    run.failed_tests += 1
+                else:
+                    run.passed_tests += 1
+                self._heartbeat(db, run_id)
+                db.commit()
+                events.publish(
+                    run_id,
+                    "case",
+                    {"case": {name: getattr(case, name) for name in crud.CASE_SUMMARY_COLUMNS}, "run": _progress(run)},
+                )
+
+            mock_ai.finish_run(db, run, cases, occurrences)
+            self._heartbeat(db, run_id)
+            invalidate_on_commit(db)
+            live.notify_on_commit(db, completed=[run_id])
+            db.commit()
+            summary = crud.serialize_run(run).model_dump()
+        events.publish(run_id, "completed", summary)
+
+    def _heartbeat(self, db, run_id: UUID) -> None:
+        """Refresh the run's lease in the current transaction, or raise :class:`_LeaseLost`."""
+        run_table = models.TestRun
+        renewed = db.execute(
+            update(run_table)
+            .where(run_table.id == run_id, run_table.claimed_by == self.owner, run_table.status == "running")
+            .values(heartbeat_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if renewed.rowcount != 1:
+            raise _LeaseLost(run_id)
+
+    def _mark_errored(self, run_id: UUID) -> None:
+        """Fail the run with the cases it committed so far and record it in the rollups."""
+        with _session() as db:
+            run = db.get(models.TestRun, run_id)
+            if run is None or run.status != "running" or run.claimed_by != self.owner:
+                return
+            cases = db.query(models.TestCase).filter(models.TestCase.run_id == run_id).all()
+            failed = sum(1 for case in cases if case.status == "failed")
+            run.total_tests = len(cases)
+            run.passed_tests = len(cases) - failed
+            run.failed_tests = failed
+            run.duration_ms = sum(case.execution_time_ms for case in cases)
+            run.status = "failed"
+            run.completed_at = datetime.utcnow()
+            rollups.record_run(db, run)
+            durations.record_run(db, run, cases)
+            invalidate_on_commit(db)
+            live.notify_on_commit(db, completed=[run_id])
+            db.flush()
+            summary = crud.serialize_run(run).model_dump()
+        events.publish(run_id, "completed", summary)
+
+
+executor = RunExecutor()
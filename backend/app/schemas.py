@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -20,12 +20,38 @@ class TestCase(BaseModel):
     ai_insight: Optional[str]
     error_message: Optional[str]
     stack_trace: Optional[str]
+    signature_id: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class TestCaseSummary(BaseModel):
+    """Test case without its AI insight and stack trace, for paginated listings."""
+
+    id: UUID
+    name: str
+    description: Optional[str]
+    status: str
+    execution_time_ms: int
+    error_message: Optional[str]
+    signature_id: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PaginatedTestCases(BaseModel):
+    """Paginated test cases of a run."""
+
+    data: List[TestCase] | List[TestCaseSummary]
+    total: int
+    limit: int
+    offset: int
+
+
 class TestRunBase(BaseModel):
     """Shared fields for test runs."""
 
@@ -54,13 +80,21 @@ class TestRunDetail(TestRunBase):
     test_cases: List[TestCase]
 
 
+class TestRunOverview(TestRunBase):
+    """Test run without its cases, with case counts by status."""
+
+    case_counts: Dict[str, int]
+
+
 class PaginatedTestRuns(BaseModel):
     """Paginated response for test runs."""
 
     data: List[TestRunSummary]
-    total: int
+    total: Optional[int]
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class CreateTestRunRequest(BaseModel):
@@ -69,6 +103,50 @@ class CreateTestRunRequest(BaseModel):
     suite_id: UUID = Field(..., description="Test suite ID to execute")
 
 
+class TestCaseIngest(BaseModel):
+    """Externally executed test case result."""
+
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    status: Literal["passed", "failed"]
+    execution_time_ms: int = Field(..., ge=0)
+    ai_insight: Optional[str] = None
+    error_message: Optional[str] = None
+    stack_trace: Optional[str] = None
+
+
+class TestRunIngest(BaseModel):
+    """Externally executed test run; counts and status are derived from its cases."""
+
+    suite_id: UUID
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    duration_ms: Optional[int] = Field(None, ge=0)
+    test_cases: List[TestCaseIngest] = Field(default_factory=list)
+
+
+class BulkIngestRequest(BaseModel):
+    """Batch of runs to ingest; each item is validated independently."""
+
+    runs: List[dict] = Field(..., max_length=5000)
+
+
+class BulkIngestError(BaseModel):
+    """Why a single item of a bulk ingest was rejected."""
+
+    index: int
+    errors: List[str]
+
+
+class BulkIngestResult(BaseModel):
+    """Outcome of a bulk ingest."""
+
+    accepted: int
+    rejected: int
+    run_ids: List[UUID]
+    errors: List[BulkIngestError]
+
+
 class TestSuite(BaseModel):
     """Basic test suite representation."""
 
@@ -108,3 +186,136 @@ class DashboardTrends(BaseModel):
     passed: List[int]
     failed: List[int]
 
+
+class TrendSeries(BaseModel):
+    """Counters of one series, one value per bucket."""
+
+    key: str
+    label: str
+    runs: List[int]
+    failed_runs: List[int]
+    passed_tests: List[int]
+    failed_tests: List[int]
+    avg_duration_ms: List[Optional[float]]
+
+
+class DashboardTrendSeries(BaseModel):
+    """Trend series over a range, bucketed in a time zone and kept within a point budget."""
+
+    granularity: Literal["hour", "day", "week", "month"]
+    step: int
+    downsampled: bool
+    timezone: str
+    start: datetime
+    end: datetime
+    buckets: List[datetime]
+    series: List[TrendSeries]
+
+
+class AffectedSuite(BaseModel):
+    """Suite in which a failure signature occurred."""
+
+    suite_id: UUID
+    suite_name: str
+    occurrences: int
+    last_seen: datetime
+
+
+class FailureCluster(BaseModel):
+    """Failed test cases grouped by normalized error signature."""
+
+    signature_id: str
+    normalized: str
+    sample_error_message: Optional[str]
+    occurrences: int
+    first_seen: datetime
+    last_seen: datetime
+    affected_suites: List[AffectedSuite]
+
+
+class FlakyTest(BaseModel):
+    """Flakiness statistics for a test over a suite's recent runs."""
+
+    suite_id: UUID
+    suite_name: str
+    test_name: str
+    runs: int
+    failures: int
+    flip_rate: float
+    current_failure_streak: int
+    max_failure_streak: int
+    last_status: str
+    flakiness_score: float
+    classification: Literal["flaky", "broken", "stable"]
+
+
+class DurationPercentiles(BaseModel):
+    """Duration distribution estimated from quantile sketches (within 1%)."""
+
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class SuiteDurations(DurationPercentiles):
+    """Run duration percentiles of a suite."""
+
+    suite_id: UUID
+    suite_name: str
+
+
+class TestDurations(DurationPercentiles):
+    """Execution time percentiles of a test within a suite."""
+
+    suite_id: UUID
+    suite_name: str
+    test_name: str
+
+
+class TestSlowdown(BaseModel):
+    """A test whose recent execution time percentile rose above its baseline."""
+
+    suite_id: UUID
+    suite_name: str
+    test_name: str
+    percentile: Literal["p50", "p90", "p99"]
+    recent_ms: float
+    baseline_ms: float
+    change: float = Field(..., description="Relative increase, e.g. 0.25 for 25% slower")
+    recent_count: int
+    baseline_count: int
+
+
+class CaseDiff(BaseModel):
+    """How a test (matched by name) differs between a run and its baseline."""
+
+    name: str
+    status: Optional[str]
+    base_status: Optional[str]
+    execution_time_ms: Optional[int]
+    base_execution_time_ms: Optional[int]
+    duration_delta_ms: Optional[int]
+    error_message: Optional[str] = None
+    signature_id: Optional[str] = None
+
+
+class RunComparison(BaseModel):
+    """Differences between a run and a baseline run, grouped by kind of change.
+
+    ``counts`` covers every test, including ``unchanged`` ones; each list is
+    capped at the requested limit.
+    """
+
+    run: TestRunSummary
+    base_run: TestRunSummary
+    counts: Dict[str, int]
+    newly_failing: List[CaseDiff]
+    newly_passing: List[CaseDiff]
+    still_failing: List[CaseDiff]
+    added: List[CaseDiff]
+    removed: List[CaseDiff]
+    slower: List[CaseDiff]
+    faster: List[CaseDiff]
@@ -0,0 +1,65 @@
+"""Index-backed search over test runs.
+
+A search term matches a run when it is a substring of the suite name, a
+prefix of the run id, or a substring of any of the run's test case names or
+error messages. On PostgreSQL the substring matches are served by ``pg_trgm``
+GIN indexes (error messages through the deduplicated ``text_blobs`` table)
+and the id prefix by a primary-key range scan; SQLite evaluates the same
+predicates without the trigram indexes.
+"""
+
+from __future__ import annotations
+
+import re
+from uuid import UUID
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.engine import Engine
+
+from . import models
+
+_HEX = re.compile(r"^[0-9a-f]{1,32}$")
+
+TRIGRAM_INDEXES = {
+    "ix_test_suites_name_trgm": ("test_suites", "name"),
+    "ix_test_cases_name_trgm": ("test_cases", "name"),
+    "ix_text_blobs_content_trgm": ("text_blobs", "content"),
+}
+
+
+def run_id_bounds(term: str) -> tuple[UUID, UUID] | None:
+    """Return the inclusive UUID range sharing ``term`` as a hex prefix."""
+    digits = term.replace("-", "").lower()
+    if not _HEX.match(digits):
+        return None
+    return UUID(digits.ljust(32, "0")), UUID(digits.ljust(32, "f"))
+
+
+def run_search_filter(term: str):
+    """Build the WHERE clause for searching runs by ``term``."""
+    suite, run, case, blob = models.TestSuite, models.TestRun, models.TestCase, models.TextBlob
+    clauses = [
+        run.suite_id.in_(select(suite.id).where(suite.name.icontains(term, autoescape=True))),
+        run.id.in_(
+            select(case.run_id).where(
+                or_(
+                    case.name.icontains(term, autoescape=True),
+                    case.error_message_id.in_(select(blob.id).where(blob.content.icontains(term, autoescape=True))),
+                )
+            )
+        ),
+    ]
+    bounds = run_id_bounds(term.strip())
+    if bounds:
+        clauses.append(run.id.between(*bounds))
+    return or_(*clauses)
+
+
+def ensure_search_indexes(bind: Engine) -> None:
+    """Create the ``pg_trgm`` extension and trigram indexes on PostgreSQL."""
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for name, (table, column) in TRIGRAM_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"))
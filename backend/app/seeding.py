@@ -0,0 +1,203 @@
+"""Bulk generation of completed runs for seeding and benchmarks.
+
+Runs and cases are built in memory as plain row dicts, in batches, and
+written with one driver-level executemany per table (``COPY`` on PostgreSQL
+with psycopg2), bypassing the ORM unit of work and its flush per run. Each
+suite gets a stable set of test names with their own failure rates (mostly
+stable, some flaky, a few broken); failed cases are signed, and the rollups,
+duration sketches and failure signatures are maintained as the API would.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from . import blobs, durations, models, rollups, signatures
+from .utils import mock_ai
+
+DESCRIPTION = "Automated scenario generated by the AI engine"
+# Failure probability per test name: most are stable, some flaky, a few broken.
+FAILURE_RATES = ((0.75, 0.02), (0.2, 0.3), (0.05, 0.95))
+
+
+class Batch(NamedTuple):
+    runs: List[dict]
+    cases: List[dict]
+    occurrences: List[signatures.Occurrence]
+
+
+def random_uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+@lru_cache(maxsize=1)
+def _texts() -> Tuple[Dict[str, str], Dict[Tuple[str, str], Tuple[str, str]]]:
+    """Blob ids of the fixed mock texts and signatures of every error/trace pair."""
+    contents = [
+        DESCRIPTION,
+        *mock_ai.PASS_INSIGHTS,
+        *mock_ai.FAIL_INSIGHTS,
+        *mock_ai.ERROR_MESSAGES,
+        *mock_ai.STACK_TRACES,
+    ]
+    blob_ids = {content: blobs.blob_id(content) for content in contents}
+    signed = {
+        (error, trace): signatures.sign(error, trace)
+        for error in mock_ai.ERROR_MESSAGES
+        for trace in mock_ai.STACK_TRACES
+    }
+    return blob_ids, signed
+
+
+def store_texts(db: Session) -> None:
+    """Insert the blobs generated cases refer to; call once before writing batches."""
+    blobs.store(db, {key: content for content, key in _texts()[0].items()})
+
+
+def _failure_rates(rng: random.Random, count: int) -> List[float]:
+    rates = []
+    for _ in range(count):
+        pick = rng.random()
+        for share, rate in FAILURE_RATES:
+            if pick < share:
+                break
+            pick -= share
+        rates.append(rate)
+    return rates
+
+
+def run_batches(
+    suite_ids: Sequence,
+    *,
+    runs: int,
+    cases_per_run: int = 18,
+    jitter: int = 0,
+    days: int = 365,
+    batch: int = 5000,
+    rng: random.Random | None = None,
+) -> Iterator[Batch]:
+    """Yield ``runs`` completed runs spread over the last ``days``, ``batch`` at a time.
+
+    Each run has ``cases_per_run`` cases, give or take ``jitter``.
+    """
+    rng = rng or random.Random()
+    blob_ids, signed = _texts()
+    now = datetime.utcnow()
+    span = days * 86400
+    suite_rates: Dict[object, List[float]] = {}
+    for offset in range(0, runs, batch):
+        current = Batch([], [], [])
+        for _ in range(min(batch, runs - offset)):
+            run_id = random_uuid(rng)
+            suite_id = rng.choice(suite_ids)
+            rates = suite_rates.get(suite_id)
+            if rates is None:
+                rates = suite_rates[suite_id] = _failure_rates(rng, cases_per_run + jitter)
+            case_count = cases_per_run + (rng.randint(-jitter, jitter) if jitter else 0)
+            started_at = now - timedelta(seconds=rng.randint(0, span))
+            failed = duration = 0
+            for index in range(case_count):
+                status = "failed" if rng.random() < rates[index] else "passed"
+                execution_ms = 50 + int(rng.random() * 751)
+                duration += execution_ms
+                row = {
+                    "id": random_uuid(rng),
+                    "run_id": run_id,
+                    "name": mock_ai.case_name(index),
+                    "description_id": blob_ids[DESCRIPTION],
+                    "status": status,
+                    "execution_time_ms": execution_ms,
+                    "error_message_id": None,
+                    "stack_trace_id": None,
+                    "signature_id": None,
+                    "created_at": started_at,
+                }
+                if status == "failed":
+                    failed += 1
+                    error, trace = rng.choice(mock_ai.ERROR_MESSAGES), rng.choice(mock_ai.STACK_TRACES)
+                    signature, normalized = signed[(error, trace)]
+                    row.update(
+                        ai_insight_id=blob_ids[rng.choice(mock_ai.FAIL_INSIGHTS)],
+                        error_message_id=blob_ids[error],
+                        stack_trace_id=blob_ids[trace],
+                        signature_id=signature,
+                    )
+                    current.occurrences.append(signatures.Occurrence(signature, normalized, error, suite_id, started_at))
+                else:
+                    row["ai_insight_id"] = blob_ids[rng.choice(mock_ai.PASS_INSIGHTS)]
+                current.cases.append(row)
+            current.runs.append(
+                {
+                    "id": run_id,
+                    "suite_id": suite_id,
+                    "status": "failed" if failed else "passed",
+                    "started_at": started_at,
+                    "completed_at": started_at + timedelta(milliseconds=duration),
+                    "duration_ms": duration,
+                    "total_tests": case_count,
+                    "passed_tests": case_count - failed,
+                    "failed_tests": failed,
+                }
+            )
+        yield current
+
+
+def copy_rows(db: Session, table, rows: List[dict]) -> None:
+    """Write rows with PostgreSQL ``COPY`` when psycopg2 is the driver, else a driver-level executemany.
+
+    Both skip SQLAlchemy's per-row parameter processing, which otherwise
+    costs more than the inserts themselves.
+    """
+    if not rows:
+        return
+    connection = db.connection()
+    dialect = connection.dialect
+    columns = list(rows[0])
+    if dialect.name != "postgresql" or dialect.driver != "psycopg2":
+        processors = [table.c[column].type.bind_processor(dialect) for column in columns]
+        placeholder = "?" if dialect.paramstyle == "qmark" else "%s"
+        connection.exec_driver_sql(
+            f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})",
+            [
+                tuple(
+                    value if process is None or value is None else process(value)
+                    for process, value in zip(processors, row.values())
+                )
+                for row in rows
+            ],
+        )
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if row[column] is None else row[column] for column in columns])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def write_batch(db: Session, batch: Batch) -> None:
+    """Insert a batch of runs and cases and fold them into the rollups, duration sketches and signatures."""
+    copy_rows(db, models.TestRun.__table__, batch.runs)
+    copy_rows(db, models.TestCase.__table__, batch.cases)
+    rollups.record_runs(db, batch.runs)
+    durations.record(db, batch.runs, batch.cases)
+    signatures.record(db, batch.occurrences)
+
+
+def seed_runs(db: Session, suite_ids: Sequence, *, runs: int, **options) -> None:
+    """Generate and insert ``runs`` completed runs within ``db``'s transaction.
+
+    ``options`` are passed to :func:`run_batches`.
+    """
+    store_texts(db)
+    for batch in run_batches(suite_ids, runs=runs, **options):
+        write_batch(db, batch)
@@ -0,0 +1,165 @@
+"""Failure signatures: clustering failed test cases that share a root cause.
+
+Error messages and stack traces are normalized (line numbers, ids, addresses,
+timings and other numbers are masked) and hashed into a signature id that is
+stored on the failed ``TestCase`` at write time. Per-signature and
+per-signature-per-suite counters are upserted in the same transaction, so the
+clusters endpoint reads only the ``failure_signatures`` tables.
+
+``python -m app.signatures`` signs failed cases that predate signatures.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from . import blobs, models
+from .database import upsert_insert
+
+BACKFILL_BATCH_SIZE = 2000
+
+_NORMALIZERS = [
+    (re.compile(r'File "(?:[^"]*[/\\])?([^"/\\]+)"'), r'File "\1"'),
+    (re.compile(r"\bline \d+"), "line <n>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE), "<addr>"),
+    (re.compile(r"\b[0-9a-f]{12,}\b", re.IGNORECASE), "<id>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\s*(?:ms|s|sec|seconds)\b"), "<duration>"),
+    (re.compile(r"\d+"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class Occurrence(NamedTuple):
+    """A failed case contributing to a signature."""
+
+    signature_id: str
+    normalized: str
+    error_message: str | None
+    suite_id: object
+    seen_at: datetime
+
+
+def normalize(error_message: str | None, stack_trace: str | None) -> str:
+    """Reduce a failure to the text that identifies its cause."""
+    text = "\n".join(part for part in (error_message, stack_trace) if part)
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def signature_id(normalized: str) -> str:
+    """Hash normalized failure text into a stable 20-character id."""
+    return hashlib.blake2b(normalized.encode(), digest_size=10).hexdigest()
+
+
+def sign(error_message: str | None, stack_trace: str | None) -> tuple[str, str]:
+    """Return ``(signature_id, normalized)`` for a failure."""
+    normalized = normalize(error_message, stack_trace) or "<no error details>"
+    return signature_id(normalized), normalized
+
+
+def _latest(column, excluded):
+    return case((column < excluded, excluded), else_=column)
+
+
+def _earliest(column, excluded):
+    return case((column > excluded, excluded), else_=column)
+
+
+def record(db: Session, occurrences: Iterable[Occurrence]) -> None:
+    """Fold failure occurrences into the signature counters."""
+    signatures: dict[str, dict] = {}
+    per_suite: dict[tuple, dict] = {}
+    for item in occurrences:
+        entry = signatures.get(item.signature_id)
+        if entry is None:
+            entry = signatures[item.signature_id] = {
+                "id": item.signature_id,
+                "normalized": item.normalized,
+                "sample_error_message": item.error_message,
+                "occurrences": 0,
+                "first_seen": item.seen_at,
+                "last_seen": item.seen_at,
+            }
+        entry["occurrences"] += 1
+        entry["first_seen"] = min(entry["first_seen"], item.seen_at)
+        entry["last_seen"] = max(entry["last_seen"], item.seen_at)
+
+        key = (item.signature_id, item.suite_id)
+        suite_entry = per_suite.setdefault(
+            key, {"signature_id": key[0], "suite_id": key[1], "occurrences": 0, "last_seen": item.seen_at}
+        )
+        suite_entry["occurrences"] += 1
+        suite_entry["last_seen"] = max(suite_entry["last_seen"], item.seen_at)
+
+    if not signatures:
+        return
+
+    insert = upsert_insert(db)
+    table = models.FailureSignature.__table__
+    stmt = insert(table)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                "occurrences": table.c.occurrences + stmt.excluded.occurrences,
+                "first_seen": _earliest(table.c.first_seen, stmt.excluded.first_seen),
+                "last_seen": _latest(table.c.last_seen, stmt.excluded.last_seen),
+            },
+        ),
+        list(signatures.values()),
+    )
+
+    table = models.FailureSignatureSuite.__table__
+    stmt = insert(table)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.signature_id, table.c.suite_id],
+            set_={
+                "occurrences": table.c.occurrences + stmt.excluded.occurrences,
+                "last_seen": _latest(table.c.last_seen, stmt.excluded.last_seen),
+            },
+        ),
+        list(per_suite.values()),
+    )
+
+
+def backfill(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Sign failed cases that have no signature yet; returns how many were signed."""
+    signed = 0
+    while True:
+        rows = (
+            db.query(models.TestCase, models.TestRun.suite_id, models.TestRun.started_at)
+            .join(models.TestRun)
+            .filter(models.TestCase.status == "failed", models.TestCase.signature_id.is_(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return signed
+        blobs.prefetch(db, [test_case for test_case, _, _ in rows])
+        occurrences = []
+        for test_case, suite_id, started_at in rows:
+            test_case.signature_id, normalized = sign(test_case.error_message, test_case.stack_trace)
+            occurrences.append(
+                Occurrence(test_case.signature_id, normalized, test_case.error_message, suite_id, started_at)
+            )
+        db.flush()
+        record(db, occurrences)
+        signed += len(rows)
+
+
+if __name__ == "__main__":
+    from .database import Base, engine, session_scope, upgrade_schema
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    with session_scope() as session:
+        print(f"Signed {backfill(session)} failed test cases")
@@ -0,0 +1,173 @@
+"""Time buckets for multi-resolution dashboard trends.
+
+:class:`Buckets` splits a range into consecutive buckets of ``step`` hours,
+days, weeks (starting on Monday) or months in a time zone. Day and coarser
+buckets follow the zone's calendar, DST changes included; hour buckets have a
+fixed length and are anchored at local midnight of the range start.
+:func:`plan` widens the requested granularity until the range fits a point
+budget, so long ranges come back as fewer, wider buckets whose counts still
+add up to the same totals. :func:`local_day` groups UTC hour buckets by the
+calendar day they fall on in a time zone, inside the database.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import Date, case, cast, func, type_coerce
+from sqlalchemy.orm import Session
+
+UNITS = ("hour", "day", "week", "month")
+# (unit, step) from narrowest to widest; widening continues in multiples of a year.
+_LADDER = (
+    ("hour", 1),
+    ("hour", 2),
+    ("hour", 3),
+    ("hour", 6),
+    ("hour", 12),
+    ("day", 1),
+    ("day", 2),
+    ("day", 3),
+    ("week", 1),
+    ("week", 2),
+    ("month", 1),
+    ("month", 2),
+    ("month", 3),
+    ("month", 6),
+    ("month", 12),
+)
+
+
+class Buckets:
+    """The ``unit``/``step`` buckets of ``tz`` overlapping ``[start, end)``."""
+
+    def __init__(self, unit: str, step: int, start: datetime, end: datetime, tz: tzinfo) -> None:
+        self.unit = unit
+        self.step = step
+        self.tz = tz
+        local_start = start.astimezone(tz)
+        self._anchor_date = local_start.date()
+        if unit == "week":
+            self._anchor_date -= timedelta(days=local_start.weekday())
+        self._anchor = datetime.combine(local_start.date(), time(), tz).astimezone(timezone.utc)
+        self.first = self.ordinal(start)
+        self.count = self.ordinal(end - timedelta(microseconds=1)) - self.first + 1
+
+    def ordinal(self, moment: datetime) -> int:
+        """Number of the bucket holding the aware ``moment``, counted from the anchor."""
+        if self.unit == "hour":
+            return int((moment - self._anchor).total_seconds() // 3600) // self.step
+        return self._day_ordinal(moment.astimezone(self.tz).date())
+
+    def _day_ordinal(self, local: date) -> int:
+        if self.unit == "month":
+            return (local.year * 12 + local.month - 1) // self.step
+        days = (local - self._anchor_date).days
+        return days // (self.step * 7 if self.unit == "week" else self.step)
+
+    def position(self, moment: datetime) -> int | None:
+        """Index in :meth:`starts` of the bucket holding ``moment``, or ``None`` outside the range."""
+        return self._within(self.ordinal(moment) - self.first)
+
+    def position_of_day(self, local: date) -> int | None:
+        """Like :meth:`position` for a whole local calendar day; only for day and wider units."""
+        return self._within(self._day_ordinal(local) - self.first)
+
+    def _within(self, index: int) -> int | None:
+        return index if 0 <= index < self.count else None
+
+    def start_of(self, ordinal: int) -> datetime:
+        """Start of bucket ``ordinal`` as an aware local datetime."""
+        if self.unit == "hour":
+            return (self._anchor + timedelta(hours=ordinal * self.step)).astimezone(self.tz)
+        if self.unit == "month":
+            months = ordinal * self.step
+            day = date(months // 12, months % 12 + 1, 1)
+        else:
+            day = self._anchor_date + timedelta(days=ordinal * self.step * (7 if self.unit == "week" else 1))
+        return datetime.combine(day, time(), self.tz)
+
+    def starts(self) -> List[datetime]:
+        return [self.start_of(ordinal) for ordinal in range(self.first, self.first + self.count)]
+
+    def span(self) -> Tuple[datetime, datetime]:
+        """UTC start and exclusive end of the whole bucketed range."""
+        return (
+            self.start_of(self.first).astimezone(timezone.utc),
+            self.start_of(self.first + self.count).astimezone(timezone.utc),
+        )
+
+
+def _ladder(unit: str) -> Iterator[Tuple[str, int]]:
+    position = next(index for index, (name, _) in enumerate(_LADDER) if name == unit)
+    yield from _LADDER[position:]
+    years = 2
+    while True:
+        yield "month", 12 * years
+        years *= 2
+
+
+def plan(unit: str, start: datetime, end: datetime, tz: tzinfo, max_points: int) -> Buckets:
+    """Return the narrowest buckets, starting from ``unit``, giving at most ``max_points`` buckets."""
+    for candidate, step in _ladder(unit):
+        buckets = Buckets(candidate, step, start, end, tz)
+        if buckets.count <= max_points:
+            return buckets
+
+
+def utc_aligned(tz: tzinfo, start: datetime, end: datetime) -> bool:
+    """Whether ``tz`` keeps a zero UTC offset over the range, so UTC day buckets line up with its days.
+
+    The offset is sampled weekly, which catches every DST period.
+    """
+    moment = start
+    while moment < end:
+        if moment.astimezone(tz).utcoffset():
+            return False
+        moment += timedelta(days=7)
+    return not end.astimezone(tz).utcoffset()
+
+
+def _offset(tz: tzinfo, epoch: int) -> int:
+    return int(datetime.fromtimestamp(epoch, timezone.utc).astimezone(tz).utcoffset().total_seconds())
+
+
+def offset_segments(tz: tzinfo, start: datetime, end: datetime) -> List[Tuple[datetime, int]]:
+    """UTC offsets of ``tz`` over ``[start, end)`` as ``(from, offset seconds)`` pairs, in order.
+
+    Changes are found by weekly sampling, then bisected to the second.
+    """
+    low, high = int(start.timestamp()), int(end.timestamp())
+    segments = [(low, _offset(tz, low))]
+    week = 7 * 86400
+    for moment in range(low, high, week):
+        following = min(moment + week, high)
+        if _offset(tz, following) == segments[-1][1]:
+            continue
+        before, after = moment, following
+        while after - before > 1:
+            middle = (before + after) // 2
+            if _offset(tz, middle) == segments[-1][1]:
+                before = middle
+            else:
+                after = middle
+        segments.append((after, _offset(tz, after)))
+    return [(datetime.fromtimestamp(epoch, timezone.utc), offset) for epoch, offset in segments]
+
+
+def local_day(db: Session, hour, segments: List[Tuple[datetime, int]]):
+    """SQL expression giving the local date of the naive UTC ``hour`` column under ``segments``' offsets."""
+    postgresql = db.get_bind().dialect.name == "postgresql"
+
+    def shifted(offset: int):
+        if postgresql:
+            return cast(hour + timedelta(seconds=offset), Date)
+        return type_coerce(func.date(hour, f"{offset:+d} seconds"), Date)
+
+    last = shifted(segments[-1][1])
+    whens = [
+        (hour < following.replace(tzinfo=None), shifted(offset))
+        for (_, offset), (following, _) in zip(segments, segments[1:])
+    ]
+    return case(*whens, else_=last) if whens else last
@@ -0,0 +1,90 @@
+"""In-process fan-out of events from worker threads to Server-Sent Events streams."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Hashable, List, Tuple
+
+from . import fastjson
+
+SUBSCRIBER_BUFFER = 256
+SSE_KEEPALIVE_S = 15.0
+
+
+class Broadcaster:
+    """Deliver ``(event, data)`` pairs published under a key to its asyncio subscribers.
+
+    Each subscriber gets a bounded queue. A subscriber that falls behind is
+    sent ``None`` and dropped; SSE clients reconnect and start again from a
+    fresh snapshot.
+    """
+
+    def __init__(self, buffer: int = SUBSCRIBER_BUFFER) -> None:
+        self.buffer = buffer
+        self._subscribers: Dict[Hashable, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, key: Hashable) -> asyncio.Queue:
+        """Register a subscriber on the running event loop."""
+        subscriber = asyncio.Queue(maxsize=self.buffer)
+        with self._lock:
+            self._subscribers.setdefault(key, []).append((asyncio.get_running_loop(), subscriber))
+        return subscriber
+
+    def unsubscribe(self, key: Hashable, subscriber: asyncio.Queue) -> None:
+        with self._lock:
+            remaining = [entry for entry in self._subscribers.get(key, []) if entry[1] is not subscriber]
+            if remaining:
+                self._subscribers[key] = remaining
+            else:
+                self._subscribers.pop(key, None)
+
+    def subscriber_count(self, key: Hashable) -> int:
+        with self._lock:
+            return len(self._subscribers.get(key, ()))
+
+    def publish(self, key: Hashable, event: str, data: Any) -> None:
+        """Deliver ``(event, data)`` to every subscriber of ``key``; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, []))
+        for loop, subscriber in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, key, subscriber, (event, data))
+            except RuntimeError:
+                # The subscriber's event loop has shut down.
+                self.unsubscribe(key, subscriber)
+
+    def _offer(self, key: Hashable, subscriber: asyncio.Queue, item: Tuple[str, Any]) -> None:
+        try:
+            subscriber.put_nowait(item)
+        except asyncio.QueueFull:
+            self.unsubscribe(key, subscriber)
+            while not subscriber.empty():
+                subscriber.get_nowait()
+            subscriber.put_nowait(None)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + fastjson.dumps(data) + b"\n\n"
+
+
+async def relay(request, subscriber: asyncio.Queue, *, last_event: str | None = None) -> AsyncIterator[bytes]:
+    """Encode a subscriber's events as SSE until the client leaves or the subscriber is dropped.
+
+    Stops after sending ``last_event`` when given; sends a keep-alive comment
+    whenever the stream has been idle for ``SSE_KEEPALIVE_S``.
+    """
+    while not await request.is_disconnected():
+        try:
+            item = await asyncio.wait_for(subscriber.get(), SSE_KEEPALIVE_S)
+        except asyncio.TimeoutError:
+            yield b": keep-alive\n\n"
+            continue
+        if item is None:
+            return
+        event, data = item
+        yield sse_event(event, data)
+        if event == last_event:
+            return
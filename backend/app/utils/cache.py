@@ -0,0 +1,207 @@
+"""In-process TTL/LRU cache for read-mostly API responses.
+
+Entries keep the encoded JSON body and, once requested, its compressed
+variants, so a hit skips both encoding and compression. With a read replica
+configured, :data:`response_cache` is filled from replica reads, so for
+``DATABASE_READ_LAG_SECONDS`` after it is cleared responses are served
+without being cached; otherwise a lagging replica could pin pre-write data
+for the whole TTL. Every :meth:`ResponseCache.clear` also bumps a generation
+counter, and a value whose computation started before the latest clear is
+served without being kept, so a read racing a write cannot outlive it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..database import DATABASE_READ_LAG_SECONDS, DATABASE_READ_URL
+from . import compression, fastjson
+
+_INVALIDATE_FLAG = "invalidate_response_cache"
+
+
+class CacheEntry(NamedTuple):
+    """Cached value with its encoded JSON body, entity tag and compressed bodies by encoding."""
+
+    value: Any
+    body: bytes
+    etag: str
+    expires_at: float
+    compressed: Dict[str, bytes]
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode a schema instance, a plain dict, or a list of either as JSON."""
+    if isinstance(value, BaseModel):
+        return value.model_dump_json().encode()
+    return fastjson.dumps(value)
+
+
+class ResponseCache:
+    """Bounded LRU mapping with per-entry expiry and hit/miss counters."""
+
+    def __init__(
+        self, maxsize: int = 256, ttl: float = 30.0, max_entry_bytes: int | None = None, refill_delay: float = 0.0
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.refill_delay = refill_delay
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.uncached_fills = 0
+        self._cleared_at = float("-inf")
+        self._generation = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    @property
+    def generation(self) -> int:
+        """Number of :meth:`clear` calls so far; read it before computing a value to :meth:`set`."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> CacheEntry:
+        """Cache ``value``; bodies over ``max_entry_bytes``, values computed within
+        ``refill_delay`` of the last :meth:`clear`, and values whose ``generation``
+        predates the last :meth:`clear` are returned without being kept."""
+        body = encode_json(value)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        now = time.monotonic()
+        entry = CacheEntry(value, body, etag, now + self.ttl, {})
+        if self.max_entry_bytes is not None and len(body) > self.max_entry_bytes:
+            return entry
+        with self._lock:
+            stale = generation is not None and generation != self._generation
+            if stale or now - self._cleared_at < self.refill_delay:
+                self.uncached_fills += 1
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self._cleared_at = time.monotonic()
+            self._generation += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "uncached_fills": self.uncached_fills,
+            }
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30")),
+    refill_delay=DATABASE_READ_LAG_SECONDS if DATABASE_READ_URL else 0.0,
+)
+# Completed runs never change, so their responses are not cleared on commit.
+run_cache = ResponseCache(
+    maxsize=int(os.getenv("RUN_CACHE_MAX_ENTRIES", "128")),
+    ttl=float(os.getenv("RUN_CACHE_TTL_SECONDS", "600")),
+    max_entry_bytes=int(os.getenv("RUN_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))),
+)
+
+
+async def _compressed(entry: CacheEntry, encoding: str) -> bytes:
+    body = entry.compressed.get(encoding)
+    if body is None:
+        body = await run_in_threadpool(compression.compress, entry.body, encoding, compression.DENSE)
+        entry.compressed[encoding] = body
+    return body
+
+
+async def cached_response(
+    request: Request,
+    key: Hashable,
+    factory: Callable[[], Awaitable[Any]],
+    *,
+    cache: ResponseCache = response_cache,
+    keep: Callable[[Any], bool] | None = None,
+) -> Response | None:
+    """Serve ``await factory()`` through ``cache``, honouring ``If-None-Match``.
+
+    Values for which ``keep`` returns false are served without being cached.
+    Bodies are sent compressed when the client accepts it, compressing each
+    entry at most once per encoding. Returns ``None`` when the factory yields
+    nothing (e.g. a missing resource).
+    """
+    entry = cache.get(key)
+    if entry is None:
+        generation = cache.generation
+        value = await factory()
+        if value is None:
+            return None
+        if keep is not None and not keep(value):
+            return fastjson.FastJSONResponse(value)
+        entry = cache.set(key, value, generation)
+    etag, body = entry.etag, entry.body
+    headers = {"Cache-Control": "no-cache"}
+    encoding = compression.negotiate(request.headers.get("accept-encoding", ""))
+    if encoding is not None and len(entry.body) >= compression.MIN_BYTES:
+        # Each representation gets its own tag; a client may revalidate with either.
+        etag = f'{entry.etag[:-1]}-{encoding}"'
+        headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    headers["ETag"] = etag
+    if_none_match = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if entry.etag in if_none_match or etag in if_none_match:
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    if "Content-Encoding" in headers:
+        body = await _compressed(entry, encoding)
+        compression.stats.record(encoding, len(entry.body), len(body))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_on_commit(db) -> None:
+    """Clear the response cache once ``db``'s current transaction commits."""
+    db.info[_INVALIDATE_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_after_commit(session: Session) -> None:
+    if session.info.pop(_INVALIDATE_FLAG, False):
+        response_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDATE_FLAG, None)
@@ -0,0 +1,214 @@
+"""Negotiated response compression (zstd, brotli, gzip).
+
+:class:`CompressionMiddleware` compresses responses of at least
+``COMPRESSION_MIN_BYTES`` for clients that accept it, picking the best
+encoding from ``Accept-Encoding``. Complete bodies are compressed in one go;
+streamed ones (exports) chunk by chunk. Responses that already carry a
+``Content-Encoding`` pass through untouched, which is how cached payloads
+compressed once by :mod:`app.utils.cache` are served, and Server-Sent Events
+are never buffered. Brotli and zstd need the optional ``brotli`` and
+``zstandard`` packages; gzip is always available.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Per-request compression favours speed; payloads compressed once for the
+# response cache can afford a denser level.
+FAST, DENSE = "fast", "dense"
+_LEVELS = {
+    "zstd": {FAST: 3, DENSE: 12},
+    "br": {FAST: 4, DENSE: 9},
+    "gzip": {FAST: 6, DENSE: 9},
+}
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _gzip(level: int) -> Any:
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def _encoders() -> Dict[str, Callable[[int], Any]]:
+    """Streaming compressor factories by encoding, in order of preference."""
+    encoders: Dict[str, Callable[[int], Any]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = lambda level: zstandard.ZstdCompressor(level=level).compressobj()
+    if brotli is not None:
+        encoders["br"] = lambda level: _BrotliStream(brotli.Compressor(quality=level))
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+class _BrotliStream:
+    """Give brotli's compressor the ``compress``/``flush`` interface of zlib's."""
+
+    def __init__(self, compressor) -> None:
+        self._compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+ENCODERS = _encoders()
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Return the preferred supported encoding listed in ``Accept-Encoding``, if any."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -rank, encoding) for rank, encoding in enumerate(ENCODERS)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str, effort: str = FAST) -> bytes:
+    stream = ENCODERS[encoding](_LEVELS[encoding][effort])
+    return stream.compress(body) + stream.flush()
+
+
+def compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+class CompressionStats:
+    """Bytes before and after compression, per encoding."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, encoding: str, raw: int, sent: int, responses: int = 1) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(encoding, [0, 0, 0])
+            totals[0] += responses
+            totals[1] += raw
+            totals[2] += sent
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            result = {}
+            for encoding, (responses, raw, sent) in self._totals.items():
+                result[f"{encoding}_responses"] = responses
+                result[f"{encoding}_bytes_in"] = raw
+                result[f"{encoding}_bytes_out"] = sent
+            return result
+
+
+stats = CompressionStats()
+
+
+def _header(headers: Iterable[Tuple[bytes, bytes]], name: bytes) -> str | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _with_encoding(headers: Iterable[Tuple[bytes, bytes]], encoding: str, length: int | None) -> list:
+    updated = [(key, value) for key, value in headers if key.lower() not in (b"content-length", b"vary")]
+    vary = _header(headers, b"vary")
+    updated.append((b"vary", f"{vary}, Accept-Encoding".encode() if vary else b"Accept-Encoding"))
+    updated.append((b"content-encoding", encoding.encode()))
+    if length is not None:
+        updated.append((b"content-length", str(length).encode()))
+    return updated
+
+
+class CompressionMiddleware:
+    """Compress compressible responses of at least ``minimum_size`` bytes."""
+
+    def __init__(self, app, minimum_size: int = MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = scope.get("headers", [])
+        encoding = negotiate(_header(request_headers, b"accept-encoding") or "")
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Held back until the first body chunk shows whether it is worth compressing.
+        pending: dict | None = None
+        stream: Any = None
+        raw = sent = 0
+
+        async def send_compressed(message) -> None:
+            nonlocal pending, stream, raw, sent
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type") or ""
+                if _header(headers, b"content-encoding") is None and compressible(content_type):
+                    pending = message
+                else:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or (pending is None and stream is None):
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if pending is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    await send(pending)
+                    pending = None
+                    await send(message)
+                    return
+                stream = ENCODERS[encoding](_LEVELS[encoding][FAST])
+                if more_body:
+                    pending["headers"] = _with_encoding(pending["headers"], encoding, None)
+                    await send(pending)
+                    pending = None
+            raw += len(body)
+            chunk = stream.compress(body) if more_body else stream.compress(body) + stream.flush()
+            sent += len(chunk)
+            if pending is not None:
+                pending["headers"] = _with_encoding(pending["headers"], encoding, len(chunk))
+                await send(pending)
+                pending = None
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                stats.record(encoding, raw, sent)
+
+        await self.app(scope, receive, send_compressed)
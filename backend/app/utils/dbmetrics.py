@@ -0,0 +1,198 @@
+"""Connection pool and SQL statement instrumentation.
+
+:func:`timed_pool_class` wraps an engine's pool class so every checkout
+records how long it waited for a connection (and whether it timed out).
+:func:`instrument_statements` times every statement per engine and charges it
+to the current request (see :mod:`app.utils.metrics`). Statements slower than
+``SLOW_QUERY_LOG_MS`` are logged with the route that issued them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+from . import metrics as request_metrics
+
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+SLOW_CHECKOUT_MS = 10.0
+# Log statements slower than this many milliseconds; disabled when unset.
+SLOW_QUERY_LOG_MS = float(os.getenv("SLOW_QUERY_LOG_MS", "0")) or None
+_SLOW_QUERY_MAX_CHARS = 500
+
+QUERY_SECONDS = request_metrics.register_histogram(
+    request_metrics.Histogram(
+        "db_query_duration_seconds", "SQL statement execution time.", ("engine",), request_metrics.LATENCY_BUCKETS
+    )
+)
+CHECKOUT_WAIT_SECONDS = request_metrics.register_histogram(
+    request_metrics.Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection.",
+        ("engine",),
+        (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    )
+)
+
+
+class PoolMetrics:
+    """Checkout wait times and statement counts for one engine."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool: Pool | None = None
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, wait_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.slow_checkouts += wait_ms >= SLOW_CHECKOUT_MS
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        CHECKOUT_WAIT_SECONDS.observe((self.name,), wait_ms / 1000)
+
+    def record_query(self) -> None:
+        with self._lock:
+            self.queries += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            stats: Dict[str, Any] = {
+                "pool_class": type(pool).__mro__[1].__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "queries": self.queries,
+            }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                saturation=round(pool.checkedout() / capacity, 4) if capacity else 0.0,
+            )
+        return stats
+
+
+registry: Dict[str, PoolMetrics] = {}
+
+
+def timed_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """Subclass ``base`` so checkouts report their wait time to ``metrics``.
+
+    The subclass survives ``Pool.recreate()``, which instantiates the same class.
+    """
+
+    def _do_get(self):
+        begin = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_checkout((time.perf_counter() - begin) * 1000, timed_out=True)
+            raise
+        metrics.record_checkout((time.perf_counter() - begin) * 1000, timed_out=False)
+        metrics.pool = self
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def instrument_statements(engine: Engine, metrics: PoolMetrics) -> None:
+    """Time statements executed on ``engine`` and charge them to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _begin(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - context._metrics_started
+        metrics.record_query()
+        QUERY_SECONDS.observe((metrics.name,), elapsed)
+        request = request_metrics.current_request()
+        if request is not None:
+            request.queries += 1
+            request.query_seconds += elapsed
+        if SLOW_QUERY_LOG_MS is not None and elapsed * 1000 >= SLOW_QUERY_LOG_MS:
+            slow_query_logger.warning(
+                "%.1f ms on %s for %s: %s",
+                elapsed * 1000,
+                metrics.name,
+                f"{request.scope['method']} {request.route}" if request is not None else "background work",
+                " ".join(statement.split())[:_SLOW_QUERY_MAX_CHARS],
+            )
+
+
+def _pool_samples() -> Iterator[str]:
+    gauges = {
+        "db_pool_checked_out": ("gauge", "Connections currently checked out.", "checked_out"),
+        "db_pool_size": ("gauge", "Configured pool size.", "size"),
+        "db_pool_overflow": ("gauge", "Overflow connections currently open.", "overflow"),
+        "db_pool_saturation": ("gauge", "Checked-out connections over pool capacity.", "saturation"),
+        "db_pool_checkouts_total": ("counter", "Successful connection checkouts.", "checkouts"),
+        "db_pool_slow_checkouts_total": (
+            "counter",
+            f"Checkouts that waited at least {SLOW_CHECKOUT_MS:g} ms.",
+            "slow_checkouts",
+        ),
+        "db_pool_checkout_timeouts_total": ("counter", "Checkouts that timed out.", "timeouts"),
+        "db_queries_total": ("counter", "SQL statements executed.", "queries"),
+    }
+    snapshots = {name: metrics.snapshot() for name, metrics in registry.items()}
+    for metric, (kind, help, key) in gauges.items():
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} {kind}"
+        for engine_name, snapshot in snapshots.items():
+            if key in snapshot:
+                yield request_metrics.sample(metric, snapshot[key], engine=engine_name)
+
+
+request_metrics.register_collector(_pool_samples)
+
+
+def _request_summary() -> list[Dict[str, Any]]:
+    queries = request_metrics.REQUEST_QUERIES.totals()
+    seconds = request_metrics.REQUEST_QUERY_SECONDS.totals()
+    rows = [
+        {
+            "route": f"{method} {route}",
+            "requests": count,
+            "queries": int(total),
+            "avg_queries": round(total / count, 2),
+            "avg_query_ms": round(seconds[(method, route)][1] / count * 1000, 3),
+        }
+        for (method, route), (count, total) in queries.items()
+    ]
+    return sorted(rows, key=lambda row: row["queries"], reverse=True)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "pools": {name: metrics.snapshot() for name, metrics in registry.items()},
+        "requests": _request_summary(),
+    }
@@ -0,0 +1,59 @@
+"""Encoders for streaming test run exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from ..crud import CASE_EXPORT_COLUMNS, RUN_EXPORT_COLUMNS
+from . import fastjson
+
+
+def ndjson_line(row: dict) -> bytes:
+    """Encode a row as a single newline-terminated JSON line."""
+    return fastjson.dumps(row) + b"\n"
+
+
+def to_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Encode each row as one JSON line."""
+    for row in rows:
+        yield ndjson_line(row)
+
+
+def to_csv(rows: Iterable[dict], *, include_cases: bool = False) -> Iterator[bytes]:
+    """Encode rows as CSV, one line per run or, with cases, one line per case."""
+    header = list(RUN_EXPORT_COLUMNS)
+    if include_cases:
+        header += [f"case_{name}" for name in CASE_EXPORT_COLUMNS]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(header)
+    yield flush()
+    for row in rows:
+        run_values = [_csv_value(row[name]) for name in RUN_EXPORT_COLUMNS]
+        if not include_cases:
+            writer.writerow(run_values)
+        elif not row["test_cases"]:
+            writer.writerow(run_values + [""] * len(CASE_EXPORT_COLUMNS))
+        else:
+            for case in row["test_cases"]:
+                writer.writerow(run_values + [_csv_value(case[name]) for name in CASE_EXPORT_COLUMNS])
+        yield flush()
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
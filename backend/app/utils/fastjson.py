@@ -0,0 +1,36 @@
+"""JSON encoding of plain dicts and rows without building Pydantic models.
+
+Hot read endpoints return dicts shaped like their response schema and wrap
+them in :class:`FastJSONResponse`, which encodes with orjson and skips
+FastAPI's ``response_model`` validation. The schema stays on the route for
+the OpenAPI docs. UTC datetimes are written with a ``Z`` suffix, matching
+Pydantic's output.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode dicts, lists, UUIDs, datetimes and schema instances as JSON."""
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
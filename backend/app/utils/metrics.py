@@ -0,0 +1,187 @@
+"""Prometheus text-format metrics for HTTP requests and the database.
+
+:class:`MetricsMiddleware` records per-route latency, response size, and the
+number and total duration of SQL statements each request ran. Statements are
+attributed through :func:`current_request`, a context variable that
+Starlette's threadpool and ``AsyncSession`` greenlets inherit. Other modules
+add gauges with :func:`register_collector`; :func:`render` produces the body
+of ``GET /metrics``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative histogram keyed by label values."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def totals(self) -> Dict[Tuple[str, ...], Tuple[int, float]]:
+        """Return ``(count, sum)`` for each label combination."""
+        with self._lock:
+            return {labels: (int(sum(series[:-1])), series[-1]) for labels, series in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels([*pairs, ('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+
+def sample(name: str, value: float, **labels: str) -> str:
+    """Format one gauge or counter sample line."""
+    return f"{name}{_format_labels(labels.items())} {_format_value(value)}"
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to the end of the response body.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), COUNT_BUCKETS
+)
+REQUEST_QUERY_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("method", "route"), LATENCY_BUCKETS
+)
+_HISTOGRAMS: List[Histogram] = [REQUEST_SECONDS, RESPONSE_BYTES, REQUEST_QUERIES, REQUEST_QUERY_SECONDS]
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+
+def register_histogram(histogram: Histogram) -> Histogram:
+    _HISTOGRAMS.append(histogram)
+    return histogram
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """Add a callable returning exposition lines (``# HELP``, ``# TYPE`` and samples) at scrape time."""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for histogram in _HISTOGRAMS:
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+class RequestContext:
+    """Statement count and time accumulated by the current request."""
+
+    __slots__ = ("scope", "queries", "query_seconds")
+
+    def __init__(self, scope) -> None:
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+_current: ContextVar[RequestContext | None] = ContextVar("current_request", default=None)
+
+
+def current_request() -> RequestContext | None:
+    return _current.get()
+
+
+class MetricsMiddleware:
+    """Record latency, response size and SQL usage for each HTTP request.
+
+    Also reports the statements run before the response started in an
+    ``X-DB-Queries`` header; streamed bodies may run more, which the
+    histograms include. Server-Sent Events streams stay open for as long as
+    a client watches, so they are left out of the latency histogram.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestContext(scope)
+        token = _current.set(context)
+        begin = time.perf_counter()
+        status = 500
+        size = 0
+        event_stream = False
+
+        async def send_with_metrics(message) -> None:
+            nonlocal status, size, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    key.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for key, value in message.get("headers", [])
+                )
+                message["headers"] = [*message.get("headers", []), (b"x-db-queries", str(context.queries).encode())]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            method, route = scope["method"], context.route
+            if not event_stream:
+                REQUEST_SECONDS.observe((method, route, str(status)), time.perf_counter() - begin)
+            RESPONSE_BYTES.observe((method, route), size)
+            REQUEST_QUERIES.observe((method, route), context.queries)
+            REQUEST_QUERY_SECONDS.observe((method, route), context.query_seconds)
@@ -5,10 +5,11 @@ from __future__ import annotations
 import random
 from datetime import datetime, timedelta
 from typing import Sequence
+from uuid import uuid4
 
 from sqlalchemy.orm import Session
 
-from .. import models
+from .. import durations, insights, models, rollups, signatures
 
 TEST_NAMES = [
     "Login form validation",
@@ -59,46 +60,76 @@ def start_run(db: Session, suite: models.TestSuite) -> models.TestRun:
     return run
 
 
-def complete_run_with_results(db: Session, run: models.TestRun) -> None:
-    """Populate the given run with mock test case data."""
-    num_cases = random.randint(15, 20)
-    total_duration = 0
-    passed = 0
-    failed = 0
-
-    for i in range(num_cases):
-        status = "passed" if random.random() <= 0.8 else "failed"
-        duration = random.randint(50, 800)
-        total_duration += duration
-        if status == "passed":
-            passed += 1
-        else:
-            failed += 1
-
-        case = models.TestCase(
-            run_id=run.id,
-            name=TEST_NAMES[i % len(TEST_NAMES)],
-            description="Automated scenario generated by the AI engine",
-            status=status,
-            execution_time_ms=duration,
-            ai_insight=random.choice(PASS_INSIGHTS if status == "passed" else FAIL_INSIGHTS),
-            error_message=random.choice(ERROR_MESSAGES) if status == "failed" else None,
-            stack_trace=random.choice(STACK_TRACES) if status == "failed" else None,
-        )
-        db.add(case)
-
-    run.total_tests = num_cases
-    run.passed_tests = passed
+def case_name(index: int) -> str:
+    """Name of a run's ``index``-th case, numbered once the base names run out so names stay unique per run."""
+    name = TEST_NAMES[index % len(TEST_NAMES)]
+    return name if index < len(TEST_NAMES) else f"{name} #{index}"
+
+
+def plan_case_count() -> int:
+    """Pick how many cases a mock run executes."""
+    return random.randint(15, 20)
+
+
+def generate_case(run: models.TestRun, index: int) -> tuple[models.TestCase, signatures.Occurrence | None]:
+    """Produce the mock result of the run's ``index``-th case, signed when it failed.
+
+    The case has no insight yet; :func:`finish_run` queues it for the insight pipeline.
+    """
+    status = "passed" if random.random() <= 0.8 else "failed"
+    case = models.TestCase(
+        id=uuid4(),
+        run_id=run.id,
+        name=case_name(index),
+        description="Automated scenario generated by the AI engine",
+        status=status,
+        execution_time_ms=random.randint(50, 800),
+        error_message=random.choice(ERROR_MESSAGES) if status == "failed" else None,
+        stack_trace=random.choice(STACK_TRACES) if status == "failed" else None,
+    )
+    occurrence = None
+    if status == "failed":
+        case.signature_id, normalized = signatures.sign(case.error_message, case.stack_trace)
+        occurrence = signatures.Occurrence(case.signature_id, normalized, case.error_message, run.suite_id, run.started_at)
+    return case, occurrence
+
+
+def finish_run(
+    db: Session, run: models.TestRun, cases: Sequence[models.TestCase], occurrences: Sequence[signatures.Occurrence]
+) -> None:
+    """Derive the run's totals and status from its cases, record it in the rollups and duration
+    sketches, and queue its cases for insights once the transaction commits."""
+    failed = sum(1 for case in cases if case.status == "failed")
+    total_duration = sum(case.execution_time_ms for case in cases)
+    run.total_tests = len(cases)
+    run.passed_tests = len(cases) - failed
     run.failed_tests = failed
     run.duration_ms = total_duration
     run.completed_at = run.started_at + timedelta(milliseconds=total_duration)
     run.status = "passed" if failed == 0 else "failed"
+    rollups.record_run(db, run)
+    durations.record_run(db, run, cases)
+    signatures.record(db, occurrences)
+    queued_at = datetime.utcnow()
+    for case in cases:
+        case.insight_queued_at = queued_at
+    insights.fill_on_commit(
+        db,
+        [
+            insights.pending_case(case.id, case.name, case.status, case.error_message, case.stack_trace, case.signature_id)
+            for case in cases
+        ],
+    )
 
 
-def generate_historical_run(db: Session, suite: models.TestSuite, *, started_at: datetime) -> models.TestRun:
-    """Create a completed run at a historical timestamp."""
-    run = start_run(db, suite)
-    run.started_at = started_at
-    complete_run_with_results(db, run)
-    return run
-
+def complete_run_with_results(db: Session, run: models.TestRun) -> None:
+    """Populate the given run with mock test case data."""
+    cases = []
+    occurrences = []
+    for i in range(plan_case_count()):
+        case, occurrence = generate_case(run, i)
+        cases.append(case)
+        if occurrence is not None:
+            occurrences.append(occurrence)
+        db.add(case)
+    finish_run(db, run, cases, occurrences)
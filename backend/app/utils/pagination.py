@@ -0,0 +1,42 @@
+"""Opaque keyset cursors for paginated listings."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+NEXT = "next"
+PREV = "prev"
+
+
+class RunCursor(NamedTuple):
+    """Position of a test run in ``(started_at DESC, id DESC)`` order."""
+
+    started_at: datetime
+    id: UUID
+    direction: str = NEXT
+
+
+def encode_cursor(started_at: datetime, run_id: UUID, direction: str = NEXT) -> str:
+    """Encode a run position into a URL-safe token."""
+    payload = json.dumps([started_at.isoformat(), str(run_id), direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> RunCursor:
+    """Decode a token produced by :func:`encode_cursor`.
+
+    Raises ``ValueError`` if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        started_at, run_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor = RunCursor(datetime.fromisoformat(started_at), UUID(run_id), direction)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if cursor.direction not in (NEXT, PREV):
+        raise ValueError("Invalid cursor")
+    return cursor
@@ -0,0 +1,123 @@
+"""Mergeable quantile sketch for durations (DDSketch style).
+
+Values are counted in logarithmic buckets: bucket ``i`` holds values in
+``(gamma**(i - 1), gamma**i]`` with ``gamma = (1 + a) / (1 - a)``, so every
+quantile is answered within relative error ``a`` of the true value, whatever
+the distribution. Merging two sketches adds their bucket counts, which makes
+per-day sketches cheap to combine over any range. A few hundred buckets cover
+everything from a millisecond to days.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, List
+
+import orjson
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def _key(value: float) -> int:
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+class QuantileSketch:
+    """Counts of values per logarithmic bucket, plus exact count, sum, min and max."""
+
+    __slots__ = ("offset", "counts", "zeros", "count", "sum", "min", "max")
+
+    def __init__(self) -> None:
+        self.offset = 0
+        self.counts: List[int] = []
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = _key(value)
+        self._cover(key, key)
+        self.counts[key - self.offset] += 1
+
+    def extend(self, values: Iterable[float]) -> "QuantileSketch":
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add ``other``'s values to this sketch."""
+        if not other.count:
+            return self
+        if other.counts:
+            self._cover(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            for index, count in enumerate(other.counts, start):
+                self.counts[index] += count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _cover(self, low: int, high: int) -> None:
+        if not self.counts:
+            self.offset = low
+            self.counts = [0] * (high - low + 1)
+            return
+        if low < self.offset:
+            self.counts[:0] = [0] * (self.offset - low)
+            self.offset = low
+        end = self.offset + len(self.counts) - 1
+        if high > end:
+            self.counts.extend([0] * (high - end))
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the ``q``-quantile (0 <= q <= 1); ``None`` when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index, count in enumerate(self.counts):
+            seen += count
+            if rank < seen:
+                estimate = 2 * _GAMMA ** (self.offset + index) / (_GAMMA + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def dumps(self) -> str:
+        if not self.count:
+            return "{}"
+        fields = {"o": self.offset, "c": self.counts, "z": self.zeros, "n": self.count, "s": self.sum}
+        return orjson.dumps({**fields, "lo": self.min, "hi": self.max}).decode()
+
+    @classmethod
+    def loads(cls, data: str | bytes | None) -> "QuantileSketch":
+        sketch = cls()
+        fields = orjson.loads(data) if data else {}
+        if fields:
+            sketch.offset = fields["o"]
+            sketch.counts = fields["c"]
+            sketch.zeros = fields["z"]
+            sketch.count = fields["n"]
+            sketch.sum = fields["s"]
+            sketch.min = fields["lo"]
+            sketch.max = fields["hi"]
+        return sketch
@@ -0,0 +1,463 @@
+"""Load test of every API endpoint with machine-readable results.
+
+Fills a database with synthetic data (see :mod:`benchmarks.datagen`), starts
+the API under uvicorn and drives each endpoint with ``--concurrency``
+concurrent clients, reporting p50/p90/p99 latency, throughput and error
+counts. Results are written as JSON with ``--output``; pass a previous file
+with ``--compare`` to print the change per endpoint and exit non-zero when a
+p99 regresses by more than ``--max-regression``::
+
+    python -m benchmarks.bench_api --runs 100000 --output results.json
+    python -m benchmarks.bench_api --reuse --compare results.json
+
+Uses a throwaway SQLite database unless ``DATABASE_URL`` is set. ``--url``
+targets an already running server (and its database) instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+
+from .datagen import create_suites, generate_runs  # noqa: E402
+
+# Streaming endpoints that never finish on their own.
+SKIPPED_ROUTES = {("GET", "/api/events"), ("GET", "/api/test-runs/{run_id}/events")}
+
+
+class Fixtures(NamedTuple):
+    run_ids: List[str]
+    suite_ids: List[str]
+    cases: List[Tuple[str, str]]
+    id_prefixes: List[str]
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    route: str
+    request: Callable[[Fixtures, int], Dict[str, Any]]
+    write: bool = False
+
+
+def _ingest_run(fixtures: Fixtures, i: int) -> dict:
+    started_at = datetime.utcnow() - timedelta(minutes=i)
+    return {
+        "suite_id": fixtures.suite_ids[i % len(fixtures.suite_ids)],
+        "started_at": started_at.isoformat(),
+        "test_cases": [
+            {"name": f"Ingested case {n}", "status": "failed" if n == 0 else "passed", "execution_time_ms": 100 + n}
+            for n in range(10)
+        ],
+    }
+
+
+def _pick(items: List, i: int):
+    return items[i % len(items)]
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("health", "GET", "/", lambda f, i: {"url": "/"}),
+    Scenario("runs_page", "GET", "/api/test-runs", lambda f, i: {"url": "/api/test-runs", "params": {"limit": 20}}),
+    Scenario(
+        "runs_deep_offset",
+        "GET",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "params": {"limit": 20, "offset": 2000 + i % 100 * 20}},
+    ),
+    Scenario(
+        "runs_cursor",
+        "GET",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "params": {"limit": 20, "pagination": "cursor"}},
+    ),
+    Scenario(
+        "runs_filtered",
+        "GET",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "params": {"status": "failed", "suite_id": _pick(f.suite_ids, i)}},
+    ),
+    Scenario(
+        "runs_search_id",
+        "GET",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "params": {"q": _pick(f.id_prefixes, i)}},
+    ),
+    Scenario(
+        "runs_search_error",
+        "GET",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "params": {"q": "TimeoutError", "limit": 20}},
+    ),
+    Scenario(
+        "runs_export",
+        "GET",
+        "/api/test-runs/export",
+        lambda f, i: {
+            "url": "/api/test-runs/export",
+            "params": {
+                "suite_id": _pick(f.suite_ids, i),
+                "start_date": (datetime.utcnow() - timedelta(days=7)).isoformat(),
+                "include_cases": "true",
+            },
+        },
+    ),
+    Scenario(
+        "run_detail", "GET", "/api/test-runs/{run_id}", lambda f, i: {"url": f"/api/test-runs/{_pick(f.run_ids, i)}"}
+    ),
+    Scenario(
+        "run_summary",
+        "GET",
+        "/api/test-runs/{run_id}",
+        lambda f, i: {"url": f"/api/test-runs/{_pick(f.run_ids, i)}", "params": {"view": "summary"}},
+    ),
+    Scenario(
+        "run_compare",
+        "GET",
+        "/api/test-runs/{run_id}/compare/{base_run_id}",
+        lambda f, i: {"url": f"/api/test-runs/{_pick(f.run_ids, i)}/compare/{_pick(f.run_ids, i + 1)}"},
+    ),
+    Scenario(
+        "run_compare_previous",
+        "GET",
+        "/api/test-runs/{run_id}/compare/previous",
+        lambda f, i: {"url": f"/api/test-runs/{_pick(f.run_ids, i)}/compare/previous"},
+    ),
+    Scenario(
+        "run_cases",
+        "GET",
+        "/api/test-runs/{run_id}/cases",
+        lambda f, i: {"url": f"/api/test-runs/{_pick(f.run_ids, i)}/cases", "params": {"status": "failed"}},
+    ),
+    Scenario(
+        "run_case",
+        "GET",
+        "/api/test-runs/{run_id}/cases/{case_id}",
+        lambda f, i: {"url": "/api/test-runs/{}/cases/{}".format(*_pick(f.cases, i))},
+    ),
+    Scenario("suites", "GET", "/api/test-suites", lambda f, i: {"url": "/api/test-suites"}),
+    Scenario(
+        "suite_detail",
+        "GET",
+        "/api/test-suites/{suite_id}",
+        lambda f, i: {"url": f"/api/test-suites/{_pick(f.suite_ids, i)}"},
+    ),
+    Scenario("dashboard_stats", "GET", "/api/dashboard/stats", lambda f, i: {"url": "/api/dashboard/stats"}),
+    Scenario(
+        "dashboard_trends",
+        "GET",
+        "/api/dashboard/trends",
+        lambda f, i: {"url": "/api/dashboard/trends", "params": {"days": 30}},
+    ),
+    Scenario(
+        "dashboard_trend_series",
+        "GET",
+        "/api/dashboard/trends/series",
+        lambda f, i: {
+            "url": "/api/dashboard/trends/series",
+            "params": {
+                "granularity": ("hour", "day", "week", "month")[i % 4],
+                "tz": ("UTC", "America/New_York")[i % 2],
+                "start": (datetime.utcnow() - timedelta(days=365)).date().isoformat(),
+                "group_by": ("none", "suite")[i % 2],
+            },
+        },
+    ),
+    Scenario("failure_clusters", "GET", "/api/failures/clusters", lambda f, i: {"url": "/api/failures/clusters"}),
+    Scenario("flaky_tests", "GET", "/api/failures/flaky-tests", lambda f, i: {"url": "/api/failures/flaky-tests"}),
+    Scenario(
+        "suite_durations",
+        "GET",
+        "/api/durations/suites",
+        lambda f, i: {"url": "/api/durations/suites", "params": {"days": 90}},
+    ),
+    Scenario(
+        "slowest_tests",
+        "GET",
+        "/api/durations/tests",
+        lambda f, i: {"url": "/api/durations/tests", "params": {"days": 90}},
+    ),
+    Scenario("test_slowdowns", "GET", "/api/durations/slowdowns", lambda f, i: {"url": "/api/durations/slowdowns"}),
+    Scenario("cache_stats", "GET", "/api/cache/stats", lambda f, i: {"url": "/api/cache/stats"}),
+    Scenario("db_stats", "GET", "/api/db/stats", lambda f, i: {"url": "/api/db/stats"}),
+    Scenario("events_stats", "GET", "/api/events/stats", lambda f, i: {"url": "/api/events/stats"}),
+    Scenario("queue_stats", "GET", "/api/queue/stats", lambda f, i: {"url": "/api/queue/stats"}),
+    Scenario("insights_stats", "GET", "/api/insights/stats", lambda f, i: {"url": "/api/insights/stats"}),
+    Scenario("metrics", "GET", "/metrics", lambda f, i: {"url": "/metrics"}),
+    Scenario(
+        "ingest_bulk",
+        "POST",
+        "/api/test-runs/bulk",
+        lambda f, i: {"url": "/api/test-runs/bulk", "json": {"runs": [_ingest_run(f, i * 10 + n) for n in range(10)]}},
+        write=True,
+    ),
+    Scenario(
+        "ingest_ndjson",
+        "POST",
+        "/api/test-runs/bulk/ndjson",
+        lambda f, i: {
+            "url": "/api/test-runs/bulk/ndjson",
+            "content": "\n".join(json.dumps(_ingest_run(f, i * 10 + n)) for n in range(10)),
+            "headers": {"Content-Type": "application/x-ndjson"},
+        },
+        write=True,
+    ),
+    Scenario(
+        "trigger_run",
+        "POST",
+        "/api/test-runs",
+        lambda f, i: {"url": "/api/test-runs", "json": {"suite_id": _pick(f.suite_ids, i)}},
+        write=True,
+    ),
+]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def _drive(client: httpx.AsyncClient, scenario: Scenario, fixtures: Fixtures, args) -> Dict[str, Any]:
+    for i in range(args.warmup):
+        await client.request(scenario.method, **scenario.request(fixtures, i))
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    sizes: List[int] = []
+    next_index = iter(range(args.requests))
+
+    async def worker() -> None:
+        for i in next_index:
+            begin = time.perf_counter()
+            response = await client.request(scenario.method, **scenario.request(fixtures, args.warmup + i))
+            latencies.append((time.perf_counter() - begin) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            sizes.append(len(response.content))
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - begin
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if int(status) >= 500),
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(_percentile(latencies, 0.5), 3),
+        "p90_ms": round(_percentile(latencies, 0.9), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "mean_bytes": round(statistics.fmean(sizes)),
+    }
+
+
+async def _fixtures(client: httpx.AsyncClient) -> Fixtures:
+    runs = (await client.get("/api/test-runs", params={"limit": 100})).json()["data"]
+    suites = (await client.get("/api/test-suites")).json()
+    cases = []
+    for run in runs[:20]:
+        page = (await client.get(f"/api/test-runs/{run['id']}/cases", params={"limit": 5})).json()
+        cases.extend((run["id"], case["id"]) for case in page["data"])
+    return Fixtures(
+        run_ids=[run["id"] for run in runs],
+        suite_ids=[suite["id"] for suite in suites],
+        cases=cases,
+        id_prefixes=[run["id"][:8] for run in runs],
+    )
+
+
+def _coverage() -> List[str]:
+    from fastapi.routing import APIRoute
+
+    from app.main import app
+
+    covered = {(scenario.method, scenario.route) for scenario in SCENARIOS} | SKIPPED_ROUTES
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api")
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+
+
+def _generate(args) -> Dict[str, Any]:
+    from app import models
+    from app.database import init_db, session_scope
+
+    init_db(lambda db: None)
+    with session_scope() as db:
+        existing = db.query(models.TestRun.id).count()
+    if args.reuse and existing:
+        return {"runs": existing, "generated": False}
+    begin = time.perf_counter()
+    with session_scope() as db:
+        suite_ids = create_suites(db, args.suites, seed=args.seed)
+    generate_runs(
+        session_scope,
+        suite_ids,
+        runs=args.runs,
+        cases_per_run=args.cases_per_run,
+        seed=args.seed,
+        jitter=3,
+        progress=True,
+    )
+    return {
+        "runs": existing + args.runs,
+        "suites": args.suites,
+        "cases_per_run": args.cases_per_run,
+        "generated": True,
+        "generate_seconds": round(time.perf_counter() - begin, 1),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    env = {**os.environ, "MOCK_CASE_DELAY_SCALE": os.getenv("MOCK_CASE_DELAY_SCALE", "0")}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: Dict[str, Any], baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)["results"]
+    print(f"\n{'endpoint':<20} {'p50 change':>11} {'p99 change':>11} {'rps change':>11}")
+    regressed = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        p50 = current["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0.0
+        p99 = current["p99_ms"] / previous["p99_ms"] - 1 if previous["p99_ms"] else 0.0
+        rps = current["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+        flag = "  REGRESSED" if p99 > max_regression else ""
+        print(f"{name:<20} {p50:>+10.1%} {p99:>+10.1%} {rps:>+10.1%}{flag}")
+        if flag:
+            regressed.append(name)
+    if regressed:
+        print(f"p99 regressed by more than {max_regression:.0%}: {', '.join(regressed)}")
+    return not regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20_000, help="Runs to generate")
+    parser.add_argument("--suites", type=int, default=100)
+    parser.add_argument("--cases-per-run", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reuse", action="store_true", help="Skip generation when the database already has runs")
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="Comma separated scenario names")
+    parser.add_argument("--no-writes", action="store_true", help="Skip POST scenarios")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON from a previous --output")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p99 increase, as a fraction")
+    args = parser.parse_args()
+
+    dataset = {"database": os.environ["DATABASE_URL"].split(":", 1)[0]}
+    server = None
+    if args.url:
+        base_url = args.url
+    else:
+        dataset.update(_generate(args))
+        port = _free_port()
+        server = _start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    selected = [
+        scenario
+        for scenario in SCENARIOS
+        if (not args.only or scenario.name in args.only.split(",")) and not (args.no_writes and scenario.write)
+    ]
+    # Reads first so ingested and triggered runs do not skew them.
+    selected.sort(key=lambda scenario: scenario.write)
+
+    async def run() -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+            fixtures = await _fixtures(client)
+            results = {}
+            print(f"{'endpoint':<20} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'rps':>9} {'errors':>7}")
+            for scenario in selected:
+                result = results[scenario.name] = await _drive(client, scenario, fixtures, args)
+                print(
+                    f"{scenario.name:<20} {result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                    f"{result['throughput_rps']:>9.1f} {result['errors']:>7}"
+                )
+            return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    uncovered = _coverage()
+    if uncovered:
+        print(f"Endpoints without a scenario: {', '.join(uncovered)}")
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "dataset": dataset,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "uncovered_endpoints": uncovered,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    if args.compare and not _compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
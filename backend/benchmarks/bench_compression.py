@@ -0,0 +1,97 @@
+"""Bytes on the wire and CPU per request with response compression.
+
+Requests the large read endpoints in-process with each available
+``Accept-Encoding`` (and ``identity`` for the uncompressed baseline), and
+reports the median response size, wall time and process CPU time per
+request. Cached endpoints are measured cold (cache cleared before every
+request, so the body is encoded and compressed each time) and warm (served
+from the precompressed cache entry). Uses a throwaway SQLite database unless
+``DATABASE_URL`` is set::
+
+    python -m benchmarks.bench_compression [--runs 5000] [--detail-cases 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import desc  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base, engine, session_scope  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils import compression  # noqa: E402
+from app.utils.cache import response_cache, run_cache  # noqa: E402
+
+from .datagen import create_suites, generate_runs  # noqa: E402
+
+
+async def _measure(client: httpx.AsyncClient, url: str, encoding: str, repeat: int, cold: bool) -> tuple:
+    sizes, wall, cpu = [], [], []
+    for _ in range(repeat):
+        if cold:
+            response_cache.clear()
+            run_cache.clear()
+        wall_begin, cpu_begin = time.perf_counter(), time.process_time()
+        response = await client.get(url, headers={"Accept-Encoding": encoding})
+        await response.aread()
+        wall.append((time.perf_counter() - wall_begin) * 1000)
+        cpu.append((time.process_time() - cpu_begin) * 1000)
+        response.raise_for_status()
+        sizes.append(response.num_bytes_downloaded)
+    return statistics.median(sizes), statistics.median(wall), statistics.median(cpu)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5000)
+    parser.add_argument("--detail-cases", type=int, default=2000, help="Cases in the run used for the detail test")
+    parser.add_argument("--suites", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as db:
+        suite_ids = create_suites(db, args.suites)
+    generate_runs(session_scope, suite_ids, runs=args.runs)
+    generate_runs(session_scope, suite_ids[:1], runs=1, cases_per_run=args.detail_cases)
+    with session_scope() as db:
+        big_run = db.query(models.TestRun.id).order_by(desc(models.TestRun.total_tests)).first()[0]
+
+    endpoints = [
+        ("runs page (100 rows)", "/api/test-runs?limit=100", False),
+        (f"run detail ({args.detail_cases} cases)", f"/api/test-runs/{big_run}", True),
+        ("dashboard stats", "/api/dashboard/stats", True),
+        (f"suites ({args.suites})", "/api/test-suites", True),
+    ]
+    encodings = ["identity", *compression.ENCODERS]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'endpoint':<26} {'encoding':<9} {'cache':<5} {'bytes':>10} {'ratio':>6} {'wall ms':>8} {'cpu ms':>7}")
+            for label, url, cached in endpoints:
+                baseline = None
+                for encoding in encodings:
+                    for cold in (True, False) if cached else (True,):
+                        size, wall_ms, cpu_ms = await _measure(client, url, encoding, args.repeat, cold)
+                        baseline = baseline or size
+                        state = ("cold" if cold else "warm") if cached else "-"
+                        print(
+                            f"{label:<26} {encoding:<9} {state:<5} {size:>10,.0f} {size / baseline:>6.2f}"
+                            f" {wall_ms:>8.2f} {cpu_ms:>7.2f}"
+                        )
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
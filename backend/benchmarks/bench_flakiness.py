@@ -0,0 +1,50 @@
+"""Benchmark for the vectorized flakiness statistics.
+
+Builds status histories for ``--tests`` distinct tests over ``--runs`` runs
+(10k x 1k by default) and times ``flakiness.compute_stats``::
+
+    python -m benchmarks.bench_flakiness [--tests 10000] [--runs 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app import flakiness
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=1_000)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    names = [f"test_{i}" for i in range(args.tests)]
+    flaky_bias = rng.random(args.tests) * args.failure_rate * 2
+    start = datetime.utcnow() - timedelta(days=30)
+    runs = [
+        flakiness._RunStatuses(
+            start + timedelta(minutes=i),
+            np.arange(args.tests, dtype=np.int32),
+            rng.random(args.tests) < flaky_bias,
+        )
+        for i in range(args.runs)
+    ]
+
+    started = time.perf_counter()
+    stats = flakiness.compute_stats(runs, names)
+    elapsed = time.perf_counter() - started
+
+    flaky = sum(1 for item in stats if item.classification == "flaky")
+    print(f"{args.tests:,} tests x {args.runs:,} runs ({args.tests * args.runs:,} results) in {elapsed:.2f}s")
+    print(f"{flaky:,} classified flaky; top score {stats[0].flakiness_score if stats else 0}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput benchmark for bulk run ingestion.
+
+Ingests synthetic runs through ``crud.ingest_test_runs`` and, for reference,
+through the per-object ORM path used by ``mock_ai``, reporting rows (runs plus
+cases) per second. Exits non-zero when bulk throughput misses ``--target``::
+
+    python -m benchmarks.bench_ingest [--runs 20000] [--cases 18] [--target 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base, engine, session_scope  # noqa: E402
+from app.utils import mock_ai  # noqa: E402
+
+
+def _payload(suite_id, runs: int, cases: int) -> list[schemas.TestRunIngest]:
+    start = datetime.utcnow() - timedelta(days=30)
+    return [
+        schemas.TestRunIngest(
+            suite_id=suite_id,
+            started_at=start + timedelta(seconds=i),
+            test_cases=[
+                schemas.TestCaseIngest(
+                    name=mock_ai.case_name(j),
+                    status="passed" if random.random() <= 0.8 else "failed",
+                    execution_time_ms=random.randint(50, 800),
+                    error_message=random.choice(mock_ai.ERROR_MESSAGES),
+                )
+                for j in range(cases)
+            ],
+        )
+        for i in range(runs)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20000)
+    parser.add_argument("--cases", type=int, default=18, help="Cases per run")
+    parser.add_argument("--batch", type=int, default=500, help="Runs per ingest call")
+    parser.add_argument("--orm-runs", type=int, default=500, help="Runs for the ORM reference path")
+    parser.add_argument("--target", type=float, default=20000, help="Minimum bulk rows/second")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as db:
+        suite = models.TestSuite(name=f"Ingest benchmark {uuid4().hex[:8]}")
+        db.add(suite)
+        db.flush()
+        suite_id = suite.id
+
+    payload = _payload(suite_id, args.runs, args.cases)
+    started = time.perf_counter()
+    for offset in range(0, len(payload), args.batch):
+        with session_scope() as db:
+            crud.ingest_test_runs(db, payload[offset : offset + args.batch])
+    bulk_elapsed = time.perf_counter() - started
+    bulk_rate = args.runs * (args.cases + 1) / bulk_elapsed
+
+    started = time.perf_counter()
+    orm_rows = 0
+    with session_scope() as db:
+        suite = db.get(models.TestSuite, suite_id)
+        for _ in range(args.orm_runs):
+            run = mock_ai.start_run(db, suite)
+            mock_ai.complete_run_with_results(db, run)
+            orm_rows += run.total_tests + 1
+    orm_rate = orm_rows / (time.perf_counter() - started)
+
+    print(f"bulk: {args.runs} runs in {bulk_elapsed:.2f}s -> {bulk_rate:,.0f} rows/s")
+    print(f"orm:  {args.orm_runs} runs -> {orm_rate:,.0f} rows/s ({bulk_rate / orm_rate:.1f}x slower than bulk)")
+    if bulk_rate < args.target:
+        print(f"FAIL: below target of {args.target:,.0f} rows/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Latency benchmark for the run search box.
+
+Generates ``--runs`` runs (1M by default) and times ``GET /api/test-runs?q=``
+equivalents through ``crud.paginate_test_runs`` for suite-name, run-id prefix,
+test-case text and no-match terms. Against PostgreSQL the trigram indexes from
+``app.search`` are created first::
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_search
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from app import crud, models  # noqa: E402
+from app.database import Base, engine, session_scope  # noqa: E402
+from app.search import ensure_search_indexes  # noqa: E402
+
+from .datagen import create_suites, generate_runs  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1_000_000)
+    parser.add_argument("--cases", type=int, default=2, help="Cases per run")
+    parser.add_argument("--suites", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_indexes(engine)
+    with session_scope() as db:
+        suite_ids = create_suites(db, args.suites)
+    started = time.perf_counter()
+    generate_runs(session_scope, suite_ids, runs=args.runs, cases_per_run=args.cases)
+    print(f"generated {args.runs:,} runs in {time.perf_counter() - started:.1f}s")
+
+    with session_scope() as db:
+        sample_id = str(db.query(models.TestRun.id).first()[0])
+        terms = {
+            "suite name": "suite 0042",
+            "run id prefix": sample_id[:8],
+            "case error": "TimeoutError",
+            "no match": "zzzz-no-such-term",
+        }
+        print(f"{'term':<14} {'p50 ms':>9} {'max ms':>9} {'matches':>9}")
+        for label, term in terms.items():
+            timings = []
+            for _ in range(args.repeat):
+                begin = time.perf_counter()
+                page = crud.paginate_test_runs(db, limit=20, search=term)
+                timings.append((time.perf_counter() - begin) * 1000)
+            print(f"{label:<14} {statistics.median(timings):>9.1f} {max(timings):>9.1f} {page['total']:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Throughput benchmark for response serialization on the hot read endpoints.
+
+Compares the plain-row path (``crud`` dicts encoded by ``FastJSONResponse``)
+with the Pydantic path it replaced: ORM objects turned into schema instances
+and run through FastAPI's ``response_model`` validation and ``JSONResponse``.
+Covers a 100-row run page, a run detail with ``--detail-cases`` cases, and the
+suite listing. Uses a throwaway SQLite database unless ``DATABASE_URL`` is
+set::
+
+    python -m benchmarks.bench_serialization [--runs 5000] [--detail-cases 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from sqlalchemy import desc  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base, engine, session_scope  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.fastjson import FastJSONResponse  # noqa: E402
+
+from .datagen import create_suites, generate_runs  # noqa: E402
+
+
+def _response_field(path: str):
+    return next(route.response_field for route in app.routes if getattr(route, "path", None) == path)
+
+
+def _pydantic_runs_page(db, limit: int) -> schemas.PaginatedTestRuns:
+    query = db.query(models.TestRun).join(models.TestSuite)
+    runs = (
+        query.options(joinedload(models.TestRun.suite))
+        .order_by(desc(models.TestRun.started_at))
+        .limit(limit)
+        .all()
+    )
+    return schemas.PaginatedTestRuns(
+        data=[crud.serialize_run(run) for run in runs], total=query.count(), limit=limit, offset=0
+    )
+
+
+def _pydantic_run_detail(db, run_id) -> schemas.TestRunDetail:
+    return crud.serialize_run_detail(crud.get_test_run(db, run_id))
+
+
+def _pydantic_suites(db) -> list:
+    return [schemas.TestSuite(**row) for row in crud.list_test_suites(db)]
+
+
+async def _time(fn, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        body = await fn()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(timings), len(body)
+
+
+async def _compare(db, label: str, path: str, pydantic_fn, fast_fn, repeat: int) -> None:
+    field = _response_field(path)
+
+    async def pydantic_path() -> bytes:
+        content = await serialize_response(field=field, response_content=pydantic_fn())
+        return JSONResponse(content).body
+
+    async def fast_path() -> bytes:
+        return FastJSONResponse(fast_fn()).body
+
+    slow_ms, slow_size = await _time(pydantic_path, repeat)
+    fast_ms, fast_size = await _time(fast_path, repeat)
+    print(
+        f"{label:<22} {slow_ms:>11.2f} {fast_ms:>9.2f} {slow_ms / fast_ms:>7.1f}x {slow_size:>10,} {fast_size:>10,}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5000)
+    parser.add_argument("--detail-cases", type=int, default=2000, help="Cases in the run used for the detail test")
+    parser.add_argument("--suites", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as db:
+        suite_ids = create_suites(db, args.suites)
+    generate_runs(session_scope, suite_ids, runs=args.runs)
+    generate_runs(session_scope, suite_ids[:1], runs=1, cases_per_run=args.detail_cases)
+
+    async def run() -> None:
+        with session_scope() as db:
+            big_run = db.query(models.TestRun.id).order_by(desc(models.TestRun.total_tests)).first()[0]
+            print(f"{'endpoint':<22} {'pydantic ms':>11} {'fast ms':>9} {'speedup':>8} {'bytes':>10} {'bytes':>10}")
+            await _compare(
+                db,
+                "runs page (100 rows)",
+                "/api/test-runs",
+                lambda: _pydantic_runs_page(db, 100),
+                lambda: crud.paginate_test_runs(db, limit=100),
+                args.repeat,
+            )
+            await _compare(
+                db,
+                f"run detail ({args.detail_cases} cases)",
+                "/api/test-runs/{run_id}",
+                lambda: _pydantic_run_detail(db, big_run),
+                lambda: crud.get_test_run_detail(db, big_run),
+                args.repeat,
+            )
+            await _compare(
+                db,
+                f"suites ({args.suites})",
+                "/api/test-suites",
+                lambda: _pydantic_suites(db),
+                lambda: crud.list_test_suites(db),
+                args.repeat,
+            )
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Regression benchmark for the suite listing and detail queries.
+
+Grows a single suite to 100k runs and reports latency and peak Python memory
+for ``crud.list_test_suites`` and ``crud.get_test_suite_detail`` at each size.
+Both should stay flat as history grows. Uses a throwaway SQLite database
+unless ``DATABASE_URL`` is set::
+
+    python -m benchmarks.bench_suites [--sizes 1000,10000,100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from app import crud, models, rollups  # noqa: E402
+from app.database import Base, engine, session_scope  # noqa: E402
+
+
+def _grow_suite(db, suite: models.TestSuite, count: int, start: datetime) -> None:
+    rows = []
+    for i in range(count):
+        started_at = start + timedelta(minutes=i)
+        rows.append(
+            {
+                "id": uuid4(),
+                "suite_id": suite.id,
+                "status": "passed" if i % 5 else "failed",
+                "started_at": started_at,
+                "completed_at": started_at + timedelta(seconds=5),
+                "duration_ms": 5000,
+                "total_tests": 18,
+                "passed_tests": 15,
+                "failed_tests": 3,
+            }
+        )
+    db.execute(models.TestRun.__table__.insert(), rows)
+
+
+def _measure(fn, repeat: int = 5) -> tuple[float, float]:
+    timings = []
+    tracemalloc.start()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated run counts")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as db:
+        suite = models.TestSuite(name=f"Benchmark suite {uuid4().hex[:8]}")
+        db.add(suite)
+        db.flush()
+        suite_id = suite.id
+
+    print(f"{'runs':>8} {'list ms':>9} {'list KiB':>9} {'detail ms':>10} {'detail KiB':>11}")
+    grown = 0
+    start = datetime.utcnow() - timedelta(days=365)
+    for size in sorted(int(value) for value in args.sizes.split(",")):
+        with session_scope() as db:
+            suite = db.get(models.TestSuite, suite_id)
+            _grow_suite(db, suite, size - grown, start + timedelta(minutes=grown))
+            rollups.rebuild(db)
+        grown = size
+
+        with session_scope() as db:
+            list_ms, list_kib = _measure(lambda: crud.list_test_suites(db))
+            detail_ms, detail_kib = _measure(lambda: crud.get_test_suite_detail(db, suite_id))
+        print(f"{size:>8} {list_ms:>9.2f} {list_kib:>9.1f} {detail_ms:>10.2f} {detail_kib:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
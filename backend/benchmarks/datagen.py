@@ -0,0 +1,104 @@
+"""Synthetic data generation for benchmarks.
+
+Builds on :mod:`app.seeding`, committing once per batch so millions of runs
+can be generated in minutes. Generation is deterministic for a given
+``seed``.
+
+Also usable on its own to fill a database::
+
+    python -m benchmarks.datagen --runs 1000000 --suites 300 --cases-per-run 20
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import List
+
+from app import models, seeding
+
+
+def create_suites(db, count: int, *, seed: int | None = None) -> List:
+    """Insert ``count`` uniquely named suites and return their ids."""
+    rng = random.Random(seed)
+    rows = [
+        {
+            "id": seeding.random_uuid(rng),
+            "name": f"Synthetic suite {i:04d} {rng.getrandbits(24):06x}",
+            "description": "Generated for benchmarks",
+        }
+        for i in range(count)
+    ]
+    db.execute(models.TestSuite.__table__.insert(), rows)
+    return [row["id"] for row in rows]
+
+
+def generate_runs(
+    session_factory,
+    suite_ids: List,
+    *,
+    runs: int,
+    cases_per_run: int = 18,
+    days: int = 365,
+    batch: int = 5000,
+    seed: int | None = None,
+    jitter: int = 0,
+    progress: bool = False,
+) -> None:
+    """Insert ``runs`` completed runs spread over ``days``, committing per batch.
+
+    Each run has ``cases_per_run`` cases, give or take ``jitter``.
+    """
+    rng = random.Random(None if seed is None else f"{seed}:runs")
+    with session_factory() as db:
+        seeding.store_texts(db)
+    started = time.perf_counter()
+    written = 0
+    for rows in seeding.run_batches(
+        suite_ids, runs=runs, cases_per_run=cases_per_run, jitter=jitter, days=days, batch=batch, rng=rng
+    ):
+        with session_factory() as db:
+            seeding.write_batch(db, rows)
+        written += len(rows.runs)
+        if progress:
+            elapsed = time.perf_counter() - started
+            print(f"\r{written:,}/{runs:,} runs ({written / elapsed:,.0f} runs/s)", end="", flush=True)
+    if progress:
+        print()
+
+
+def main() -> None:
+    import argparse
+
+    from app.database import init_db, session_scope
+
+    parser = argparse.ArgumentParser(description="Fill the configured database with synthetic runs.")
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--suites", type=int, default=200)
+    parser.add_argument("--cases-per-run", type=int, default=18)
+    parser.add_argument("--jitter", type=int, default=3, help="Vary cases per run by up to this many")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    init_db(lambda db: None)
+    with session_scope() as db:
+        suite_ids = create_suites(db, args.suites, seed=args.seed)
+    started = time.perf_counter()
+    generate_runs(
+        session_scope,
+        suite_ids,
+        runs=args.runs,
+        cases_per_run=args.cases_per_run,
+        days=args.days,
+        batch=args.batch,
+        seed=args.seed,
+        jitter=args.jitter,
+        progress=True,
+    )
+    print(f"Generated {args.runs:,} runs across {args.suites} suites in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
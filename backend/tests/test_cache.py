@@ -0,0 +1,36 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.utils.cache import ResponseCache, cached_response
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def test_fill_started_before_clear_is_not_kept():
+    cache = ResponseCache()
+
+    async def factory():
+        # A write commits while the read is still computing its value.
+        cache.clear()
+        return {"value": "before write"}
+
+    response = asyncio.run(cached_response(_request(), "key", factory, cache=cache))
+
+    assert response.status_code == 200
+    assert cache.get("key") is None
+    assert cache.stats()["uncached_fills"] == 1
+
+
+def test_fill_after_clear_is_kept():
+    cache = ResponseCache()
+    cache.clear()
+
+    async def factory():
+        return {"value": "after write"}
+
+    asyncio.run(cached_response(_request(), "key", factory, cache=cache))
+
+    assert cache.get("key").value == {"value": "after write"}
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.flakiness import _RunStatuses, compute_stats
+
+
+def _run(codes, failed):
+    return _RunStatuses(datetime(2024, 1, 1), np.asarray(codes, dtype=np.int32), np.asarray(failed, dtype=bool))
+
+
+def test_duplicate_names_in_a_run_count_once():
+    runs = [
+        _run([0, 0, 1], [False, True, False]),
+        _run([0, 1, 1], [True, False, False]),
+        _run([0, 0, 1], [False, False, False]),
+    ]
+    stats = {item.test_name: item for item in compute_stats(runs, ["a", "b"], min_runs=3)}
+
+    assert stats["a"].runs == 3
+    assert stats["a"].failures == 2
+    assert stats["a"].flip_rate == 0.5
+    assert stats["a"].max_failure_streak == 2
+    assert stats["a"].current_failure_streak == 0
+    assert stats["a"].last_status == "passed"
+    assert stats["b"].runs == 3
+    assert stats["b"].failures == 0
+    assert stats["b"].flip_rate == 0.0
@@ -1,5 +1,5 @@
 import Link from "next/link";
-import { fetchTestRun } from "../../../lib/api";
+import { CASES_PAGE_SIZE, fetchTestCases, fetchTestRunOverview } from "../../../lib/api";
 import { StatusBadge } from "../../../components/StatusBadge";
 import { CopyButton } from "../../../components/CopyButton";
 import { TestCaseList } from "../../../components/TestCaseList";
@@ -9,7 +9,10 @@ interface Props {
 }
 
 export default async function TestRunDetailPage({ params }: Props) {
-  const run = await fetchTestRun(params.id);
+  const [run, initialCases] = await Promise.all([
+    fetchTestRunOverview(params.id),
+    fetchTestCases(params.id, { limit: CASES_PAGE_SIZE })
+  ]);
   const progressPercentage = run.total_tests ? Math.round((run.passed_tests / run.total_tests) * 100) : 0;
 
   return (
@@ -69,7 +72,7 @@ export default async function TestRunDetailPage({ params }: Props) {
           <h2 className="text-2xl font-semibold text-white">Test Cases</h2>
           <p className="text-white/60">Deep dive into individual AI insights</p>
         </div>
-        <TestCaseList cases={run.test_cases} />
+        <TestCaseList runId={run.id} caseCounts={run.case_counts} initialCases={initialCases} />
       </section>
     </div>
   );
@@ -0,0 +1,85 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { CalendarDays, Clock, ShieldCheck, XCircle } from "lucide-react";
+import { dashboardEventsUrl } from "../lib/api";
+import { DashboardStats, DashboardTrends, DashboardUpdate, TestRunSummary } from "../lib/types";
+import { MetricCard } from "./MetricCard";
+import { TrendChart } from "./charts/TrendChart";
+import { DistributionChart } from "./charts/DistributionChart";
+import { TestRunsTable } from "./TestRunsTable";
+
+const RECENT_RUNS = 10;
+
+interface Props {
+  initialStats: DashboardStats;
+  initialTrends: DashboardTrends;
+  initialRuns: TestRunSummary[];
+}
+
+function upsertRun(runs: TestRunSummary[], run: TestRunSummary): TestRunSummary[] {
+  return [run, ...runs.filter((item) => item.id !== run.id)]
+    .sort((a, b) => b.started_at.localeCompare(a.started_at))
+    .slice(0, RECENT_RUNS);
+}
+
+export function LiveDashboard({ initialStats, initialTrends, initialRuns }: Props) {
+  const [stats, setStats] = useState(initialStats);
+  const [trends, setTrends] = useState(initialTrends);
+  const [runs, setRuns] = useState(initialRuns);
+
+  useEffect(() => {
+    // One shared stream replaces per-tab polling; the server computes each
+    // update once and pushes it to every open dashboard.
+    const events = new EventSource(dashboardEventsUrl());
+    const onRun = (event: Event) => setRuns((current) => upsertRun(current, JSON.parse((event as MessageEvent).data)));
+    events.addEventListener("run_created", onRun);
+    events.addEventListener("run_completed", onRun);
+    events.addEventListener("stats", (event) => {
+      const update: DashboardUpdate = JSON.parse((event as MessageEvent).data);
+      setStats(update.stats);
+      setTrends(update.trends);
+    });
+    return () => events.close();
+  }, []);
+
+  const trendData = trends.dates.map((date, index) => ({
+    date,
+    passed: trends.passed[index],
+    failed: trends.failed[index]
+  }));
+
+  const passed = stats.total_tests - stats.failed_tests;
+
+  return (
+    <>
+      <section className="grid gap-6 md:grid-cols-2 xl:grid-cols-4">
+        <MetricCard title="Total Tests Run" value={stats.total_runs.toString()} icon={<CalendarDays />} badge="Last 30 days" />
+        <MetricCard
+          title="Pass Rate"
+          value={`${stats.pass_rate}%`}
+          icon={<ShieldCheck />}
+          tone={stats.pass_rate > 80 ? "success" : stats.pass_rate > 60 ? "warning" : "danger"}
+          trend={stats.pass_rate > 80 ? "Excellent stability" : "Improvement needed"}
+        />
+        <MetricCard title="Failed Tests" value={stats.failed_tests.toString()} icon={<XCircle />} tone="danger" />
+        <MetricCard title="Avg Execution Time" value={`${Math.round(stats.avg_duration_ms)} ms`} icon={<Clock />} badge="Rolling avg" />
+      </section>
+
+      <section className="grid gap-6 lg:grid-cols-2">
+        <TrendChart data={trendData} />
+        <DistributionChart passed={passed} failed={stats.failed_tests} />
+      </section>
+
+      <section className="space-y-4">
+        <div className="flex items-center justify-between">
+          <div>
+            <h2 className="text-2xl font-semibold text-white">Recent Test Runs</h2>
+            <p className="text-white/60">Latest executions from all suites</p>
+          </div>
+        </div>
+        <TestRunsTable runs={runs} compact />
+      </section>
+    </>
+  );
+}
@@ -1,36 +1,66 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Play } from "lucide-react";
-import { triggerTestRun } from "../lib/api";
-import { TestRunDetail, TestSuite } from "../lib/types";
+import { runEventsUrl, triggerTestRun } from "../lib/api";
+import { RunProgress, TestRunSummary, TestSuite } from "../lib/types";
 
 interface RunTestButtonProps {
   suites: TestSuite[];
-  onCompleted?: (run: TestRunDetail) => void;
+  onCompleted?: (run: TestRunSummary) => void;
+}
+
+function progressMessage(progress: RunProgress): string {
+  if (progress.status === "queued") return "Queued, waiting for an AI agent…";
+  const done = progress.passed_tests + progress.failed_tests;
+  return `AI agents executing tests… ${done}/${progress.total_tests}`;
 }
 
 export function RunTestButton({ suites, onCompleted }: RunTestButtonProps) {
   const [suiteId, setSuiteId] = useState<string>(suites[0]?.id ?? "");
   const [isRunning, setIsRunning] = useState(false);
   const [statusMessage, setStatusMessage] = useState<string | null>(null);
+  const eventsRef = useRef<EventSource | null>(null);
+
+  useEffect(() => () => eventsRef.current?.close(), []);
 
   if (suites.length === 0) {
     return <p className="text-sm text-white/60">Add a test suite to trigger runs.</p>;
   }
 
+  const finish = (run: TestRunSummary) => {
+    eventsRef.current?.close();
+    eventsRef.current = null;
+    setIsRunning(false);
+    setStatusMessage(
+      run.status === "passed" ? "Run completed successfully!" : `Run finished with ${run.failed_tests} failed tests.`
+    );
+    onCompleted?.(run);
+    setTimeout(() => setStatusMessage(null), 2000);
+  };
+
+  const follow = (runId: string) => {
+    // EventSource reconnects on its own after dropped connections; each
+    // reconnect starts with a fresh snapshot of the run.
+    const events = new EventSource(runEventsUrl(runId));
+    eventsRef.current = events;
+    const on = <T,>(name: string, handler: (data: T) => void) =>
+      events.addEventListener(name, (event) => handler(JSON.parse((event as MessageEvent).data)));
+    on<RunProgress>("snapshot", (run) => setStatusMessage(progressMessage(run)));
+    on<RunProgress>("status", (run) => setStatusMessage(progressMessage(run)));
+    on<{ run: RunProgress }>("case", ({ run }) => setStatusMessage(progressMessage(run)));
+    on<TestRunSummary>("completed", finish);
+  };
+
   const handleRun = async () => {
     if (!suiteId) return;
     try {
       setIsRunning(true);
-      setStatusMessage("AI agents executing tests…");
+      setStatusMessage("Queueing run…");
       const run = await triggerTestRun(suiteId);
-      setStatusMessage("Run completed successfully!");
-      onCompleted?.(run);
-      setTimeout(() => setStatusMessage(null), 2000);
+      follow(run.id);
     } catch (error) {
       setStatusMessage("Run failed. Try again.");
-    } finally {
       setIsRunning(false);
     }
   };
@@ -2,17 +2,40 @@
 
 import { useState } from "react";
 import { ChevronDown, ChevronUp, Copy, Terminal } from "lucide-react";
-import { TestCase } from "../lib/types";
+import { fetchTestCase } from "../lib/api";
+import { TestCase, TestCaseSummary } from "../lib/types";
 import { StatusBadge } from "./StatusBadge";
+import { Skeleton } from "./Skeleton";
 import { cn } from "../utils/cn";
 
-export function TestCaseCard({ testCase }: { testCase: TestCase }) {
-  const [expanded, setExpanded] = useState(testCase.status === "failed");
+interface Props {
+  runId: string;
+  testCase: TestCaseSummary;
+}
+
+export function TestCaseCard({ runId, testCase }: Props) {
+  const [expanded, setExpanded] = useState(false);
+  const [details, setDetails] = useState<TestCase | null>(null);
+  const [loadingDetails, setLoadingDetails] = useState(false);
   const [copied, setCopied] = useState(false);
 
+  // AI insight and stack trace are not part of the case listing; fetch them on first expand.
+  const toggle = async () => {
+    const next = !expanded;
+    setExpanded(next);
+    if (next && !details && !loadingDetails) {
+      setLoadingDetails(true);
+      try {
+        setDetails(await fetchTestCase(runId, testCase.id));
+      } finally {
+        setLoadingDetails(false);
+      }
+    }
+  };
+
   const copyInsight = async () => {
-    if (testCase.ai_insight) {
-      await navigator.clipboard.writeText(testCase.ai_insight);
+    if (details?.ai_insight) {
+      await navigator.clipboard.writeText(details.ai_insight);
       setCopied(true);
       setTimeout(() => setCopied(false), 1500);
     }
@@ -28,7 +51,7 @@ export function TestCaseCard({ testCase }: { testCase: TestCase }) {
       <button
         type="button"
         className="flex w-full items-center justify-between text-left"
-        onClick={() => setExpanded((prev) => !prev)}
+        onClick={toggle}
       >
         <div>
           <div className="flex items-center gap-3">
@@ -43,9 +66,10 @@ export function TestCaseCard({ testCase }: { testCase: TestCase }) {
       {expanded && (
         <div className="mt-4 space-y-4 text-sm text-white/80">
           <p>{testCase.description}</p>
-          {testCase.ai_insight && (
+          {loadingDetails && <Skeleton className="h-12 w-full" />}
+          {details?.ai_insight && (
             <div className="ai-insight relative">
-              <p className="font-medium text-white">{testCase.ai_insight}</p>
+              <p className="font-medium text-white">{details.ai_insight}</p>
               <button type="button" className="absolute right-2 top-2 text-xs text-white/70" onClick={copyInsight}>
                 {copied ? "Copied" : "Copy"}
               </button>
@@ -57,13 +81,13 @@ export function TestCaseCard({ testCase }: { testCase: TestCase }) {
               <pre className="rounded-xl bg-black/40 p-3 text-rose-200">{testCase.error_message}</pre>
             </div>
           )}
-          {testCase.stack_trace && (
+          {details?.stack_trace && (
             <details className="rounded-xl border border-white/5 bg-black/40 p-4">
               <summary className="flex items-center gap-2 cursor-pointer text-white/80">
                 <Terminal size={16} />
                 Stack trace
               </summary>
-              <pre className="mt-3 overflow-x-auto text-xs text-white/70">{testCase.stack_trace}</pre>
+              <pre className="mt-3 overflow-x-auto text-xs text-white/70">{details.stack_trace}</pre>
             </details>
           )}
         </div>
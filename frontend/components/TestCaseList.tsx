@@ -1,8 +1,10 @@
 "use client";
 
-import { useMemo, useState } from "react";
-import { TestCase } from "../lib/types";
+import { useState } from "react";
+import { CASES_PAGE_SIZE, fetchTestCases } from "../lib/api";
+import { PaginatedTestCases } from "../lib/types";
 import { TestCaseCard } from "./TestCaseCard";
+import { Skeleton } from "./Skeleton";
 
 const filters = [
   { value: "all", label: "All" },
@@ -10,13 +12,41 @@ const filters = [
   { value: "failed", label: "Failed" }
 ];
 
-export function TestCaseList({ cases }: { cases: TestCase[] }) {
+interface Props {
+  runId: string;
+  caseCounts: Record<string, number>;
+  initialCases: PaginatedTestCases;
+}
+
+export function TestCaseList({ runId, caseCounts, initialCases }: Props) {
   const [filter, setFilter] = useState<string>("all");
+  const [page, setPage] = useState<PaginatedTestCases>(initialCases);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const totalCases = Object.values(caseCounts).reduce((sum, count) => sum + count, 0);
+
+  const load = async (nextFilter: string, offset: number) => {
+    setLoading(true);
+    setError(null);
+    try {
+      const response = await fetchTestCases(runId, {
+        status: nextFilter === "all" ? undefined : nextFilter,
+        limit: CASES_PAGE_SIZE,
+        offset
+      });
+      setPage((prev) => (offset === 0 ? response : { ...response, data: [...prev.data, ...response.data] }));
+    } catch (err) {
+      setError((err as Error).message);
+    } finally {
+      setLoading(false);
+    }
+  };
 
-  const filtered = useMemo(() => {
-    if (filter === "all") return cases;
-    return cases.filter((testCase) => testCase.status === filter);
-  }, [cases, filter]);
+  const selectFilter = (value: string) => {
+    setFilter(value);
+    load(value, 0);
+  };
 
   return (
     <div className="space-y-4">
@@ -25,22 +55,33 @@ export function TestCaseList({ cases }: { cases: TestCase[] }) {
           <button
             type="button"
             key={f.value}
-            onClick={() => setFilter(f.value)}
+            onClick={() => selectFilter(f.value)}
             className={`rounded-full px-4 py-2 text-sm ${
               filter === f.value ? "bg-brand-primary text-white" : "bg-white/5 text-white/70"
             }`}
           >
             {f.label}
             <span className="ml-2 text-xs text-white/60">
-              ({f.value === "all" ? cases.length : cases.filter((tc) => tc.status === f.value).length})
+              ({f.value === "all" ? totalCases : caseCounts[f.value] ?? 0})
             </span>
           </button>
         ))}
       </div>
-      {filtered.map((testCase) => (
-        <TestCaseCard key={testCase.id} testCase={testCase} />
+      {error && <p className="text-rose-300">{error}</p>}
+      {page.data.map((testCase) => (
+        <TestCaseCard key={testCase.id} runId={runId} testCase={testCase} />
       ))}
-      {filtered.length === 0 && <p className="text-white/60">No test cases match this filter.</p>}
+      {loading && <Skeleton className="h-20 w-full" />}
+      {!loading && page.data.length === 0 && <p className="text-white/60">No test cases match this filter.</p>}
+      {!loading && page.data.length < page.total && (
+        <button
+          type="button"
+          onClick={() => load(filter, page.data.length)}
+          className="rounded-full bg-white/5 px-4 py-2 text-sm text-white/70 hover:text-white"
+        >
+          Load more ({page.total - page.data.length} remaining)
+        </button>
+      )}
     </div>
   );
 }
@@ -54,9 +54,10 @@ export default function TestRunsClient({ initialRuns, suites }: Props) {
 
   const showingRange = useMemo(() => {
     if (!data.total) return "Showing 0 results";
+    const total = data.total;
     const start = data.offset + 1;
-    const end = Math.min(data.offset + data.data.length, data.total);
-    return `Showing ${start}-${end} of ${data.total} results`;
+    const end = Math.min(data.offset + data.data.length, total);
+    return `Showing ${start}-${end} of ${total} results`;
   }, [data]);
 
   return (
@@ -111,7 +112,7 @@ export default function TestRunsClient({ initialRuns, suites }: Props) {
         </div>
         <input
           type="text"
-          placeholder="Search by run ID or suite name"
+          placeholder="Search by run ID, suite name, test name, or error"
           value={filters.q}
           onChange={(event) => setFilters((prev) => ({ ...prev, q: event.target.value }))}
           className="w-full rounded-xl border border-white/10 bg-white/5 px-4 py-2 text-sm text-white outline-none focus:border-brand-primary"
@@ -156,7 +157,7 @@ export default function TestRunsClient({ initialRuns, suites }: Props) {
               <button
                 type="button"
                 onClick={() => fetchData(data.offset + limit)}
-                disabled={data.offset + limit >= data.total}
+                disabled={data.offset + limit >= (data.total ?? 0)}
                 className="rounded-xl border border-white/10 px-4 py-2 disabled:opacity-40"
               >
                 Next
@@ -1,4 +1,13 @@
-import { DashboardStats, DashboardTrends, PaginatedRuns, TestRunDetail, TestSuite } from "./types";
+import {
+  DashboardStats,
+  DashboardTrends,
+  PaginatedRuns,
+  PaginatedTestCases,
+  TestCase,
+  TestRunDetail,
+  TestRunOverview,
+  TestSuite
+} from "./types";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -10,14 +19,43 @@ async function handleResponse<T>(res: Response): Promise<T> {
   return res.json() as Promise<T>;
 }
 
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
+// Revalidates against the last ETag seen for the URL so unchanged payloads come back as 304s.
+async function fetchWithEtag<T>(url: string): Promise<T> {
+  const cached = etagCache.get(url);
+  const res = await fetch(url, {
+    cache: "no-store",
+    headers: cached ? { "If-None-Match": cached.etag } : undefined
+  });
+  if (res.status === 304 && cached) {
+    return cached.body as T;
+  }
+  const body = await handleResponse<T>(res);
+  const etag = res.headers.get("ETag");
+  if (etag) {
+    etagCache.set(url, { etag, body });
+  }
+  return body;
+}
+
 export async function fetchDashboardStats(): Promise<DashboardStats> {
-  const res = await fetch(`${API_URL}/api/dashboard/stats`, { cache: "no-store" });
-  return handleResponse<DashboardStats>(res);
+  return fetchWithEtag<DashboardStats>(`${API_URL}/api/dashboard/stats`);
 }
 
 export async function fetchDashboardTrends(days = 7): Promise<DashboardTrends> {
-  const res = await fetch(`${API_URL}/api/dashboard/trends?days=${days}`, { cache: "no-store" });
-  return handleResponse<DashboardTrends>(res);
+  return fetchWithEtag<DashboardTrends>(`${API_URL}/api/dashboard/trends?days=${days}`);
+}
+
+function toQueryString(query: object): string {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== "") {
+      params.append(key, String(value));
+    }
+  });
+  const queryString = params.toString();
+  return queryString ? `?${queryString}` : "";
 }
 
 export interface RunsQuery {
@@ -28,18 +66,13 @@ export interface RunsQuery {
   q?: string;
   limit?: number;
   offset?: number;
+  pagination?: "offset" | "cursor";
+  cursor?: string;
+  include_total?: boolean;
 }
 
 export async function fetchTestRuns(query: RunsQuery = {}): Promise<PaginatedRuns> {
-  const params = new URLSearchParams();
-  Object.entries(query).forEach(([key, value]) => {
-    if (value !== undefined && value !== null && value !== "") {
-      params.append(key, String(value));
-    }
-  });
-  const queryString = params.toString();
-  const url = queryString ? `${API_URL}/api/test-runs?${queryString}` : `${API_URL}/api/test-runs`;
-  const res = await fetch(url, { cache: "no-store" });
+  const res = await fetch(`${API_URL}/api/test-runs${toQueryString(query)}`, { cache: "no-store" });
   return handleResponse<PaginatedRuns>(res);
 }
 
@@ -48,9 +81,32 @@ export async function fetchTestRun(runId: string): Promise<TestRunDetail> {
   return handleResponse<TestRunDetail>(res);
 }
 
+export async function fetchTestRunOverview(runId: string): Promise<TestRunOverview> {
+  const res = await fetch(`${API_URL}/api/test-runs/${runId}?view=summary`, { cache: "no-store" });
+  return handleResponse<TestRunOverview>(res);
+}
+
+export const CASES_PAGE_SIZE = 50;
+
+export interface CasesQuery {
+  status?: string;
+  q?: string;
+  limit?: number;
+  offset?: number;
+}
+
+export async function fetchTestCases(runId: string, query: CasesQuery = {}): Promise<PaginatedTestCases> {
+  const res = await fetch(`${API_URL}/api/test-runs/${runId}/cases${toQueryString(query)}`, { cache: "no-store" });
+  return handleResponse<PaginatedTestCases>(res);
+}
+
+export async function fetchTestCase(runId: string, caseId: string): Promise<TestCase> {
+  const res = await fetch(`${API_URL}/api/test-runs/${runId}/cases/${caseId}`, { cache: "no-store" });
+  return handleResponse<TestCase>(res);
+}
+
 export async function fetchTestSuites(): Promise<TestSuite[]> {
-  const res = await fetch(`${API_URL}/api/test-suites`, { cache: "no-store" });
-  return handleResponse<TestSuite[]>(res);
+  return fetchWithEtag<TestSuite[]>(`${API_URL}/api/test-suites`);
 }
 
 export async function triggerTestRun(suiteId: string): Promise<TestRunDetail> {
@@ -61,3 +117,11 @@ export async function triggerTestRun(suiteId: string): Promise<TestRunDetail> {
   });
   return handleResponse<TestRunDetail>(res);
 }
+
+export function dashboardEventsUrl(): string {
+  return `${API_URL}/api/events`;
+}
+
+export function runEventsUrl(runId: string): string {
+  return `${API_URL}/api/test-runs/${runId}/events`;
+}
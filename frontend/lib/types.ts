@@ -1,4 +1,4 @@
-export type Status = "passed" | "failed" | "running";
+export type Status = "passed" | "failed" | "running" | "queued";
 
 export interface DashboardStats {
   total_runs: number;
@@ -14,18 +14,29 @@ export interface DashboardTrends {
   failed: number[];
 }
 
-export interface TestCase {
+export interface TestCaseSummary {
   id: string;
   name: string;
   description?: string;
   status: Status;
   execution_time_ms: number;
-  ai_insight?: string;
   error_message?: string;
-  stack_trace?: string;
+  signature_id?: string | null;
   created_at: string;
 }
 
+export interface TestCase extends TestCaseSummary {
+  ai_insight?: string;
+  stack_trace?: string;
+}
+
+export interface PaginatedTestCases {
+  data: TestCaseSummary[];
+  total: number;
+  limit: number;
+  offset: number;
+}
+
 export interface TestRunSummary {
   id: string;
   suite_id: string;
@@ -43,11 +54,30 @@ export interface TestRunDetail extends TestRunSummary {
   test_cases: TestCase[];
 }
 
+export interface TestRunOverview extends TestRunSummary {
+  case_counts: Record<string, number>;
+}
+
+export interface DashboardUpdate {
+  stats: DashboardStats;
+  trends: DashboardTrends;
+  delta: { total_runs: number; total_tests: number; failed_tests: number } | null;
+}
+
+export interface RunProgress {
+  status: Status;
+  total_tests: number;
+  passed_tests: number;
+  failed_tests: number;
+}
+
 export interface PaginatedRuns {
   data: TestRunSummary[];
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  next_cursor?: string | null;
+  prev_cursor?: string | null;
 }
 
 export interface TestSuite {